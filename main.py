@@ -10,6 +10,7 @@ from yaml import SafeDumper
 
 from mpt.action import ActionHandler
 from mpt.cli import CommandLineParser
+from mpt.owner import OwnershipIndex
 from mpt.runtime import RuntimeManager
 from mpt.log import RichLogger
 
@@ -42,13 +43,13 @@ def main() -> NoReturn:
         sys.exit(1)
 
     # Parse command line arguments
-    triplet, action, libraries, lib_prefixes = CommandLineParser.parse_arguments()
+    triplet, action, libraries, lib_prefixes, build_options = CommandLineParser.parse_arguments()
 
     # Update user configuration if library prefixes are provided
     _update_user_configuration(lib_prefixes)
 
     # Execute the requested action
-    success = _execute_action(triplet, action, libraries)
+    success = _execute_action(triplet, action, libraries, build_options)
 
     # Exit with appropriate status code
     sys.exit(0 if success else 1)
@@ -94,7 +95,7 @@ def _update_user_configuration(lib_prefixes: dict) -> None:
         # Non-critical error - continue execution
 
 
-def _execute_action(triplet: str, action: str, libraries: list) -> bool:
+def _execute_action(triplet: str, action: str, libraries: list, build_options: dict = None) -> bool:
     """
     Execute the requested action with the given parameters.
 
@@ -102,18 +103,52 @@ def _execute_action(triplet: str, action: str, libraries: list) -> bool:
         triplet: Target triplet (e.g., x64-windows)
         action: Action to perform
         libraries: List of libraries to process
+        build_options: Build scheduling options ('jobs', 'keep_going')
 
     Returns:
         bool: True if action completed successfully, False otherwise
     """
-    handler = ActionHandler(triplet, libraries)
+    handler = ActionHandler(triplet, libraries, **(build_options or {}))
 
-    if not _dispatch_action(handler, action):
+    try:
+        success = _dispatch_action(handler, action)
+    finally:
+        # Ownership changes of the whole run are written once
+        OwnershipIndex.flush()
+    _log_cache_statistics()
+    if not success:
         RichLogger.error(f"Action '{action}' failed.")
         return False
     return True
 
 
+def _log_cache_statistics() -> None:
+    """Write the hit/miss counters of the in-process caches, HTTP connection reuse and git query batching to the debug log."""
+    from mpt.config import LibraryConfig
+    stats = LibraryConfig.cache_stats()
+    RichLogger.debug(
+        f"Library configuration cache: [bold green]{stats['hits']}[/bold green] hits, "
+        f"[bold yellow]{stats['misses']}[/bold yellow] misses, "
+        f"[bold cyan]{stats['entries']}[/bold cyan] entries"
+    )
+    from mpt.session import HttpSession
+    http_stats = HttpSession.get_statistics()
+    if http_stats['requests']:
+        RichLogger.debug(
+            f"HTTP connection pool: [bold green]{http_stats['requests']}[/bold green] requests over "
+            f"[bold yellow]{http_stats['connections']}[/bold yellow] connections to "
+            f"[bold cyan]{http_stats['hosts']}[/bold cyan] hosts "
+            f"([bold green]{http_stats['requests'] - http_stats['connections']}[/bold green] reused)"
+        )
+    from mpt.gitquery import GitQuery
+    git_stats = GitQuery.get_statistics()
+    if git_stats['queries']:
+        RichLogger.debug(
+            f"Git query cache: [bold green]{git_stats['queries']}[/bold green] queries answered by "
+            f"[bold yellow]{git_stats['processes']}[/bold yellow] git processes"
+        )
+
+
 def _dispatch_action(handler: ActionHandler, action: str) -> bool:
     """
     Route to the appropriate action handler method.
@@ -136,7 +171,8 @@ def _dispatch_action(handler: ActionHandler, action: str) -> bool:
         'fetch': handler.fetch,
         'clean': handler.clean,
         'add': handler.add,
-        'remove': handler.remove
+        'remove': handler.remove,
+        'owns': handler.owns
     }
 
     if action not in action_mapping:
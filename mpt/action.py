@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Tuple
 from rich import box
 from rich.align import Align
 from rich.console import Group
+from rich.markup import escape
 from rich.padding import Padding
 from rich.panel import Panel
 from rich.prompt import Prompt
@@ -28,23 +29,30 @@ from mpt.config import LibraryConfig
 from mpt.dependency import DependencyResolver
 from mpt.git import GitHandler
 from mpt.history import HistoryManager
+from mpt.index import PortIndex
 from mpt.library import LibraryManager
 from mpt.log import RichLogger
+from mpt.owner import OwnershipIndex
+from mpt.prefetch import SourcePrefetcher
 from mpt.source import SourceManager
 from mpt.uninstall import UninstallManager
 from mpt.view import RichTable, RichPanel
 
 
 class ActionHandler:
-    def __init__(self, triplet, libraries):
+    def __init__(self, triplet, libraries, jobs=1, keep_going=False):
         """Initialize ActionHandler with target triplet and library list.
 
         Args:
             triplet: Target triplet (e.g., x64-windows) for library operations
             libraries: List of library names to process
+            jobs: Maximum number of dependency nodes built concurrently during install
+            keep_going: If True, keep building independent nodes after a build failure
         """
         self.triplet = triplet
         self.libraries = libraries
+        self.jobs = jobs
+        self.keep_going = keep_going
         self.terminal_width = RichLogger.get_console_width()
 
     def _status_icon(self, success: bool) -> str:
@@ -238,8 +246,11 @@ class ActionHandler:
     def install(self) -> bool:
         """Install libraries with dependency resolution and build process.
 
-        Resolves dependencies and builds each library. Displays installation
-        status summary with success/failure indicators.
+        Resolves the dependencies of all requested libraries as one merged graph
+        and builds every node once, scheduling independent dependency nodes in
+        parallel when more than one job is requested.
+        Displays a per-node build summary followed by the installation status
+        summary with success/failure indicators.
 
         Returns:
             bool: True if all installations succeeded, False otherwise
@@ -250,30 +261,28 @@ class ActionHandler:
 
         overall_success = True
         success_count = 0
+        build_results = {}
+
+        # Resolve all requested libraries through one merged dependency graph
+        root_status = DependencyResolver.resolve_many(self.triplet, self.libraries, build=True,
+                                                      jobs=self.jobs, keep_going=self.keep_going,
+                                                      build_results=build_results)
 
         for lib in self.libraries:
-            try:
-                # Resolve dependencies and build library
-                dep_success = DependencyResolver.resolve(self.triplet, lib, build=True)
-                if not dep_success:
-                    status = "[bold red]Failed[/bold red]"
-                    overall_success = False
-                else:
-                    status = "[bold green]Installed[/bold green]"
-                    success_count += 1
-                # Add row to the table
-                RichTable.add_row(install_table,
-                    f"[cyan]{lib}[/cyan]",
-                    status
-                )
-            except Exception as e:
-                RichLogger.exception(f"Error installing library {lib}")
+            if root_status.get(lib):
+                status = "[bold green]Installed[/bold green]"
+                success_count += 1
+            else:
+                status = "[bold red]Failed[/bold red]"
                 overall_success = False
-                # Add error row to the table
-                RichTable.add_row(install_table,
-                    f"[cyan]{lib}[/cyan]",
-                    "[bold red]Failed[/bold red]"
-                )
+            # Add row to the table
+            RichTable.add_row(install_table,
+                f"[cyan]{lib}[/cyan]",
+                status
+            )
+
+        if build_results:
+            self._render_build_summary(build_results)
 
         # Render summary panel
         stats_text = self._get_stats_text(len(self.libraries), success_count, "Installed")
@@ -281,6 +290,49 @@ class ActionHandler:
 
         return overall_success
 
+    def _render_build_summary(self, build_results: Dict[str, Dict]) -> None:
+        """Render the per-node result of the build scheduler.
+
+        Args:
+            build_results: Mapping of node name to a result dictionary with
+                           'status', 'duration' and 'log' keys
+        """
+        build_table = RichTable.create()
+        RichTable.add_column(build_table, "🧩 Node", style="cyan", header_style="bold cyan", justify="left")
+        RichTable.add_column(build_table, "📦 Status", style="green", header_style="bold green", justify="center")
+        RichTable.add_column(build_table, "⏱️ Duration", style="yellow", header_style="bold yellow", justify="right")
+        RichTable.add_column(build_table, "📝 Log", style="magenta", header_style="bold magenta", justify="left", no_wrap=False)
+
+        status_styles = {
+            'built': "[bold green]Built[/bold green]",
+            'failed': "[bold red]Failed[/bold red]",
+            'skipped': "[bold yellow]Skipped[/bold yellow]"
+        }
+        max_path_width = self.terminal_width // 3
+        built_count = 0
+
+        for node_name, result in build_results.items():
+            if result['status'] == 'built':
+                built_count += 1
+            log_path = str(result['log']) if result.get('log') else "N/A"
+            RichTable.add_row(build_table,
+                f"[cyan]{node_name}[/cyan]",
+                status_styles.get(result['status'], result['status']),
+                f"{result['duration']:.1f}s",
+                self._shorten_path(log_path, max_path_width)
+            )
+
+        total_time = sum(result['duration'] for result in build_results.values())
+        stats_text = Text.from_markup(
+            f"🧩 Total Nodes: [bold yellow]{len(build_results)}[/bold yellow]"
+            f" | ✅ Built: [bold green]{built_count}[/bold green]"
+            f" | ❌ Failed/Skipped: [bold red]{len(build_results) - built_count}[/bold red]"
+            f" | ⏱️ Build Time: [bold cyan]{total_time:.1f}s[/bold cyan]"
+            f" | ⚡ Jobs: [bold cyan]{self.jobs}[/bold cyan]",
+            justify="center"
+        )
+        self._render_summary_panel("🏗️ Build Summary", build_table, stats_text)
+
     def uninstall(self) -> bool:
         """Uninstall libraries by removing installation files and records.
 
@@ -299,25 +351,27 @@ class ActionHandler:
         success_count = 0
         total_removed = 0
 
-        for lib in self.libraries:
-            # Remove library installation files and records
-            removed_count = UninstallManager.uninstall_library(self.triplet, lib)
-            if removed_count > 0:
-                status = "[bold green]Success[/bold green]"
-                success_count += 1
-                total_removed += removed_count
-                RichLogger.info(f"Successfully uninstalled library [cyan]{lib}[/cyan], removed {removed_count} files")
-            else:
-                status = "[bold red]Failed[/bold red]"
-                removed_count = 0
-                RichLogger.error(f"Failed to uninstall library [cyan]{lib}[/cyan]")
+        # Write status.yaml once after all records have been removed
+        with HistoryManager.batch():
+            for lib in self.libraries:
+                # Remove library installation files and records
+                removed_count = UninstallManager.uninstall_library(self.triplet, lib)
+                if removed_count > 0:
+                    status = "[bold green]Success[/bold green]"
+                    success_count += 1
+                    total_removed += removed_count
+                    RichLogger.info(f"Successfully uninstalled library [cyan]{lib}[/cyan], removed {removed_count} files")
+                else:
+                    status = "[bold red]Failed[/bold red]"
+                    removed_count = 0
+                    RichLogger.error(f"Failed to uninstall library [cyan]{lib}[/cyan]")
 
-            # Add row to the table
-            RichTable.add_row(uninstall_table,
-                f"[cyan]{lib}[/cyan]",
-                f"[magenta]{removed_count}[/magenta]",
-                status
-            )
+                # Add row to the table
+                RichTable.add_row(uninstall_table,
+                    f"[cyan]{lib}[/cyan]",
+                    f"[magenta]{removed_count}[/magenta]",
+                    status
+                )
 
         # Create statistics text with total removed files
         stats_text = Text.from_markup(
@@ -355,7 +409,7 @@ class ActionHandler:
         ignore_count = 0
 
         for lib in self.libraries:
-            config = LibraryConfig.load(lib)
+            config = PortIndex.get(lib) or {}
 
             if not config.get('script'):
                 ignore_count += 1
@@ -395,7 +449,7 @@ class ActionHandler:
                 lib_built = built_time
 
                 current_version = config.get('version', 'unknown')
-                if current_version != lib_ver:
+                if str(current_version) != str(lib_ver):
                     update_available_count += 1
                     status_display = "[bold yellow]Update Available[/bold yellow]"
                 else:
@@ -474,56 +528,90 @@ class ActionHandler:
         RichTable.add_column(fetch_table, "📦 Status", style="green", header_style="bold green", justify="center")
 
         success_count = 0
-        for lib in self.libraries:
-            try:
-                source_path = "N/A"
-                status = "[bold red]Failed[/bold red]"
+        submodule_timings = []
+        submodule_elapsed = {}
+        # Fetch all sources concurrently; each iteration below waits for its library
+        with SourcePrefetcher(self.libraries):
+            for lib in self.libraries:
+                try:
+                    source_path = "N/A"
+                    status = "[bold red]Failed[/bold red]"
 
-                # Load library configuration
-                config = LibraryConfig.load(lib)
-                if not config:
-                    RichLogger.error(f"Failed to load config for library [cyan]{lib}[/cyan]")
+                    # Load library configuration
+                    config = LibraryConfig.load(lib)
+                    if not config:
+                        RichLogger.error(f"Failed to load config for library [cyan]{lib}[/cyan]")
+                        RichTable.add_row(fetch_table,
+                            f"[bold cyan]{lib}[/bold cyan]",
+                            "N/A",
+                            "[bold red]Config error[/bold red]"
+                        )
+                        continue
+
+                    source_path = SourceManager.fetch_source(config)
+                    if not source_path or not source_path.exists():
+                        RichLogger.error(f"Source acquisition failed for library [cyan]{lib}[/cyan]")
+                        return False
+
+                    # Check if source fetching was successful
+                    if not source_path:
+                        RichLogger.error(f"Failed to fetch source for library [cyan]{lib}[/cyan]")
+                        status = "[bold red]Failed[/bold red]"
+                    else:
+                        status = "[bold green]Success[/bold green]"
+                        success_count += 1
+                        RichLogger.info(f"Successfully fetched source for library [cyan]{lib}[/cyan]")
+                        for path, elapsed in GitHandler.get_submodule_timings(source_path):
+                            submodule_timings.append((lib, path, elapsed))
+                        elapsed = GitHandler.get_submodule_elapsed(source_path)
+                        if elapsed is not None:
+                            submodule_elapsed[lib] = elapsed
+
+                    # Add row to the table
+                    RichTable.add_row(fetch_table,
+                        f"[bold cyan]{lib}[/bold cyan]",
+                        f"[bold yellow]{source_path}[/bold yellow]" if source_path != "N/A" else "N/A",
+                        status
+                    )
+                except Exception as e:
+                    RichLogger.exception(f"Error fetching source for library {lib}")
+                    # Add error row to the table
                     RichTable.add_row(fetch_table,
                         f"[bold cyan]{lib}[/bold cyan]",
                         "N/A",
-                        "[bold red]Config error[/bold red]"
+                        "[bold red]Failed[/bold red]"
                     )
-                    continue
-
-                source_path = SourceManager.fetch_source(config)
-                if not source_path or not source_path.exists():
-                    RichLogger.error(f"Source acquisition failed for library [cyan]{lib}[/cyan]")
-                    return False
-
-                # Check if source fetching was successful
-                if not source_path:
-                    RichLogger.error(f"Failed to fetch source for library [cyan]{lib}[/cyan]")
-                    status = "[bold red]Failed[/bold red]"
-                else:
-                    status = "[bold green]Success[/bold green]"
-                    success_count += 1
-                    RichLogger.info(f"Successfully fetched source for library [cyan]{lib}[/cyan]")
-
-                # Add row to the table
-                RichTable.add_row(fetch_table,
-                    f"[bold cyan]{lib}[/bold cyan]",
-                    f"[bold yellow]{source_path}[/bold yellow]" if source_path != "N/A" else "N/A",
-                    status
-                )
-            except Exception as e:
-                RichLogger.exception(f"Error fetching source for library {lib}")
-                # Add error row to the table
-                RichTable.add_row(fetch_table,
-                    f"[bold cyan]{lib}[/bold cyan]",
-                    "N/A",
-                    "[bold red]Failed[/bold red]"
-                )
 
         # Render summary panel
         stats_text = self._get_stats_text(len(self.libraries), success_count, "Fetched")
-        self._render_summary_panel("📥 Fetch Summary", fetch_table, stats_text)
+        self._render_summary_panel("📥 Fetch Summary", fetch_table, stats_text,
+                                   self._get_submodule_timing_text(submodule_timings, submodule_elapsed))
         return success_count == len(self.libraries)
 
+    def _get_submodule_timing_text(self, timings: List[Tuple[str, str, float]],
+                                   elapsed: Dict[str, float]) -> Optional[Text]:
+        """Generate the per-submodule fetch times shown below the fetch statistics.
+
+        Submodules are fetched in parallel, so each library reports the wall-clock time
+        of its whole submodule update rather than the sum of the submodule times.
+
+        Args:
+            timings: (library, submodule path, seconds) tuples
+            elapsed: Wall-clock seconds spent on the submodules of each library
+
+        Returns:
+            Text: Rich-formatted timing lines, or None if no submodules were fetched
+        """
+        if not timings:
+            return None
+        lines = [f"⏱️ Submodules: [bold yellow]{len(timings)}[/bold yellow]"]
+        for lib in dict.fromkeys(t[0] for t in timings):
+            if lib in elapsed:
+                lines.append(f"[bold cyan]{lib}[/bold cyan]: [bold yellow]{elapsed[lib]:.1f}s[/bold yellow] elapsed")
+            for _, path, seconds in (t for t in timings if t[0] == lib):
+                lines.append(f"[bold cyan]{lib}[/bold cyan]/{escape(path)}: [bold green]{seconds:.1f}s[/bold green]")
+        return Text.from_markup("\n".join(lines), justify="center")
+
     def add(self) -> bool:
         """Interactively create new library configurations.
 
@@ -632,3 +720,45 @@ class ActionHandler:
         self._render_summary_panel("➖ Library Removal Summary", remove_table, stats_text)
 
         return success_count > 0
+
+    def owns(self) -> bool:
+        """Show which installed libraries own the specified paths.
+
+        Looks up each path in the file ownership index of the current triplet.
+        Paths may be absolute or relative to an install prefix.
+
+        Returns:
+            bool: True if every path is owned by at least one library, False otherwise
+        """
+        owns_table = RichTable.create()
+        RichTable.add_column(owns_table, "📄 Path", style="cyan", header_style="bold cyan", justify="left", no_wrap=False)
+        RichTable.add_column(owns_table, "📁 Owner", style="green", header_style="bold green", justify="left")
+
+        found_count = 0
+
+        for path in self.libraries:
+            try:
+                owners = OwnershipIndex.find_owners(self.triplet, path)
+            except Exception as e:
+                RichLogger.exception(f"Error looking up owner of {path}")
+                owners = []
+
+            if owners:
+                found_count += 1
+                owner_display = ", ".join(f"[bold green]{owner}[/bold green]" for owner in owners)
+                if len(owners) > 1:
+                    owner_display += " [bold yellow](collision)[/bold yellow]"
+            else:
+                owner_display = "[bold red]Not owned[/bold red]"
+
+            RichTable.add_row(owns_table, f"[cyan]{path}[/cyan]", owner_display)
+
+        stats_text = Text.from_markup(
+            f"📋 Total Paths: [bold yellow]{len(self.libraries)}[/bold yellow]"
+            f" | ✅ Owned: [bold green]{found_count}[/bold green]"
+            f" | ❌ Not Owned: [bold red]{len(self.libraries) - found_count}[/bold red]",
+            justify="center"
+        )
+        self._render_summary_panel("🔎 File Ownership", owns_table, stats_text)
+
+        return bool(self.libraries) and found_count == len(self.libraries)
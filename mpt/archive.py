@@ -2,59 +2,35 @@
 #
 #  Copyright (c) 2024 Jianshan Jiang
 #
-import fnmatch
 import os
 import tarfile
 import zipfile
 import hashlib
 import shutil
 import re
+import threading
 import zstandard as zstd
-import io
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Union, List
+from typing import Iterable, List, Optional, Union
 
-from mpt.file import FileUtils
+from mpt.digest import DigestCache
 from mpt.log import RichLogger
+from mpt.pattern import PathMatcher
 
 class ArchiveHandler:
     """Provides comprehensive utilities for archive handling, extraction, and hash verification"""
 
-    @staticmethod
-    def _should_exclude(file_path: str, exclude_list: Optional[List[str]]) -> bool:
-        """
-        Determine if a file path matches any exclusion patterns.
-
-        Processes glob-style patterns and directory exclusions to identify files
-        that should be skipped during archive extraction operations.
-
-        Args:
-            file_path: The normalized file path to check against exclusion rules
-            exclude_list: List of glob patterns or directory paths to exclude
-
-        Returns:
-            bool: True if the file matches any exclusion pattern, False otherwise
-        """
-        try:
-            if not exclude_list:
-                return False
-
-            normalized_path = file_path.replace('\\', '/')
-            for pattern in exclude_list:
-                if pattern.endswith('/'):
-                    dir_pattern = pattern.rstrip('/')
-                    if normalized_path.startswith(dir_pattern + '/'):
-                        return True
-                elif fnmatch.fnmatch(normalized_path, pattern):
-                    return True
-            return False
-        except Exception as e:
-            RichLogger.exception(f"Error in _should_exclude for file {file_path}: {str(e)}")
-            return False
+    # Maximum number of threads writing extracted files
+    MAX_EXTRACT_WORKERS = 16
+    # TAR members up to this size are read into memory and handed to a writer thread
+    MAX_BUFFERED_MEMBER_SIZE = 1024 * 1024
+    # Buffer size used when copying member data to disk
+    COPY_BUFFER_SIZE = 1024 * 1024
 
     @staticmethod
-    def verify_hash(file_path: Path, expected_hash: str) -> bool:
+    def verify_hash(file_path: Path, expected_hash: str, actual_hash: Optional[str] = None) -> bool:
         """
         Perform SHA256 hash verification on a file with comprehensive error reporting.
 
@@ -65,6 +41,9 @@ class ArchiveHandler:
         Args:
             file_path: Path object pointing to the file for hash verification
             expected_hash: Expected SHA256 hash value in hexadecimal format
+            actual_hash: Digest already computed for the file (e.g. while downloading it);
+                         otherwise the digest cache is consulted and the file is only
+                         read when it changed since it was last hashed
 
         Returns:
             bool: True if hash matches or no expected hash provided, False on
@@ -78,7 +57,8 @@ class ArchiveHandler:
                 RichLogger.error(f"File not found: {file_path}")
                 return False
 
-            actual_hash = FileUtils.calc_hash(file_path)
+            if actual_hash is None:
+                actual_hash = DigestCache.get_digest(file_path)
             if actual_hash == expected_hash:
                 return True
             else:
@@ -129,6 +109,10 @@ class ArchiveHandler:
                     RichLogger.exception(f"Failed to create target directory {target_dir}: {str(e)}")
                     return False
 
+            # Compile the patterns once for all members of the archive
+            include = PathMatcher(include)
+            exclude = PathMatcher(exclude)
+
             archive_ext = archive_path.suffix.lower()
             if archive_ext in [".zst", ".zstd"]:
                 success = ArchiveHandler._extract_zstd(archive_path, target_dir, extract_path, include, exclude)
@@ -153,21 +137,25 @@ class ArchiveHandler:
         archive_path: Path,
         target_dir: Path,
         extract_path: Optional[str],
-        include: Optional[List[str]],
-        exclude: Optional[List[str]]
+        include: PathMatcher,
+        exclude: PathMatcher
     ) -> bool:
         """
         Extract Zstandard-compressed TAR archive with filtering capabilities.
 
-        Decompresses ZSTD stream and processes embedded TAR archive with
-        pattern-based file selection and security validation.
+        Decompresses the ZSTD stream and reads the embedded TAR archive sequentially
+        (tarfile stream mode), so memory use stays bounded regardless of archive size.
+        With an explicit extract_path the base path is known up front and the archive
+        is decompressed once. Otherwise a stream cannot be rewound, so a first pass reads
+        only the member headers to detect the top-level directory to strip before the
+        extracting pass applies the pattern-based selection and security validation.
 
         Args:
             archive_path: Path to ZSTD compressed archive file
             target_dir: Destination directory for extracted files
             extract_path: Optional subdirectory within archive to extract
-            include: List of patterns for file inclusion filtering
-            exclude: List of patterns for file exclusion filtering
+            include: Compiled patterns for file inclusion filtering (empty includes all)
+            exclude: Compiled patterns for file exclusion filtering
 
         Returns:
             bool: True if extraction successful and files were extracted, False otherwise
@@ -175,53 +163,50 @@ class ArchiveHandler:
         try:
             dctx = zstd.ZstdDecompressor()
 
-            with open(archive_path, "rb") as fh:
-                stream_reader = dctx.stream_reader(fh)
-                tar_buffer = io.BytesIO(stream_reader.read())
-
-                with tarfile.open(fileobj=tar_buffer, mode="r:") as tar:
+            if extract_path:
+                base_path = extract_path.replace('\\', '/').strip('/') + '/'
+            else:
+                # Header-only pass to detect the top-level directory to strip
+                with open(archive_path, "rb") as fh, dctx.stream_reader(fh) as stream_reader:
+                    with tarfile.open(fileobj=stream_reader, mode="r|") as tar:
+                        base_path = ArchiveHandler._scan_base_path(
+                            (member.name for member in ArchiveHandler._iter_stream(tar)), None)
+
+            # Filter and extract members as they stream by
+            with open(archive_path, "rb") as fh, dctx.stream_reader(fh) as stream_reader:
+                with tarfile.open(fileobj=stream_reader, mode="r|") as tar:
                     extracted_count = 0
-                    base_path = ArchiveHandler._determine_base_path(tar, extract_path)
-                    for member in tar.getmembers():
+                    matched = False
+                    for member in ArchiveHandler._iter_stream(tar):
                         try:
+                            if not matched and member.name.replace('\\', '/').startswith(base_path):
+                                matched = True
                             if member.isdir():
                                 continue
-                            member_path = member.name.replace('\\', '/')
-
-                            if base_path and not member_path.startswith(base_path):
-                                continue
-
-                            if ArchiveHandler._is_unsafe_path(member_path):
-                                continue
-
-                            if exclude and ArchiveHandler._should_exclude(member_path, exclude):
-                                continue
-
-                            if include:
-                                matched = False
-                                for pattern in include:
-                                    if fnmatch.fnmatch(member_path, pattern):
-                                        matched = True
-                                        break
-                                if not matched:
-                                    continue
-
-                            if base_path and member_path.startswith(base_path):
-                                relative_path = member_path[len(base_path):]
-                            else:
-                                relative_path = member_path
-
-                            relative_path = ArchiveHandler._normalize_path(relative_path)
+                            relative_path = ArchiveHandler._select_member(member.name, base_path, include, exclude)
                             if not relative_path:
                                 continue
 
                             member.name = relative_path
 
+                            # Hard links must point at the already extracted file, the
+                            # stream cannot go back to read the link target's data
+                            if member.islnk():
+                                link_path = member.linkname.replace('\\', '/')
+                                if base_path and link_path.startswith(base_path):
+                                    link_path = link_path[len(base_path):]
+                                link_path = ArchiveHandler._normalize_path(link_path)
+                                if not link_path:
+                                    continue
+                                member.linkname = link_path
+
                             tar.extract(member, path=str(target_dir))
                             extracted_count += 1
                         except Exception as e:
                             RichLogger.exception(f"Failed to extract member {member.name}: {str(e)}")
                             continue
+                    if extract_path and not matched:
+                        RichLogger.warning(f"No items in archive match extract path: {base_path}")
                     return extracted_count > 0
 
         except zstd.ZstdError as e:
@@ -234,26 +219,51 @@ class ArchiveHandler:
             RichLogger.exception(f"Unexpected error during ZSTD extraction: {str(e)}")
             return False
 
+    @staticmethod
+    def _iter_stream(tar: tarfile.TarFile):
+        """
+        Iterate over the members of a TAR archive opened in stream mode.
+
+        TarFile keeps every member it has read in its members list; in stream mode
+        that list is never needed again once a member has been processed, so it is
+        cleared as the archive is read to keep memory use independent of the number
+        of members.
+
+        Args:
+            tar: TarFile opened with mode 'r|'
+
+        Yields:
+            TarInfo: Archive members in stream order
+        """
+        while True:
+            member = tar.next()
+            if member is None:
+                break
+            yield member
+            tar.members.clear()
+
     @staticmethod
     def _extract_zip(
         archive_path: Path,
         target_dir: Path,
         extract_path: Optional[str],
-        include: Optional[List[str]],
-        exclude: Optional[List[str]]
+        include: PathMatcher,
+        exclude: PathMatcher
     ) -> bool:
         """
         Extract ZIP archive contents with pattern filtering and security checks.
 
         Processes ZIP format archives with support for partial extraction and
-        selective file inclusion/exclusion based on glob patterns.
+        selective file inclusion/exclusion based on glob patterns. ZIP members can be
+        read in any order, so the selected members are decompressed and written on a
+        thread pool, each worker reading through its own handle of the archive.
 
         Args:
             archive_path: Path to ZIP archive file
             target_dir: Destination directory for extracted contents
             extract_path: Optional path within archive to limit extraction scope
-            include: List of glob patterns for file inclusion
-            exclude: List of glob patterns for file exclusion
+            include: Compiled glob patterns for file inclusion (empty includes all)
+            exclude: Compiled glob patterns for file exclusion
 
         Returns:
             bool: True if successful extraction occurred, False on errors or no files matched
@@ -261,45 +271,47 @@ class ArchiveHandler:
         try:
             with zipfile.ZipFile(archive_path, "r") as zip_ref:
                 base_path = ArchiveHandler._determine_base_path(zip_ref, extract_path)
-                extracted_count = 0
-
+                selected = []
                 for member in zip_ref.infolist():
-                    try:
-                        if member.is_dir():
-                            continue
-                        full_archive_path = member.filename.replace('\\', '/')
-                        if base_path and not full_archive_path.startswith(base_path):
-                            continue
-
-                        if exclude and ArchiveHandler._should_exclude(full_archive_path, exclude):
-                            continue
-
-                        if include:
-                            matched = False
-                            for pattern in include:
-                                if fnmatch.fnmatch(full_archive_path, pattern):
-                                    matched = True
-                                    break
-                            if not matched:
-                                continue
-
-                        if base_path and full_archive_path.startswith(base_path):
-                            relative_path = full_archive_path[len(base_path):]
-                        else:
-                            relative_path = full_archive_path
-
-                        relative_path = ArchiveHandler._normalize_path(relative_path)
-                        if not relative_path:
-                            continue
-
-                        member.filename = relative_path
-
-                        zip_ref.extract(member, path=str(target_dir))
-                        extracted_count += 1
-                    except Exception as e:
-                        RichLogger.exception(f"Failed to extract member {member.filename}: {str(e)}")
+                    if member.is_dir():
                         continue
-                return extracted_count > 0
+                    relative_path = ArchiveHandler._select_member(member.filename, base_path, include, exclude)
+                    if relative_path:
+                        selected.append((member, relative_path))
+
+            if not selected:
+                return False
+            ArchiveHandler._create_parent_dirs(target_dir, [relative_path for _, relative_path in selected])
+
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+
+            def extract_member(member: zipfile.ZipInfo, relative_path: str) -> None:
+                zip_handle = getattr(local, 'zip_handle', None)
+                if zip_handle is None:
+                    zip_handle = local.zip_handle = zipfile.ZipFile(archive_path, "r")
+                    with handles_lock:
+                        handles.append(zip_handle)
+                with zip_handle.open(member) as source, open(target_dir / relative_path, "wb") as target:
+                    shutil.copyfileobj(source, target, ArchiveHandler.COPY_BUFFER_SIZE)
+
+            extracted_count = 0
+            try:
+                with ThreadPoolExecutor(max_workers=ArchiveHandler._get_worker_count(),
+                                        thread_name_prefix="mpt-unzip") as executor:
+                    futures = {executor.submit(extract_member, member, relative_path): member
+                               for member, relative_path in selected}
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                            extracted_count += 1
+                        except Exception as e:
+                            RichLogger.exception(f"Failed to extract member {futures[future].filename}: {str(e)}")
+            finally:
+                for zip_handle in handles:
+                    zip_handle.close()
+            return extracted_count > 0
 
         except Exception as e:
             RichLogger.exception(f"Failed to extract ZIP archive {archive_path}: {str(e)}")
@@ -310,21 +322,24 @@ class ArchiveHandler:
         archive_path: Path,
         target_dir: Path,
         extract_path: Optional[str],
-        include: Optional[List[str]],
-        exclude: Optional[List[str]]
+        include: PathMatcher,
+        exclude: PathMatcher
     ) -> bool:
         """
         Extract TAR archive (including compressed variants) with filtering.
 
         Handles various TAR formats (compressed with gzip, bzip2, etc.) with
-        comprehensive file filtering and security path validation.
+        comprehensive file filtering and security path validation. Compressed TAR
+        data can only be read sequentially, so a single reader decompresses the
+        members in archive order and hands small files to a pool of writer threads;
+        members larger than the in-memory limit are copied by the reader directly.
 
         Args:
             archive_path: Path to TAR archive file (any supported compression)
             target_dir: Target directory for extracted files
             extract_path: Optional subpath within archive for partial extraction
-            include: List of patterns for file inclusion
-            exclude: List of patterns for file exclusion
+            include: Compiled patterns for file inclusion (empty includes all)
+            exclude: Compiled patterns for file exclusion
 
         Returns:
             bool: True if files were successfully extracted, False on errors or no matches
@@ -333,47 +348,57 @@ class ArchiveHandler:
             with tarfile.open(archive_path, "r:*") as tar_ref:
                 members = tar_ref.getmembers()
                 base_path = ArchiveHandler._determine_base_path(tar_ref, extract_path)
-                extracted_count = 0
-
+                selected = []
                 for member in members:
-                    try:
-                        if not member.isfile():
-                            continue
-                        full_archive_path = member.name.replace('\\', '/')
-                        if base_path and not full_archive_path.startswith(base_path):
-                            continue
-
-                        if exclude and ArchiveHandler._should_exclude(full_archive_path, exclude):
-                            continue
+                    if not member.isfile():
+                        continue
+                    relative_path = ArchiveHandler._select_member(member.name, base_path, include, exclude)
+                    if relative_path:
+                        selected.append((member, relative_path))
 
-                        if ArchiveHandler._is_unsafe_path(full_archive_path):
-                            continue
+                if not selected:
+                    return False
+                ArchiveHandler._create_parent_dirs(target_dir, [relative_path for _, relative_path in selected])
 
-                        if include:
-                            matched = False
-                            for pattern in include:
-                                if fnmatch.fnmatch(full_archive_path, pattern):
-                                    matched = True
-                                    break
-                            if not matched:
-                                continue
+                # Bound the number of member buffers waiting for a writer
+                workers = ArchiveHandler._get_worker_count()
+                pending = threading.BoundedSemaphore(workers * 4)
 
-                        if base_path and full_archive_path.startswith(base_path):
-                            relative_path = full_archive_path[len(base_path):]
-                        else:
-                            relative_path = full_archive_path
+                def write_member(member: tarfile.TarInfo, target_path: Path, data: bytes) -> None:
+                    try:
+                        with open(target_path, "wb") as target:
+                            target.write(data)
+                        ArchiveHandler._apply_attributes(member, target_path)
+                    finally:
+                        pending.release()
 
-                        relative_path = ArchiveHandler._normalize_path(relative_path)
-                        if not relative_path:
+                extracted_count = 0
+                futures = {}
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mpt-untar") as executor:
+                    for member, relative_path in selected:
+                        target_path = target_dir / relative_path
+                        try:
+                            source = tar_ref.extractfile(member)
+                            if member.size > ArchiveHandler.MAX_BUFFERED_MEMBER_SIZE:
+                                with source, open(target_path, "wb") as target:
+                                    shutil.copyfileobj(source, target, ArchiveHandler.COPY_BUFFER_SIZE)
+                                ArchiveHandler._apply_attributes(member, target_path)
+                                extracted_count += 1
+                                continue
+                            with source:
+                                data = source.read()
+                            pending.acquire()
+                            futures[executor.submit(write_member, member, target_path, data)] = member
+                        except Exception as e:
+                            RichLogger.exception(f"Failed to extract member {member.name}: {str(e)}")
                             continue
 
-                        member.name = relative_path
-
-                        tar_ref.extract(member, path=str(target_dir))
-                        extracted_count += 1
-                    except Exception as e:
-                        RichLogger.exception(f"Failed to extract member {member.name}: {str(e)}")
-                        continue
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                            extracted_count += 1
+                        except Exception as e:
+                            RichLogger.exception(f"Failed to extract member {futures[future].name}: {str(e)}")
                 return extracted_count > 0
 
         except Exception as e:
@@ -381,7 +406,90 @@ class ArchiveHandler:
             return False
 
     @staticmethod
-    def _is_unsafe_path(path: str) -> bool:
+    def _select_member(
+        member_name: str,
+        base_path: str,
+        include: PathMatcher,
+        exclude: PathMatcher
+    ) -> Optional[str]:
+        """
+        Apply base path, security and pattern filtering to an archive member.
+
+        Args:
+            member_name: Member name as stored in the archive
+            base_path: Base path returned by _determine_base_path, or empty string
+            include: Compiled glob patterns for file inclusion (empty includes all)
+            exclude: Compiled glob patterns for file exclusion
+
+        Returns:
+            str: Normalized path relative to the extraction directory, or None if the
+                 member is outside the base path, unsafe or filtered out
+        """
+        member_path = member_name.replace('\\', '/')
+        if base_path and not member_path.startswith(base_path):
+            return None
+
+        if ArchiveHandler.is_unsafe_path(member_path):
+            return None
+
+        if exclude and exclude.matches(member_path):
+            return None
+
+        if include and not include.matches(member_path):
+            return None
+
+        if base_path:
+            member_path = member_path[len(base_path):]
+
+        return ArchiveHandler._normalize_path(member_path) or None
+
+    @staticmethod
+    def _create_parent_dirs(target_dir: Path, relative_paths: List[str]) -> None:
+        """
+        Create the directories of all extracted files up front.
+
+        Each distinct directory is created once, parents first, instead of checking
+        the directory of every file while it is extracted.
+
+        Args:
+            target_dir: Destination directory of the extraction
+            relative_paths: Paths of the files to be extracted, relative to target_dir
+        """
+        directories = {os.path.dirname(relative_path) for relative_path in relative_paths}
+        for directory in sorted(directories):
+            if directory:
+                os.makedirs(target_dir / directory, exist_ok=True)
+
+    @staticmethod
+    def _apply_attributes(member: tarfile.TarInfo, target_path: Path) -> None:
+        """
+        Restore the permission bits and modification time of an extracted TAR member.
+
+        Build systems such as make and autotools compare file timestamps, so the
+        archived modification times are kept like tarfile.extract does.
+
+        Args:
+            member: TAR member the file was extracted from
+            target_path: Path of the extracted file
+        """
+        try:
+            os.chmod(target_path, member.mode & 0o7777)
+            os.utime(target_path, (member.mtime, member.mtime))
+        except OSError as e:
+            RichLogger.debug(f"Failed to restore attributes of {target_path}: {str(e)}")
+
+    @staticmethod
+    def _get_worker_count() -> int:
+        """
+        Determine the number of threads used to write extracted files.
+
+        Returns:
+            int: Worker thread count, bounded by MAX_EXTRACT_WORKERS
+        """
+        return max(1, min(ArchiveHandler.MAX_EXTRACT_WORKERS, (os.cpu_count() or 1) * 2))
+
+    @staticmethod
+    def is_unsafe_path(path: str) -> bool:
         """
         Validate path for potential security risks and unsafe patterns.
 
@@ -409,7 +517,7 @@ class ArchiveHandler:
                 return True
             return False
         except Exception as e:
-            RichLogger.exception(f"Error in _is_unsafe_path for path {path}: {str(e)}")
+            RichLogger.exception(f"Error in is_unsafe_path for path {path}: {str(e)}")
             return True
 
     @staticmethod
@@ -430,7 +538,7 @@ class ArchiveHandler:
             normalized_path = original_path.replace('\\', '/')
             normalized_path = normalized_path.lstrip('/')
 
-            if ArchiveHandler._is_unsafe_path(normalized_path):
+            if ArchiveHandler.is_unsafe_path(normalized_path):
                 return ""
             return normalized_path
         except Exception as e:
@@ -450,6 +558,30 @@ class ArchiveHandler:
             archive: Archive object (ZipFile or TarFile) to analyze
             extract_path: Optional explicit path to use as extraction root
 
+        Returns:
+            str: Normalized base path for extraction (with trailing slash),
+                 or empty string for flat extraction
+        """
+        if isinstance(archive, zipfile.ZipFile):
+            all_items = [info.filename for info in archive.infolist()]
+        elif isinstance(archive, tarfile.TarFile):
+            all_items = [member.name for member in archive.getmembers()]
+        else:
+            all_items = []
+        return ArchiveHandler._scan_base_path(all_items, extract_path)
+
+    @staticmethod
+    def _scan_base_path(names: Iterable[str], extract_path: Optional[str]) -> str:
+        """
+        Determine the base extraction path from a single pass over archive member names.
+
+        Only the top-level entries are remembered, so the names can come from a
+        stream of any length.
+
+        Args:
+            names: Member names of the archive, in any order
+            extract_path: Optional explicit path to use as extraction root
+
         Returns:
             str: Normalized base path for extraction (with trailing slash),
                  or empty string for flat extraction
@@ -457,52 +589,25 @@ class ArchiveHandler:
         try:
             if extract_path:
                 normalized_path = extract_path.replace('\\', '/').strip('/') + '/'
-                if isinstance(archive, zipfile.ZipFile):
-                    all_items = [info.filename for info in archive.infolist()]
-                elif isinstance(archive, tarfile.TarFile):
-                    all_items = [member.name for member in archive.getmembers()]
-                else:
-                    all_items = []
-
-                matching_items = [item for item in all_items if item.replace('\\', '/').startswith(normalized_path)]
-                if not matching_items:
+                if not any(name.replace('\\', '/').startswith(normalized_path) for name in names):
                     RichLogger.warning(f"No items in archive match extract path: {normalized_path}")
                 return normalized_path
 
-            if isinstance(archive, zipfile.ZipFile):
-                all_items = [info.filename for info in archive.infolist()]
-            elif isinstance(archive, tarfile.TarFile):
-                all_items = [member.name for member in archive.getmembers()]
-            else:
-                return ""
-
-            if not all_items:
-                return ""
-
-            top_level_items = set()
-            for path in all_items:
+            top_level_dirs = set()
+            for path in names:
                 clean_path = path.replace('\\', '/').lstrip('/')
                 parts = clean_path.split('/')
-                if parts:
-                    top_level = parts[0]
-                    if top_level == '__MACOSX':
-                        continue
-                    top_level_items.add(top_level)
-
-            non_hidden_dirs = []
-            for item in top_level_items:
-                is_directory = any(
-                    len(p.split('/')) > 1 and p.split('/')[0] == item
-                    for p in all_items
-                )
-                if is_directory:
-                    non_hidden_dirs.append(item)
-
-            if len(non_hidden_dirs) == 1:
-                base_dir = non_hidden_dirs[0]
+                top_level = parts[0]
+                if top_level == '__MACOSX':
+                    continue
+                if len(parts) > 1:
+                    top_level_dirs.add(top_level)
+
+            if len(top_level_dirs) == 1:
+                base_dir = next(iter(top_level_dirs))
                 return f"{base_dir}/"
 
             return ""
         except Exception as e:
-            RichLogger.exception(f"Error in _determine_base_path: {str(e)}")
+            RichLogger.exception(f"Error in _scan_base_path: {str(e)}")
             return ""
@@ -4,17 +4,21 @@
 #
 import os
 import re
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 
 from mpt import ROOT_DIR
 from mpt.bash import BashUtils
+from mpt.cache import BinaryCache
 from mpt.clean import CleanManager
 from mpt.config import UserConfig
 from mpt.dependency import DependencyResolver
+from mpt.fingerprint import BuildFingerprint
 from mpt.git import GitHandler
 from mpt.history import HistoryManager
 from mpt.log import RichLogger
+from mpt.owner import OwnershipIndex
 from mpt.patch import PatchHandler
 from mpt.run import Runner
 from mpt.source import SourceManager
@@ -41,14 +45,29 @@ class BuildManager:
         # Parse node name to get library name and dependency type
         lib_name, dep_type = DependencyResolver.parse_dependency_name(node_name)
 
+        # The fingerprint of a git source includes its checked-out commit, which is only
+        # known once the source has been fetched
+        is_git = SourceManager.is_git_url(config.get('url', ''))
+        fingerprint = None if is_git else BuildFingerprint.compute(triplet, node_name, config)
+
+        # Restore the artifacts of an identical earlier build without fetching sources
+        if BuildManager._install_from_cache(triplet, node_name, config, fingerprint):
+            return True
+
         # Fetch source code
         source_path = SourceManager.fetch_source(config)
         if not source_path or not source_path.exists():
             RichLogger.critical(f"[[bold cyan]{node_name}[/bold cyan]] Source acquisition failed")
             return False
 
+        if is_git:
+            revision = GitHandler.get_head_commit(source_path)
+            fingerprint = BuildFingerprint.compute(triplet, node_name, config, revision)
+            if BuildManager._install_from_cache(triplet, node_name, config, fingerprint):
+                return True
+
         # Check if rebuild is required
-        if not BuildManager._should_build(triplet, node_name, config):
+        if not BuildManager._should_build(triplet, node_name, config, fingerprint):
             RichLogger.debug(f"[[bold cyan]{node_name}[/bold cyan]] Build skipped - already up to date")
             return True
 
@@ -64,22 +83,17 @@ class BuildManager:
             if not script_path.exists():
                 RichLogger.error(f"Build script not found: [bold cyan]{script_path}[/bold cyan]")
                 return False
+            prefix = UserConfig.get_prefix(triplet, lib_name)
             success, installed_files = Runner.run_script(triplet, lib_name, script_path, log_file)
             if success:
-                prefix = UserConfig.get_prefix(triplet, lib_name)
                 # Extract files skipped during installation from the log
                 skipped_files = BuildManager.extract_skipped_files(log_file, prefix)
                 # Add any missing skipped files to installed_files
                 for file_path in skipped_files:
                     if file_path not in installed_files:
                         installed_files.append(file_path)
-                info_file = ROOT_DIR / 'installed' / 'info' / triplet / f"{lib_name}.list"
-                info_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(info_file, 'w', encoding='utf-8') as f:
-                    for file_path in sorted(installed_files):
-                        f.write(f"{file_path}\n")
-                version = config.get('version', 'unknown')
-                HistoryManager.add_record(triplet, node_name, version)
+                BuildManager._record_installation(triplet, node_name, config, installed_files, fingerprint)
+                BinaryCache.store(node_name, fingerprint, prefix, installed_files)
                 RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Build completed successfully")
                 return True
             else:
@@ -91,14 +105,74 @@ class BuildManager:
         return False
 
     @staticmethod
-    def _should_build(triplet: str, node_name: str, config: Dict) -> bool:
+    def _install_from_cache(triplet: str, node_name: str, config: Dict, fingerprint: Optional[str]) -> bool:
+        """
+        Install a node from the binary cache when it is missing or built differently.
+
+        Args:
+            triplet: Target triplet specification
+            node_name: Library identifier with optional dependency type suffix
+            config: Library configuration dictionary
+            fingerprint: Build fingerprint of the node, if it could be computed
+
+        Returns:
+            bool: True if the node was restored from the cache, False otherwise
+        """
+        if not config.get('script') or not fingerprint:
+            return False
+        lib_info = HistoryManager.get_library_info(triplet, node_name)
+        if lib_info and (not lib_info.get('fingerprint') or lib_info['fingerprint'] == fingerprint):
+            return False
+
+        lib_name, _ = DependencyResolver.parse_dependency_name(node_name)
+        prefix = UserConfig.get_prefix(triplet, lib_name)
+        previous_files = HistoryManager.load_file_list(triplet, lib_name)
+        # Keep concurrent builds from recording the restored files as their own
+        with Runner.get_prefix_lock(prefix):
+            restored_files = BinaryCache.restore(node_name, fingerprint, prefix, previous_files)
+        if restored_files is None:
+            return False
+        BuildManager._record_installation(triplet, node_name, config, restored_files, fingerprint)
+        RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Installed from binary cache")
+        return True
+
+    @staticmethod
+    def _record_installation(triplet: str, node_name: str, config: Dict,
+                             installed_files: list, fingerprint: Optional[str]) -> None:
+        """
+        Record the installed files and the installation history of a finished node.
+
+        Args:
+            triplet: Target triplet specification
+            node_name: Library identifier with optional dependency type suffix
+            config: Library configuration dictionary
+            installed_files: Installed paths relative to the library prefix
+            fingerprint: Build fingerprint the files were produced with
+        """
+        lib_name, _ = DependencyResolver.parse_dependency_name(node_name)
+        HistoryManager.save_file_list(triplet, lib_name, installed_files)
+        # Maintain the path -> library index and warn about overwritten files
+        collisions = OwnershipIndex.update(triplet, lib_name, installed_files)
+        for file_path, owners in sorted(collisions.items()):
+            RichLogger.warning(f"[[bold cyan]{node_name}[/bold cyan]] File [bold yellow]{file_path}[/bold yellow] "
+                               f"is also installed by [bold magenta]{', '.join(owners)}[/bold magenta]")
+        version = config.get('version', 'unknown')
+        HistoryManager.add_record(triplet, node_name, version, fingerprint)
+
+    @staticmethod
+    def _should_build(triplet: str, node_name: str, config: Dict, fingerprint: Optional[str] = None) -> bool:
         """
         Determine whether a library requires rebuilding based on multiple factors.
 
+        Port files and dependencies are compared through the build fingerprint stored
+        with the installation record. Records written before fingerprints existed fall
+        back to the previous timestamp comparison once and are then upgraded.
+
         Args:
             triplet: Target triplet for build compatibility checking
             node_name: Library identifier with dependency type specification
             config: Library configuration containing source and version information
+            fingerprint: Current build fingerprint of the node, if it could be computed
         """
         # Parse node name to get library name and dependency type
         lib_name, dep_type = DependencyResolver.parse_dependency_name(node_name)
@@ -125,16 +199,14 @@ class BuildManager:
             RichLogger.debug(f"[[bold cyan]{node_name}[/bold cyan]] Build required: no build timestamp")
             return True
 
-        # Check for any file changes in the port directory
-        lib_dir = ROOT_DIR / 'ports' / lib_name
-        if lib_dir.exists():
-            # Walk through all files in the port directory
-            for file_path in lib_dir.rglob('*'):
-                if file_path.is_file():
-                    file_mtime = file_path.stat().st_mtime
-                    if file_mtime > lib_built.timestamp():
-                        RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Build required: file {file_path.relative_to(lib_dir)} modified")
-                        return True
+        # Compare port content and dependency fingerprints in a single hash comparison
+        stored_fingerprint = lib_info.get('fingerprint')
+        if stored_fingerprint and fingerprint:
+            if stored_fingerprint != fingerprint:
+                RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Build required: port files or dependencies changed")
+                return True
+        elif BuildManager._changed_since_build(triplet, node_name, lib_built):
+            return True
 
         # Check for source code updates (for git repositories)
         if SourceManager.is_git_url(config.get('url', '')):
@@ -148,6 +220,38 @@ class BuildManager:
                     RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Build required: source code updated")
                     return True
 
+        # Upgrade records written before fingerprints were stored
+        if fingerprint and not stored_fingerprint:
+            HistoryManager.set_fingerprint(triplet, node_name, fingerprint)
+
+        return False
+
+    @staticmethod
+    def _changed_since_build(triplet: str, node_name: str, lib_built: datetime) -> bool:
+        """
+        Timestamp based rebuild check for records that carry no build fingerprint.
+
+        Args:
+            triplet: Target triplet for dependency record lookups
+            node_name: Library identifier with dependency type specification
+            lib_built: Time the node was last built
+
+        Returns:
+            bool: True if a port file or a dependency is newer than the last build
+        """
+        lib_name, dep_type = DependencyResolver.parse_dependency_name(node_name)
+
+        # Check for any file changes in the port directory
+        lib_dir = ROOT_DIR / 'ports' / lib_name
+        if lib_dir.exists():
+            # Walk through all files in the port directory
+            for file_path in lib_dir.rglob('*'):
+                if file_path.is_file():
+                    file_mtime = file_path.stat().st_mtime
+                    if file_mtime > lib_built.timestamp():
+                        RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Build required: file {file_path.relative_to(lib_dir)} modified")
+                        return True
+
         # Check all dependencies for rebuild requirements
         deps = DependencyResolver.get_dependencies(lib_name, dep_type)
 
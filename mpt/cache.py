@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import io
+import json
+import os
+import tarfile
+import uuid
+
+from pathlib import Path
+from typing import List, Optional
+
+import zstandard as zstd
+
+from mpt import ROOT_DIR
+from mpt.archive import ArchiveHandler
+from mpt.config import UserConfig
+from mpt.file import FileUtils
+from mpt.log import RichLogger
+from mpt.uninstall import UninstallManager
+
+
+class BinaryCache:
+    """
+    Local or shared cache of installed build artifacts keyed by build fingerprint.
+
+    After a successful build the files recorded for a library are packed into a
+    Zstandard compressed tarball named after the node's build fingerprint (see
+    BuildFingerprint). A later install of a node with the same fingerprint restores
+    the tarball into the prefix instead of running the build script.
+
+    The cache is disabled unless the 'binary_cache' key in settings.yaml enables it:
+    'binary_cache: true' uses <root>/binarycache, and a path selects another
+    directory, for example a network share used by several build agents. Every
+    build is packed when the cache is enabled, so very large ports take space
+    accordingly.
+
+    A restore is extracted into a temporary directory next to the prefix first, so
+    a damaged archive never leaves a partial installation behind. Only then are the
+    files of the previous installation removed and the new files moved into place.
+    """
+
+    ARCHIVE_SUFFIX = '.tar.zst'
+    MANIFEST_NAME = '.mpt-manifest.json'
+    COMPRESSION_LEVEL = 10
+
+    @staticmethod
+    def get_cache_dir() -> Optional[Path]:
+        """
+        Resolve the binary cache directory from user settings.
+
+        Returns:
+            Path: Cache directory, or None if the binary cache is disabled
+        """
+        setting = UserConfig.load().get('binary_cache', False)
+        if not setting or (isinstance(setting, str) and setting.lower() in ('false', 'off', 'no')):
+            return None
+        if isinstance(setting, str) and setting.lower() not in ('true', 'on', 'yes'):
+            return Path(setting)
+        return ROOT_DIR / 'binarycache'
+
+    @staticmethod
+    def _get_archive_path(cache_dir: Path, fingerprint: str) -> Path:
+        """
+        Compute the cache location of the archive for a fingerprint.
+
+        Args:
+            cache_dir: Binary cache directory
+            fingerprint: Build fingerprint of the node
+
+        Returns:
+            Path: <cache_dir>/<first two digits>/<fingerprint>.tar.zst
+        """
+        return cache_dir / fingerprint[:2] / f"{fingerprint}{BinaryCache.ARCHIVE_SUFFIX}"
+
+    @staticmethod
+    def contains(fingerprint: Optional[str]) -> bool:
+        """
+        Check whether the binary cache holds an entry for a fingerprint.
+
+        Args:
+            fingerprint: Build fingerprint of a node
+
+        Returns:
+            bool: True if the cache is enabled and has an archive for the fingerprint
+        """
+        cache_dir = BinaryCache.get_cache_dir()
+        if not cache_dir or not fingerprint:
+            return False
+        return BinaryCache._get_archive_path(cache_dir, fingerprint).exists()
+
+    @staticmethod
+    def store(node_name: str, fingerprint: str, prefix: Path, files: List[str]) -> bool:
+        """
+        Pack the installed files of a node into the binary cache.
+
+        Args:
+            node_name: Library identifier with optional dependency type suffix
+            fingerprint: Build fingerprint of the node
+            prefix: Installation prefix the files are relative to
+            files: Installed paths relative to the prefix
+
+        Returns:
+            bool: True if the archive was stored or already present, False on error
+        """
+        cache_dir = BinaryCache.get_cache_dir()
+        if not cache_dir or not fingerprint:
+            return False
+
+        archive_path = BinaryCache._get_archive_path(cache_dir, fingerprint)
+        if archive_path.exists():
+            RichLogger.debug(f"[[bold cyan]{node_name}[/bold cyan]] Binary cache entry already exists")
+            return True
+
+        # Unique temporary name so concurrent agents never write the same file
+        temp_path = archive_path.with_name(f"{archive_path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            manifest = json.dumps({'node': node_name, 'files': sorted(files)}, indent=2).encode('utf-8')
+            packed = 0
+
+            cctx = zstd.ZstdCompressor(level=BinaryCache.COMPRESSION_LEVEL, threads=-1)
+            with open(temp_path, 'wb') as fh, cctx.stream_writer(fh) as writer:
+                with tarfile.open(fileobj=writer, mode='w|', format=tarfile.PAX_FORMAT) as tar:
+                    info = tarfile.TarInfo(BinaryCache.MANIFEST_NAME)
+                    info.size = len(manifest)
+                    tar.addfile(info, fileobj=io.BytesIO(manifest))
+                    for file_path in sorted(files):
+                        source = prefix / file_path
+                        if not source.exists() and not source.is_symlink():
+                            continue
+                        tar.add(str(source), arcname=file_path, recursive=False)
+                        packed += 1
+
+            os.replace(temp_path, archive_path)
+            RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Stored [bold yellow]{packed}[/bold yellow] files "
+                            f"in binary cache [bold green]{archive_path}[/bold green]")
+            return True
+        except Exception as e:
+            RichLogger.exception(f"[[bold cyan]{node_name}[/bold cyan]] Failed to store binary cache entry: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    @staticmethod
+    def restore(node_name: str, fingerprint: str, prefix: Path,
+                previous_files: Optional[List[str]] = None) -> Optional[List[str]]:
+        """
+        Restore the installed files of a node from the binary cache.
+
+        The caller must keep other builds from installing into the prefix meanwhile.
+
+        Args:
+            node_name: Library identifier with optional dependency type suffix
+            fingerprint: Build fingerprint of the node
+            prefix: Installation prefix to restore the files into
+            previous_files: Files recorded for the installation being replaced, relative
+                            to the prefix; those not in the cache entry are removed
+
+        Returns:
+            list: Restored paths relative to the prefix, or None on cache miss or error
+        """
+        cache_dir = BinaryCache.get_cache_dir()
+        if not cache_dir or not fingerprint:
+            return None
+
+        archive_path = BinaryCache._get_archive_path(cache_dir, fingerprint)
+        if not archive_path.exists():
+            RichLogger.debug(f"[[bold cyan]{node_name}[/bold cyan]] Binary cache miss for [bold yellow]{fingerprint[:12]}[/bold yellow]")
+            return None
+
+        # Same volume as the prefix, so the files can be renamed into place
+        staging_dir = prefix.parent / f".{prefix.name}.{uuid.uuid4().hex}.restore"
+        try:
+            files = BinaryCache._extract(archive_path, staging_dir)
+
+            # Remove what the previous installation left that the new one does not provide
+            if previous_files:
+                stale = {prefix / path for path in previous_files} - {prefix / path for path in files}
+                UninstallManager.remove_paths(prefix, stale)
+
+            BinaryCache._move_into_place(staging_dir, prefix)
+            RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Restored [bold yellow]{len(files)}[/bold yellow] files "
+                            f"from binary cache [bold green]{archive_path}[/bold green]")
+            return files
+        except Exception as e:
+            RichLogger.exception(f"[[bold cyan]{node_name}[/bold cyan]] Failed to restore binary cache entry: {e}")
+            return None
+        finally:
+            if staging_dir.exists():
+                FileUtils.delete_directory(staging_dir, permanent=True)
+
+    @staticmethod
+    def _extract(archive_path: Path, target_dir: Path) -> List[str]:
+        """
+        Extract a cache entry into an empty directory.
+
+        Args:
+            archive_path: Cache entry to extract
+            target_dir: Directory to create and extract into
+
+        Returns:
+            list: Paths recorded in the manifest of the entry
+        """
+        files = []
+        extract_kwargs = {'filter': 'tar'} if hasattr(tarfile, 'tar_filter') else {}
+        dctx = zstd.ZstdDecompressor()
+        target_dir.mkdir(parents=True)
+        with open(archive_path, 'rb') as fh, dctx.stream_reader(fh) as reader:
+            with tarfile.open(fileobj=reader, mode='r|') as tar:
+                for member in tar:
+                    member_path = member.name.replace('\\', '/')
+                    if member_path == BinaryCache.MANIFEST_NAME:
+                        manifest = json.loads(tar.extractfile(member).read().decode('utf-8'))
+                        files = manifest.get('files', [])
+                        continue
+                    if ArchiveHandler.is_unsafe_path(member_path):
+                        RichLogger.warning(f"Skipping unsafe path in binary cache entry: [bold yellow]{member_path}[/bold yellow]")
+                        continue
+                    tar.extract(member, path=str(target_dir), **extract_kwargs)
+        return files
+
+    @staticmethod
+    def _move_into_place(staging_dir: Path, prefix: Path) -> None:
+        """
+        Move extracted files from the staging directory into the prefix.
+
+        Existing files are replaced, existing directories are merged.
+
+        Args:
+            staging_dir: Directory the cache entry was extracted into
+            prefix: Installation prefix
+        """
+        prefix.mkdir(parents=True, exist_ok=True)
+        for root, dirs, names in os.walk(staging_dir):
+            relative = Path(root).relative_to(staging_dir)
+            for name in list(dirs):
+                source = Path(root) / name
+                if source.is_symlink():
+                    # Links to directories are moved like files
+                    names.append(name)
+                    dirs.remove(name)
+                else:
+                    (prefix / relative / name).mkdir(exist_ok=True)
+            for name in names:
+                target = prefix / relative / name
+                if target.is_symlink() or target.is_file():
+                    target.unlink()
+                os.replace(Path(root) / name, target)
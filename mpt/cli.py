@@ -12,7 +12,7 @@ from rich.table import Table
 from rich import box
 
 from mpt import ROOT_DIR
-from mpt.config import LibraryConfig
+from mpt.index import PortIndex
 from mpt.help import CommandLineHelp
 from mpt.log import RichLogger
 from mpt.view import RichPanel
@@ -28,7 +28,7 @@ class CommandLineParser:
     """
 
     @staticmethod
-    def parse_arguments() -> Tuple[str, str, List[str], Dict[str, str]]:
+    def parse_arguments() -> Tuple[str, str, List[str], Dict[str, str], Dict[str, object]]:
         """
         Parse and validate command line arguments for the MSVC Package Tool.
 
@@ -41,8 +41,9 @@ class CommandLineParser:
             Tuple containing parsed and validated arguments:
             - architecture: Target architecture specification ('x64' or 'x86')
             - action: Requested operation ('install', 'uninstall', 'list', etc.)
-            - libraries: List of library names to process
+            - libraries: List of library names to process (installed paths for 'owns')
             - lib_prefixes: Dictionary of library-specific prefix paths
+            - build_options: Dictionary of build scheduling options ('jobs', 'keep_going')
 
         Raises:
             SystemExit: Terminates application with appropriate exit code on
@@ -55,12 +56,16 @@ class CommandLineParser:
             CommandLineHelp.display_help()
             sys.exit(0)
         action = CommandLineParser._determine_action(args)
-        # Skip library validation for 'add' action
-        if action == 'add' or action == 'remove':
+        # Skip library validation for 'add' action and for paths given to 'owns'
+        if action == 'add' or action == 'remove' or action == 'owns':
             libraries = args.libraries
         else:
             libraries = CommandLineParser._validate_libraries(args.libraries)
-        return args.triplet, action, libraries, lib_prefixes
+        if args.jobs < 1:
+            RichLogger.error(f"Invalid number of jobs: {args.jobs}")
+            sys.exit(1)
+        build_options = {'jobs': args.jobs, 'keep_going': args.keep_going}
+        return args.triplet, action, libraries, lib_prefixes, build_options
 
     @staticmethod
     def _create_parser() -> argparse.ArgumentParser:
@@ -94,7 +99,8 @@ class CommandLineParser:
                 ('--fetch', 'Fetch source code for specified libraries or all libraries if none specified'),
                 ('--clean', 'Clean build artifacts for specified libraries or all libraries if none specified'),
                 ('--add', 'Add and configure a new library with automatic build system detection'),
-                ('--remove', 'Remove library configuration files')
+                ('--remove', 'Remove library configuration files'),
+                ('--owns', 'Show which installed libraries own the specified paths')
             ]
 
             for arg, help_text in actions:
@@ -106,6 +112,19 @@ class CommandLineParser:
                 help="Specify target triplet in format {arch}-{os} (default: x64-windows)"
             )
 
+            parser.add_argument(
+                '-j', '--jobs',
+                type=int,
+                default=1,
+                help="Number of dependency nodes to build in parallel (default: 1)"
+            )
+
+            parser.add_argument(
+                '--keep-going',
+                action='store_true',
+                help="Continue building independent libraries after a build failure"
+            )
+
             parser.add_argument(
                 '-h', '--help',
                 action='store_true',
@@ -196,7 +215,8 @@ class CommandLineParser:
                 'fetch': args.fetch,
                 'clean': args.clean,
                 'add': args.add,
-                'remove': args.remove
+                'remove': args.remove,
+                'owns': args.owns
             }
 
             for action, flag in action_mapping.items():
@@ -229,7 +249,7 @@ class CommandLineParser:
                        error message with available options
         """
         try:
-            all_libs = list(LibraryConfig.load_all().keys())
+            all_libs = PortIndex.names()
             libraries = requested_libs or all_libs
 
             if not libraries:
@@ -2,7 +2,9 @@
 #
 #  Copyright (c) 2024 Jianshan Jiang
 #
+import copy
 import os
+import threading
 import yaml
 from importlib import resources
 from pathlib import Path
@@ -127,10 +129,20 @@ class LibraryConfig:
     Handles the loading and management of library-specific configuration files
     located in the ports directory. Supports both individual library configuration
     access and bulk loading of all available library configurations.
+
+    Parsed configurations are memoized for the lifetime of the process and keyed by
+    the modification time and size of config.yaml, so an edited file is re-parsed
+    automatically while unchanged files are only parsed once.
     """
 
-    @staticmethod
-    def load(lib: str) -> Optional[Dict[str, Any]]:
+    # Process-wide configuration cache: library name -> (mtime_ns, size, config)
+    _cache: Dict[str, tuple] = {}
+    _cache_hits = 0
+    _cache_misses = 0
+    _cache_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, lib: str) -> Optional[Dict[str, Any]]:
         """
         Load configuration for a specific library from its port directory.
 
@@ -138,6 +150,10 @@ class LibraryConfig:
         access to build instructions, dependency information, and library metadata.
         Handles missing or malformed configuration files with appropriate error logging.
 
+        Repeated calls are served from the in-process cache as long as the file's
+        modification time and size are unchanged. Each call returns an independent
+        copy, so callers may modify the result freely.
+
         Args:
             lib: Name of the library whose configuration should be loaded
 
@@ -146,7 +162,25 @@ class LibraryConfig:
         """
         try:
             config_path = ROOT_DIR / 'ports' / lib / 'config.yaml'
-            return YamlUtils.load(config_path, f"{lib}")
+            try:
+                stat = config_path.stat()
+            except OSError:
+                # Let YamlUtils report the missing file
+                cls.invalidate(lib)
+                return YamlUtils.load(config_path, f"{lib}")
+
+            with cls._cache_lock:
+                entry = cls._cache.get(lib)
+                if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                    cls._cache_hits += 1
+                    return copy.deepcopy(entry[2])
+                cls._cache_misses += 1
+
+            config = YamlUtils.load(config_path, f"{lib}")
+            if config is not None:
+                with cls._cache_lock:
+                    cls._cache[lib] = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(config))
+            return config
         except Exception as e:
             RichLogger.exception(
                 f"Unexpected error loading configuration for library [bold red]{lib}[/bold red]. "
@@ -154,6 +188,35 @@ class LibraryConfig:
             )
             return None
 
+    @classmethod
+    def invalidate(cls, lib: Optional[str] = None) -> None:
+        """
+        Drop cached configurations so that the next load re-reads config.yaml.
+
+        Args:
+            lib: Name of the library to invalidate, or None to clear the whole cache
+        """
+        with cls._cache_lock:
+            if lib is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(lib, None)
+
+    @classmethod
+    def cache_stats(cls) -> Dict[str, int]:
+        """
+        Report the usage counters of the configuration cache.
+
+        Returns:
+            Dictionary with 'hits', 'misses' and 'entries' counts
+        """
+        with cls._cache_lock:
+            return {
+                'hits': cls._cache_hits,
+                'misses': cls._cache_misses,
+                'entries': len(cls._cache)
+            }
+
     @staticmethod
     def load_all() -> Dict[str, Dict[str, Any]]:
         """
@@ -215,6 +278,7 @@ class LibraryConfig:
         """
         try:
             config_path = ROOT_DIR / 'ports' / lib / 'config.yaml'
+            LibraryConfig.invalidate(lib)
             # Directly write the provided config data without merging
             return YamlUtils.dump(config_path, config_data, f"{lib} library configuration")
         except Exception as e:
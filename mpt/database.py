@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import sqlite3
+import threading
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from mpt import ROOT_DIR
+from mpt.log import RichLogger
+from mpt.yaml import YamlUtils
+
+
+class InstallDatabase:
+    """
+    Optional SQLite store for installation records and installed file ownership.
+
+    Replaces the per-triplet status.yaml and the per-library <lib>.list files with a
+    single database at installed/info/install.db when settings.yaml contains
+    'database: sqlite'. The database runs in WAL mode and indexes installed paths so
+    that ownership queries do not need to read every file list.
+
+    The first time a triplet is accessed, its existing status.yaml and .list files are
+    imported once. The old files are left in place but are no longer updated.
+    """
+
+    DB_FILE = ROOT_DIR / 'installed' / 'info' / 'install.db'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS records (
+            triplet TEXT NOT NULL,
+            node    TEXT NOT NULL,
+            version TEXT,
+            built   TEXT,
+            fingerprint TEXT,
+            PRIMARY KEY (triplet, node)
+        );
+        CREATE TABLE IF NOT EXISTS files (
+            triplet TEXT NOT NULL,
+            lib     TEXT NOT NULL,
+            path    TEXT NOT NULL,
+            PRIMARY KEY (triplet, lib, path)
+        );
+        CREATE INDEX IF NOT EXISTS files_by_path ON files (triplet, path);
+        CREATE TABLE IF NOT EXISTS migrations (
+            triplet  TEXT PRIMARY KEY,
+            migrated TEXT NOT NULL
+        );
+    """
+
+    _enabled: Optional[bool] = None
+    _connection: Optional[sqlite3.Connection] = None
+    _migrated = set()
+    _lock = threading.RLock()
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """
+        Check whether the SQLite backend was selected in settings.yaml.
+
+        Returns:
+            bool: True if 'database' is set to 'sqlite', False for the YAML/list file backend
+        """
+        if cls._enabled is None:
+            from mpt.config import UserConfig
+            backend = str(UserConfig.load().get('database', 'yaml') or 'yaml').lower()
+            cls._enabled = backend == 'sqlite'
+        return cls._enabled
+
+    @classmethod
+    def _connect(cls, triplet: str) -> sqlite3.Connection:
+        """
+        Open the shared connection on first use and migrate the triplet if required.
+
+        Args:
+            triplet: Target triplet whose legacy files should be imported
+
+        Returns:
+            sqlite3.Connection: Connection shared by all threads (guarded by the class lock)
+        """
+        if cls._connection is None:
+            cls.DB_FILE.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(cls.DB_FILE), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(cls.SCHEMA)
+            # Databases created before fingerprints were recorded lack the column
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(records)")}
+            if 'fingerprint' not in columns:
+                connection.execute("ALTER TABLE records ADD COLUMN fingerprint TEXT")
+            cls._connection = connection
+        if triplet not in cls._migrated:
+            cls._migrate(triplet)
+            cls._migrated.add(triplet)
+        return cls._connection
+
+    @classmethod
+    def _migrate(cls, triplet: str) -> None:
+        """
+        Import status.yaml and <lib>.list files of a triplet into the database once.
+
+        Args:
+            triplet: Target triplet identifier
+        """
+        connection = cls._connection
+        row = connection.execute("SELECT 1 FROM migrations WHERE triplet = ?", (triplet,)).fetchone()
+        if row:
+            return
+
+        info_dir = ROOT_DIR / 'installed' / 'info' / triplet
+        status_file = info_dir / 'status.yaml'
+        records = YamlUtils.load(status_file, "status.yaml") if status_file.exists() else {}
+        list_files = sorted(info_dir.glob('*.list')) if info_dir.exists() else []
+
+        with connection:
+            for node_name, record in (records or {}).items():
+                record = record or {}
+                connection.execute(
+                    "INSERT OR REPLACE INTO records (triplet, node, version, built, fingerprint) VALUES (?, ?, ?, ?, ?)",
+                    (triplet, node_name, cls._to_text(record.get('version')), cls._to_text(record.get('built')),
+                     record.get('fingerprint'))
+                )
+            for list_file in list_files:
+                lines = list_file.read_text(encoding='utf-8', errors='ignore').splitlines()
+                connection.executemany(
+                    "INSERT OR IGNORE INTO files (triplet, lib, path) VALUES (?, ?, ?)",
+                    [(triplet, list_file.stem, line.strip()) for line in lines if line.strip()]
+                )
+            connection.execute(
+                "INSERT INTO migrations (triplet, migrated) VALUES (?, ?)",
+                (triplet, datetime.now().isoformat())
+            )
+
+        RichLogger.info(f"Migrated [bold cyan]{len(records or {})}[/bold cyan] records and "
+                        f"[bold cyan]{len(list_files)}[/bold cyan] file lists of triplet "
+                        f"[magenta]{triplet}[/magenta] into [bold green]{cls.DB_FILE}[/bold green]")
+
+    @staticmethod
+    def _to_text(value) -> Optional[str]:
+        """
+        Convert a record value to its stored text form.
+
+        Args:
+            value: Version string, datetime or None
+
+        Returns:
+            str: ISO format for datetimes, str() for other values, or None
+        """
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+    @classmethod
+    def load_records(cls, triplet: str) -> Dict[str, Dict]:
+        """
+        Load all installation records of a triplet.
+
+        Args:
+            triplet: Target triplet identifier
+
+        Returns:
+            dict: Mapping of node name to {'version': str, 'built': datetime or None}
+                  plus 'fingerprint' when one was recorded
+        """
+        with cls._lock:
+            rows = cls._connect(triplet).execute(
+                "SELECT node, version, built, fingerprint FROM records WHERE triplet = ?", (triplet,)
+            ).fetchall()
+        records = {}
+        for node_name, version, built, fingerprint in rows:
+            records[node_name] = {
+                'version': version,
+                'built': datetime.fromisoformat(built) if built else None
+            }
+            if fingerprint:
+                records[node_name]['fingerprint'] = fingerprint
+        return records
+
+    @classmethod
+    def save_records(cls, triplet: str, records: Dict[str, Dict], nodes: Optional[Iterable[str]] = None) -> bool:
+        """
+        Store installation records of a triplet in one transaction.
+
+        Args:
+            triplet: Target triplet identifier
+            records: Mapping of node name to a record with 'version' and 'built'
+            nodes: Nodes to write; each is upserted from records, or deleted when it is no
+                   longer in records. None replaces every record of the triplet
+
+        Returns:
+            bool: True if the records were stored, False on database error
+        """
+        try:
+            with cls._lock:
+                connection = cls._connect(triplet)
+                with connection:
+                    if nodes is None:
+                        connection.execute("DELETE FROM records WHERE triplet = ?", (triplet,))
+                        nodes = records.keys()
+                    removed = [node_name for node_name in nodes if node_name not in records]
+                    connection.executemany(
+                        "DELETE FROM records WHERE triplet = ? AND node = ?",
+                        [(triplet, node_name) for node_name in removed]
+                    )
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO records (triplet, node, version, built, fingerprint) VALUES (?, ?, ?, ?, ?)",
+                        [(triplet, node_name, cls._to_text(records[node_name].get('version')),
+                          cls._to_text(records[node_name].get('built')), records[node_name].get('fingerprint'))
+                         for node_name in nodes if node_name in records]
+                    )
+            return True
+        except sqlite3.Error as e:
+            RichLogger.exception(f"Error saving installation records for triplet [magenta]{triplet}[/magenta]: {e}")
+            return False
+
+    @classmethod
+    def load_files(cls, triplet: str, lib: str) -> Optional[List[str]]:
+        """
+        Retrieve the installed files of a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            list: Installed paths relative to the library prefix, or None if nothing is recorded
+        """
+        with cls._lock:
+            rows = cls._connect(triplet).execute(
+                "SELECT path FROM files WHERE triplet = ? AND lib = ? ORDER BY path", (triplet, lib)
+            ).fetchall()
+        return [row[0] for row in rows] or None
+
+    @classmethod
+    def save_files(cls, triplet: str, lib: str, files: List[str]) -> bool:
+        """
+        Replace the installed file list of a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+            files: Installed paths relative to the library prefix
+
+        Returns:
+            bool: True if the file list was stored, False on database error
+        """
+        try:
+            with cls._lock:
+                connection = cls._connect(triplet)
+                with connection:
+                    connection.execute("DELETE FROM files WHERE triplet = ? AND lib = ?", (triplet, lib))
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO files (triplet, lib, path) VALUES (?, ?, ?)",
+                        [(triplet, lib, path) for path in files]
+                    )
+            return True
+        except sqlite3.Error as e:
+            RichLogger.exception(f"Error saving installed files of [bold cyan]{lib}[/bold cyan]: {e}")
+            return False
+
+    @classmethod
+    def delete_files(cls, triplet: str, lib: str) -> bool:
+        """
+        Forget the installed file list of a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            bool: True if the file list was removed, False on database error
+        """
+        return cls.save_files(triplet, lib, [])
+
+    @classmethod
+    def find_owners(cls, triplet: str, path: str) -> List[str]:
+        """
+        Find the libraries that installed a given path.
+
+        Args:
+            triplet: Target triplet identifier
+            path: Path relative to the install prefix, using forward slashes
+
+        Returns:
+            list: Sorted names of the owning libraries
+        """
+        with cls._lock:
+            rows = cls._connect(triplet).execute(
+                "SELECT DISTINCT lib FROM files WHERE triplet = ? AND path = ? ORDER BY lib", (triplet, path)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    @classmethod
+    def find_collisions(cls, triplet: str, lib: str) -> List[tuple]:
+        """
+        Find the recorded paths of a library that other libraries installed as well.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            list: (path, other library) pairs sorted by path
+        """
+        with cls._lock:
+            return cls._connect(triplet).execute(
+                "SELECT other.path, other.lib FROM files AS own JOIN files AS other "
+                "ON other.triplet = own.triplet AND other.path = own.path AND other.lib != own.lib "
+                "WHERE own.triplet = ? AND own.lib = ? ORDER BY other.path, other.lib", (triplet, lib)
+            ).fetchall()
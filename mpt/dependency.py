@@ -9,8 +9,10 @@ from pathlib import Path
 from rich.tree import Tree
 from rich.text import Text
 
-from mpt.config import LibraryConfig
+from mpt.index import PortIndex
 from mpt.log import RichLogger
+from mpt.prefetch import SourcePrefetcher
+from mpt.schedule import BuildScheduler
 from mpt.view import RichTable, RichPanel
 
 
@@ -63,7 +65,7 @@ class DependencyResolver:
             list: List of dependency specifications (e.g., ["dirent", "pcre:required"])
         """
         try:
-            config = LibraryConfig.load(lib_name)
+            config = PortIndex.get(lib_name)
             if not config:
                 RichLogger.error(f"[[bold cyan]{lib_name}[/bold cyan]] Failed to load library configuration")
                 return []
@@ -94,9 +96,26 @@ class DependencyResolver:
         Returns:
             dict: Dependency graph filtered by platform support
         """
+        return DependencyResolver.build_forest(triplet, [root])
+
+    @staticmethod
+    def build_forest(triplet, roots):
+        """
+        Construct one merged dependency graph for several root nodes with platform filtering.
+
+        Every node is visited once no matter how many roots depend on it, so shared
+        dependencies are loaded and expanded a single time.
+
+        Args:
+            triplet (str): Target triplet for platform filtering (e.g., "x64-windows")
+            roots (list): Root dependency specifications to start graph construction
+
+        Returns:
+            dict: Merged dependency graph filtered by platform support
+        """
         graph = {}
         visited = set()
-        queue = deque([root])
+        queue = deque(roots)
 
         try:
             # Extract OS from triplet (e.g., "windows" from "x64-windows")
@@ -114,7 +133,7 @@ class DependencyResolver:
 
                 # Check if library supports the target platform
                 if triplet and target_os:
-                    config = LibraryConfig.load(lib_name)
+                    config = PortIndex.get(lib_name)
                     if config:
                         supports = config.get('supports', [])
                         if supports and target_os not in supports:
@@ -129,11 +148,33 @@ class DependencyResolver:
                     if dep not in visited:
                         queue.append(dep)
         except Exception as e:
-            RichLogger.exception(f"Failed to build dependency tree for root '{root}': {str(e)}")
+            RichLogger.exception(f"Failed to build dependency tree for roots '{', '.join(roots)}': {str(e)}")
             raise
 
         return graph
 
+    @staticmethod
+    def reachable_nodes(root, graph):
+        """
+        Collect the nodes of a graph that a root node depends on, including the root itself.
+
+        Args:
+            root (str): Root node to start the walk from
+            graph (dict): Dependency graph, possibly merged from several roots
+
+        Returns:
+            set: Nodes reachable from the root that are present in the graph
+        """
+        nodes = set()
+        queue = deque([root])
+        while queue:
+            node_name = queue.popleft()
+            if node_name in nodes or node_name not in graph:
+                continue
+            nodes.add(node_name)
+            queue.extend(graph[node_name])
+        return nodes
+
     @staticmethod
     def topological_sort(root, graph):
         """
@@ -156,23 +197,7 @@ class DependencyResolver:
         try:
             ts = TopologicalSorter(graph)
             order = list(ts.static_order())
-
-            # Create order table
-            order_table = RichTable.create(
-                title=f"[[bold cyan]{root}[/bold cyan]] Topological Order",
-                show_header=True,
-                header_style="bold cyan"
-            )
-            RichTable.add_column(order_table, "Step", style="cyan", justify="right", no_wrap=True)
-            RichTable.add_column(order_table, "Library", style="bold yellow")
-
-            # Add rows
-            for i, node in enumerate(order, 1):
-                RichTable.add_row(order_table, str(i), node)
-
-            # Render table
-            RichTable.render(order_table)
-
+            DependencyResolver.render_order(root, order)
             return order
         except CycleError as e:
             RichLogger.exception(f"[[bold cyan]{root}[/bold cyan]] Cycle detected: {str(e)}")
@@ -181,6 +206,30 @@ class DependencyResolver:
             RichLogger.exception(f"Failed to perform topological sort for root '{root}': {str(e)}")
             raise
 
+    @staticmethod
+    def render_order(root, order):
+        """
+        Display the topological processing order of a root node as a table.
+
+        Args:
+            root (str): Root library name for table labeling
+            order (list): Topologically sorted node names
+        """
+        order_table = RichTable.create(
+            title=f"[[bold cyan]{root}[/bold cyan]] Topological Order",
+            show_header=True,
+            header_style="bold cyan"
+        )
+        RichTable.add_column(order_table, "Step", style="cyan", justify="right", no_wrap=True)
+        RichTable.add_column(order_table, "Library", style="bold yellow")
+
+        # Add rows
+        for i, node in enumerate(order, 1):
+            RichTable.add_row(order_table, str(i), node)
+
+        # Render table
+        RichTable.render(order_table)
+
     @staticmethod
     def render_tree(root, graph):
         """
@@ -236,7 +285,7 @@ class DependencyResolver:
             RichLogger.exception(f"Failed to render dependency tree for root '{root}': {str(e)}")
 
     @staticmethod
-    def resolve(triplet, root, build=False):
+    def resolve(triplet, root, build=False, jobs=1, keep_going=False, build_results=None):
         """
         Complete dependency resolution process with optional build execution.
 
@@ -244,6 +293,9 @@ class DependencyResolver:
             triplet: Target triplet (e.g., x64-windows) for any build operations
             root (str): Root library specification to resolve dependencies for
             build (bool): If True, execute build process for resolved dependencies
+            jobs (int): Maximum number of dependency nodes built concurrently
+            keep_going (bool): If True, keep building independent nodes after a failure
+            build_results (dict, optional): Receives the per-node results of the build scheduler
         """
         try:
             # Build dependency tree for the root
@@ -252,18 +304,18 @@ class DependencyResolver:
             order = DependencyResolver.topological_sort(root, graph)
 
             if build:
-                for node_name in order:
-                    lib_name, dep_type = DependencyResolver.parse_dependency_name(node_name)
-                    config = LibraryConfig.load(lib_name)
-                    if not config:
-                        RichLogger.error(f"[[bold cyan]{root}[/bold cyan]] Failed to load configuration for [bold cyan]{lib_name}[/bold cyan]")
-                        return False
-
-                    from mpt.build import BuildManager
-                    success = BuildManager.build_library(triplet, node_name, config)
-                    if not success:
-                        RichLogger.error(f"[[bold cyan]{root}[/bold cyan]] Build failed for [bold cyan]{node_name}[/bold cyan]")
-                        return False
+                # Fetch sources in the background while earlier nodes are being built
+                libs = SourcePrefetcher.select_libraries(triplet, order)
+                with SourcePrefetcher(libs):
+                    scheduler = BuildScheduler(triplet, graph, jobs=jobs, keep_going=keep_going)
+                    results = scheduler.run()
+                if build_results is not None:
+                    build_results.update(results)
+
+                failed = [node for node in order if results[node]['status'] != BuildScheduler.STATUS_BUILT]
+                if failed:
+                    RichLogger.error(f"[[bold cyan]{root}[/bold cyan]] Build failed for [bold cyan]{', '.join(failed)}[/bold cyan]")
+                    return False
 
             return True
         except CycleError as e:
@@ -272,3 +324,85 @@ class DependencyResolver:
         except Exception as e:
             RichLogger.exception(f"[[bold cyan]{root}[/bold cyan]] Dependency resolution failed: {str(e)}")
             return False
+
+    @staticmethod
+    def resolve_many(triplet, roots, build=False, jobs=1, keep_going=False, build_results=None):
+        """
+        Resolve several root libraries through one merged dependency graph.
+
+        The merged graph is built, sorted and (optionally) executed once, so a
+        dependency shared by many roots is expanded, checked and built a single
+        time. Per-root dependency trees and topological orders are derived from
+        the merged graph for display. A dependency cycle or resolution error only
+        fails the roots it affects, and without keep_going a build failure only
+        stops the roots that need the failed node; unrelated roots are still built.
+
+        Args:
+            triplet: Target triplet (e.g., x64-windows) for any build operations
+            roots (list): Root library specifications to resolve dependencies for
+            build (bool): If True, execute build process for resolved dependencies
+            jobs (int): Maximum number of dependency nodes built concurrently
+            keep_going (bool): If True, keep building every independent node after a failure,
+                               including the other nodes of the failed root
+            build_results (dict, optional): Receives the per-node results of the build scheduler
+
+        Returns:
+            dict: Mapping of each root to True if it and all of its dependencies resolved
+                  (and built, when requested) successfully, False otherwise
+        """
+        root_status = {root: False for root in roots}
+        unresolved = set()
+        try:
+            graph = DependencyResolver.build_forest(triplet, roots)
+        except Exception:
+            # Build the graph root by root so that only the roots that fail to resolve are dropped
+            graph = {}
+            for root in roots:
+                try:
+                    graph.update(DependencyResolver.build_forest(triplet, [root]))
+                except Exception:
+                    unresolved.add(root)
+
+        try:
+            root_nodes = {}
+            for root in roots:
+                if root in unresolved:
+                    continue
+                nodes = DependencyResolver.reachable_nodes(root, graph)
+                try:
+                    order = list(TopologicalSorter({node: graph[node] for node in nodes}).static_order())
+                except CycleError as e:
+                    RichLogger.error(f"Cycle detected during resolution of [bold cyan]{root}[/bold cyan]: {str(e)}")
+                    continue
+                root_nodes[root] = nodes
+                DependencyResolver.render_tree(root, graph)
+                DependencyResolver.render_order(root, [node for node in order if node in nodes])
+
+            if not build:
+                return {root: root in root_nodes for root in roots}
+            if not root_nodes:
+                return root_status
+
+            # Only the nodes of roots that resolved are scheduled
+            graph = {node: graph[node] for nodes in root_nodes.values() for node in nodes}
+            merged_order = list(TopologicalSorter(graph).static_order())
+
+            # Fetch sources in the background while earlier nodes are being built
+            libs = SourcePrefetcher.select_libraries(triplet, merged_order)
+            with SourcePrefetcher(libs):
+                scheduler = BuildScheduler(triplet, graph, jobs=jobs, keep_going=keep_going, groups=root_nodes)
+                results = scheduler.run()
+            if build_results is not None:
+                build_results.update(results)
+
+            for root, nodes in root_nodes.items():
+                failed = [node for node in merged_order
+                          if node in nodes and results[node]['status'] != BuildScheduler.STATUS_BUILT]
+                if failed:
+                    RichLogger.error(f"[[bold cyan]{root}[/bold cyan]] Build failed for [bold cyan]{', '.join(failed)}[/bold cyan]")
+                else:
+                    root_status[root] = True
+            return root_status
+        except Exception as e:
+            RichLogger.exception(f"Dependency resolution failed for [bold cyan]{', '.join(roots)}[/bold cyan]: {str(e)}")
+            return root_status
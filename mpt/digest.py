@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import json
+import os
+import threading
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from mpt.file import FileUtils
+from mpt.log import RichLogger
+
+
+class DigestCache:
+    """
+    Persistent cache of verified file digests.
+
+    Each directory that holds hashed files (normally downloads/) gets a sidecar
+    file .sha256-cache.json mapping file names to their SHA-256 digest together with
+    the size, modification time and inode observed when the digest was computed.
+    As long as these still match, the digest is returned without reading the file,
+    so verifying hundreds of unchanged archives costs one stat call each. Any change
+    to the file invalidates its entry and the file is hashed again.
+    """
+
+    CACHE_NAME = '.sha256-cache.json'
+    CACHE_VERSION = 1
+
+    # In-memory caches per directory: file name -> entry
+    _caches: Dict[str, Dict[str, dict]] = {}
+    _lock = threading.RLock()
+
+    @staticmethod
+    def _get_signature(file_path: Path) -> dict:
+        """
+        Collect the file attributes an entry is validated against.
+
+        Args:
+            file_path: Path of the hashed file
+
+        Returns:
+            dict: Size, modification time in nanoseconds and inode of the file
+        """
+        stat = file_path.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'inode': stat.st_ino}
+
+    @classmethod
+    def _load(cls, directory: Path) -> Dict[str, dict]:
+        """
+        Load the cache of a directory, starting empty when it is missing or unreadable.
+
+        Args:
+            directory: Directory containing the hashed files
+
+        Returns:
+            dict: In-memory cache mapping file names to entries
+        """
+        key = str(directory)
+        with cls._lock:
+            cache = cls._caches.get(key)
+            if cache is not None:
+                return cache
+
+            cache = {}
+            cache_path = directory / cls.CACHE_NAME
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == cls.CACHE_VERSION:
+                    cache = data.get('files', {}) or {}
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                RichLogger.warning(f"Ignoring unreadable digest cache [bold yellow]{cache_path}[/bold yellow]: {e}")
+            cls._caches[key] = cache
+            return cache
+
+    @classmethod
+    def _save(cls, directory: Path) -> bool:
+        """
+        Atomically persist the cache of a directory.
+
+        Args:
+            directory: Directory containing the hashed files
+
+        Returns:
+            bool: True if the cache was written, False otherwise
+        """
+        cache_path = directory / cls.CACHE_NAME
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': cls.CACHE_VERSION, 'files': cls._caches.get(str(directory), {})}, f, indent=1)
+            os.replace(temp_path, cache_path)
+            return True
+        except Exception as e:
+            RichLogger.warning(f"Failed to write digest cache [bold yellow]{cache_path}[/bold yellow]: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return False
+
+    @classmethod
+    def lookup(cls, file_path: Path) -> Optional[str]:
+        """
+        Retrieve the cached digest of a file if the file is unchanged.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            str: Cached SHA-256 digest, or None if there is no valid entry
+        """
+        try:
+            signature = cls._get_signature(file_path)
+        except OSError:
+            return None
+        with cls._lock:
+            entry = cls._load(file_path.parent).get(file_path.name)
+        if entry and all(entry.get(field) == value for field, value in signature.items()):
+            return entry.get('sha256')
+        return None
+
+    @classmethod
+    def store(cls, file_path: Path, digest: str) -> None:
+        """
+        Record the digest of a file, e.g. one computed while downloading it.
+
+        Args:
+            file_path: Path of the file
+            digest: SHA-256 digest of the current file content
+        """
+        try:
+            entry = cls._get_signature(file_path)
+        except OSError:
+            return
+        entry['sha256'] = digest
+        with cls._lock:
+            cls._load(file_path.parent)[file_path.name] = entry
+            cls._save(file_path.parent)
+
+    @classmethod
+    def get_digest(cls, file_path: Path) -> Optional[str]:
+        """
+        Retrieve the SHA-256 digest of a file, hashing it only when the cached entry is stale.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            str: Hexadecimal SHA-256 digest, or None if the file could not be read
+        """
+        digest = cls.lookup(file_path)
+        if digest:
+            RichLogger.debug(f"Using cached digest for [bold cyan]{file_path.name}[/bold cyan]")
+            return digest
+        digest = FileUtils.calc_hash(file_path)
+        if digest:
+            cls.store(file_path, digest)
+        return digest
@@ -6,23 +6,25 @@ Provides comprehensive error handling and resume support for HTTP downloads.
 Copyright (c) 2024 Jianshan Jiang
 
 """
+import hashlib
 import os
 import random
 import requests
 import requests.exceptions
 import ssl
+import threading
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from requests.adapters import HTTPAdapter
 from rich.progress import Progress, TextColumn, BarColumn, DownloadColumn, TransferSpeedColumn, TimeRemainingColumn
 from rich.text import Text
 from urllib.parse import urlparse
-from urllib3.util.retry import Retry
 from urllib3.exceptions import InsecureRequestWarning
 
 from mpt.file import FileUtils
 from mpt.log import RichLogger
+from mpt.session import HttpSession
 from mpt.view import RichPanel, RichTable
 
 
@@ -41,15 +43,16 @@ class DownloadHandler:
 
     # Configuration constants
     MAX_RETRIES = 3
-    BACKOFF_FACTOR = 0.1
-    STATUS_FORCELIST = [408, 429, 500, 502, 503, 504]  # HTTP status codes that should trigger a retry
     CONNECT_TIMEOUT = 30  # Seconds for connection establishment
     READ_TIMEOUT = 60     # Seconds for server response
     CHUNK_SIZE = 8192 * 10  # 80KB chunks for efficient streaming
+    HASH_BUFFER_SIZE = 1024 * 1024  # 1MB reads when re-hashing a partial file on resume
+    SEGMENT_THRESHOLD = 32 * 1024 * 1024  # Files from this size on are downloaded in segments
+    SEGMENT_MIN_SIZE = 8 * 1024 * 1024    # Smallest byte range fetched by one connection
+    MAX_SEGMENTS = 8                      # Maximum number of concurrent connections per file
 
-    # Class variables to track download state across retries
-    _expected_size = None
-    _supports_partial = None
+    # Only one download at a time renders a progress bar (Rich allows a single live display)
+    _progress_lock = threading.Lock()
 
     @classmethod
     def _log_request_and_response(cls, response):
@@ -109,6 +112,21 @@ class DownloadHandler:
 
     @classmethod
     def download_file(cls, url, file_path, verify_ssl=False):
+        """
+        Download a file with retry and resume support.
+
+        Args:
+            url: Source URL for the file download
+            file_path: Local filesystem path where the downloaded file should be saved
+            verify_ssl: Boolean indicating whether to verify SSL certificates (default: False)
+
+        Returns:
+            bool: True if download completed successfully, False if all retry attempts failed
+        """
+        return cls.download_and_hash(url, file_path, verify_ssl) is not None
+
+    @classmethod
+    def download_and_hash(cls, url, file_path, verify_ssl=False):
         """
         Execute a robust file download with comprehensive error handling and resume support.
 
@@ -122,232 +140,348 @@ class DownloadHandler:
             verify_ssl: Boolean indicating whether to verify SSL certificates (default: False)
 
         Returns:
-            bool: True if download completed successfully, False if all retry attempts failed
+            str: SHA-256 digest of the complete file computed while it was written,
+                 or None if all retry attempts failed
 
         Algorithm:
-        1. Set up retry strategy with exponential backoff for transient failures
-        2. Create HTTP session with mounted adapters for both HTTP and HTTPS
+        1. Use the shared pooled session (retry strategy with exponential backoff for transient failures)
+        2. Reuse kept-alive connections to hosts contacted earlier in the run
         3. Make HTTP GET request with streaming and appropriate headers
         4. Handle different HTTP status codes (200 OK, 206 Partial Content)
         5. Support resuming interrupted downloads using Range headers
         6. Validate downloaded file size against expected content length
         7. Implement retry mechanism with increasing wait times between attempts
+        8. Hash the content as it is written; on resume only the existing prefix is re-read
+        9. Fetch large files in concurrent byte-range segments when the server allows it
         """
         # Ensure parent directory exists
         file_path.parent.mkdir(parents=True, exist_ok=True)
         success = False
+        hash_func = None
         retry_count = 0
 
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=cls.MAX_RETRIES,
-            backoff_factor=cls.BACKOFF_FACTOR,
-            status_forcelist=cls.STATUS_FORCELIST,
-            allowed_methods=["GET", "HEAD"],
-            respect_retry_after_header=True
-        )
+        # Use the process-wide pooled session so connections to the same host are reused
+        with HttpSession.use() as session:
+            # Download state tracked across retries (local so concurrent downloads do not interfere)
+            expected_size = None
+            supports_partial = None
+            show_progress = cls._progress_lock.acquire(blocking=False)
+            try:
+                # Large files from servers that accept byte ranges are fetched in segments
+                segmented_hash = None
+                if not file_path.exists():
+                    segmented_hash = cls._download_segmented(session, url, file_path, verify_ssl, show_progress)
+                    success = segmented_hash is not None
+
+                # Retry loop
+                while retry_count <= cls.MAX_RETRIES and not success:
+                    progress = None
+                    task = None
+                    RichLogger.debug(f"Attempt [bold cyan]{retry_count + 1}[/bold cyan] of "
+                                 f"[bold cyan]{cls.MAX_RETRIES + 1}[/bold cyan]")
+
+                    try:
+                        # Get current downloaded size before making request
+                        downloaded_size = cls._get_download_size(file_path)
+
+                        # Set up headers for request
+                        headers = cls._get_wget_headers()
+
+                        # Add Range header if we have partial content and server supports resume
+                        if downloaded_size > 0 and supports_partial:
+                            headers["Range"] = f"bytes={downloaded_size}-"
+                            if expected_size:
+                                headers["Range"] = f"bytes={downloaded_size}-{expected_size}"
+                            RichLogger.debug(f"Setting Range header: [bold cyan]{headers['Range']}[/bold cyan]")
+
+                        # Make HTTP GET request with streaming
+                        with session.get(
+                            url,
+                            headers=headers,
+                            stream=True,
+                            timeout=(cls.CONNECT_TIMEOUT, cls.READ_TIMEOUT),
+                            allow_redirects=True,
+                            verify=verify_ssl
+                        ) as response:
+                            # Log request/response details
+                            cls._log_request_and_response(response)
+
+                            # Update download state with response information
+                            expected_size = cls._get_expected_size(response)
+                            supports_partial = cls._is_partial(response)
+
+                            response.raise_for_status()
+                            """
+                            100: continue
+                            101: switching_protocols
+                            102: processing
+                            103: checkpoint
+                            122: uri_too_long, request_uri_too_long
+                            200: ok, okay, all_ok, all_okay, all_good
+                            201: created
+                            202: accepted
+                            203: non_authoritative_info, non_authoritative_information
+                            204: no_content
+                            205: reset_content, reset
+                            206: partial_content, partial
+                            207: multi_status, multiple_status, multi_stati, multiple_stati
+                            208: already_reported
+                            226: im_used
+                            300: multiple_choices
+                            301: moved_permanently, moved
+                            302: found
+                            303: see_other, other
+                            304: not_modified
+                            305: use_proxy
+                            306: switch_proxy
+                            307: temporary_redirect, temporary_moved, temporary
+                            308: permanent_redirect, resume_incomplete, resume
+                            400: bad_request, bad
+                            401: unauthorized
+                            402: payment_required, payment
+                            403: forbidden
+                            404: not_found
+                            405: method_not_allowed, not_allowed
+                            406: not_acceptable
+                            407: proxy_authentication_required, proxy_auth, proxy_authentication
+                            408: request_timeout, timeout
+                            409: conflict
+                            410: gone
+                            411: length_required
+                            412: precondition_failed, precondition
+                            413: request_entity_too_large
+                            414: request_uri_too_large
+                            415: unsupported_media_type, unsupported_media, media_type
+                            416: requested_range_not_satisfiable, requested_range, range_not_satisfiable
+                            417: expectation_failed
+                            418: im_a_teapot, teapot, i_am_a_teapot
+                            421: misdirected_request
+                            422: unprocessable_entity, unprocessable
+                            423: locked
+                            424: failed_dependency, dependency
+                            425: unordered_collection, unordered
+                            428: precondition_required, precondition
+                            431: header_fields_too_large, fields_too_large
+                            449: retry_with, retry
+                            451: unavailable_for_legal_reasons, legal_reasons
+                            500: internal_server_error, server_error
+                            502: bad_gateway
+                            504: gateway_timeout
+                            506: variant_also_negotiates
+                            509: bandwidth_limit_exceeded, bandwidth
+                            511: network_authentication_required, network_auth, network_authentication
+                            """
+                            # Get expected file size
+                            if expected_size:
+                                RichLogger.debug(f"Expected file size: "
+                                             f"[bold cyan]{cls._format_bytes(expected_size, plain=True)}[/bold cyan]")
+
+                            # Determine file mode based on response status
+                            file_mode = 'wb'
+                            if response.status_code == requests.codes.ok:
+                                if downloaded_size > 0:
+                                    RichLogger.debug(f"Restarting download from beginning. "
+                                                 f"Existing file size: [bold cyan]{downloaded_size}[/bold cyan] bytes")
+                                    FileUtils.delete_file(file_path)
+                                    # Reset downloaded size after deletion
+                                    downloaded_size = 0
+                            elif response.status_code == requests.codes.partial_content:
+                                RichLogger.debug(f"Resuming download from position: "
+                                             f"[bold cyan]{downloaded_size}[/bold cyan] bytes")
+                                file_mode = 'ab'
+                            else:
+                                RichLogger.warning(f"Unexpected status code: "
+                                               f"[bold cyan]{response.status_code}[/bold cyan]")
+                                retry_count += 1
+                                continue
+
+                            # Create progress bar with accurate starting position
+                            progress = cls._create_progress_bar(disable=not show_progress)
+                            task = progress.add_task(
+                                f"[bold blue]Downloading[/bold blue] [cyan]{Path(url).name}[/cyan]",
+                                total=expected_size,
+                                completed=downloaded_size  # Start from current downloaded position
+                            )
+                            progress.start()
+
+                            # Seed the digest with the bytes already on disk when resuming
+                            hash_func = cls._hash_prefix(file_path) if file_mode == 'ab' else hashlib.sha256()
+
+                            # Download content with progress tracking
+                            success = cls._get_content(
+                                response,
+                                file_path,
+                                file_mode,
+                                progress,
+                                task,
+                                downloaded_size,
+                                expected_size,
+                                hash_func
+                            )
+
+                            # Verify download size
+                            final_size = cls._get_download_size(file_path)
+                            if success:
+                                if expected_size and final_size != expected_size:
+                                    RichLogger.warning(f"Download incomplete: expected "
+                                                   f"[bold cyan]{expected_size}[/bold cyan], "
+                                                   f"got [bold cyan]{final_size}[/bold cyan]")
+                                    success = False
+                                    retry_count += 1
+                                else:
+                                    RichLogger.info("Download completed successfully")
+                                    break
+                            else:
+                                retry_count += 1
+
+                    except requests.exceptions.HTTPError as e:
+                        RichLogger.warning(f"HTTP Error: [bold cyan]{str(e)}[/bold cyan]")
+                        retry_count += 1
+                    except requests.exceptions.ConnectTimeout as e:
+                        RichLogger.warning(f"Connect Timeout Error: [bold cyan]{str(e)}[/bold cyan]")
+                        retry_count += 1
+                    except requests.exceptions.ConnectionError as e:
+                        RichLogger.warning(f"Connection Error: [bold cyan]{str(e)}[/bold cyan]")
+                        retry_count += 1
+                    except requests.exceptions.Timeout as e:
+                        RichLogger.warning(f"Timeout Error: [bold cyan]{str(e)}[/bold cyan]")
+                        retry_count += 1
+                    except requests.exceptions.RequestException as e:
+                        RichLogger.warning(f"Request Exception: [bold cyan]{str(e)}[/bold cyan]")
+                        retry_count += 1
+                    except Exception as e:
+                        RichLogger.error(f"Unexpected error during download attempt: {str(e)}")
+                        retry_count += 1
+                    finally:
+                        # Ensure progress bar is stopped after each attempt
+                        if progress:
+                            progress.stop()
+
+                    # Add wait time before next retry
+                    if retry_count <= cls.MAX_RETRIES and not success:
+                        wait_time = random.randint(2, 6)
+                        RichLogger.info(f"Retrying in [bold cyan]{wait_time}[/bold cyan] seconds "
+                                    f"(attempt [bold cyan]{retry_count}[/bold cyan]/"
+                                    f"[bold cyan]{cls.MAX_RETRIES}[/bold cyan])")
+                        time.sleep(wait_time)
+            finally:
+                if show_progress:
+                    cls._progress_lock.release()
+
+        if segmented_hash:
+            return segmented_hash
+        return hash_func.hexdigest() if success and hash_func else None
+
+    @classmethod
+    def _download_segmented(cls, session, url, file_path, verify_ssl, show_progress):
+        """
+        Download a large file as concurrent byte ranges into a preallocated file.
 
-        # Create HTTP adapter with retry strategy
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        The size and byte range support are queried with a HEAD request. Files
+        smaller than SEGMENT_THRESHOLD, or served without 'Accept-Ranges: bytes', are
+        left to the single-stream download. Each segment is fetched on its own
+        connection of the pooled session and written through its own file handle at
+        its offset in a '.part' file, which is renamed into place only when every
+        segment is complete, so an interrupted segmented download is never mistaken
+        for a finished file. Each segment retries and resumes from its last written
+        byte on its own.
 
-        with requests.Session() as session:
-            # Mount adapters for both HTTP and HTTPS
-            session.mount('http://', adapter)
-            session.mount('https://', adapter)
+        Segments complete out of order, so the SHA-256 digest cannot be computed while
+        writing; the finished file is hashed in one additional sequential read.
 
-            # Reset class variables for new download
-            cls._expected_size = None
-            cls._supports_partial = None
+        Args:
+            session: Pooled HTTP session of the calling thread (segment workers use their own)
+            url: Source URL for the file download
+            file_path: Local filesystem path where the downloaded file should be saved
+            verify_ssl: Boolean indicating whether to verify SSL certificates
+            show_progress: If True, render a progress bar
 
-            # Retry loop
-            while retry_count <= cls.MAX_RETRIES and not success:
-                progress = None
-                task = None
-                RichLogger.debug(f"Attempt [bold cyan]{retry_count + 1}[/bold cyan] of "
-                             f"[bold cyan]{cls.MAX_RETRIES + 1}[/bold cyan]")
+        Returns:
+            str: SHA-256 digest of the downloaded file, or None if segmented download
+                 is not applicable or failed (the caller then falls back to a single stream)
+        """
+        try:
+            with session.head(url, headers=cls._get_wget_headers(), allow_redirects=True,
+                              timeout=(cls.CONNECT_TIMEOUT, cls.READ_TIMEOUT), verify=verify_ssl) as response:
+                if response.status_code != requests.codes.ok:
+                    return None
+                total_size = cls._get_expected_size(response)
+                supports_partial = cls._is_partial(response)
+                # Fetch the segments from the final location instead of following redirects each time
+                target_url = response.url or url
+        except requests.exceptions.RequestException as e:
+            RichLogger.debug(f"Segmented download probe failed: [bold cyan]{str(e)}[/bold cyan]")
+            return None
+
+        if not supports_partial or not total_size or total_size < cls.SEGMENT_THRESHOLD:
+            return None
+
+        count = min(cls.MAX_SEGMENTS, -(-total_size // cls.SEGMENT_MIN_SIZE))
+        step = -(-total_size // count)
+        segments = [(start, min(start + step, total_size) - 1) for start in range(0, total_size, step)]
+        part_path = file_path.with_name(f"{file_path.name}.part")
+        RichLogger.info(f"Downloading [bold cyan]{cls._format_bytes(total_size, plain=True)}[/bold cyan] "
+                        f"in [bold cyan]{len(segments)}[/bold cyan] segments")
+
+        progress = cls._create_progress_bar(disable=not show_progress)
+        task = progress.add_task(f"[bold blue]Downloading[/bold blue] [cyan]{Path(url).name}[/cyan]", total=total_size)
+
+        def fetch_segment(segment):
+            start, end = segment
+            position = start
+            attempts = 0
+            with open(part_path, 'r+b') as file:
+                while position <= end:
+                    try:
+                        headers = cls._get_wget_headers()
+                        headers["Range"] = f"bytes={position}-{end}"
+                        with HttpSession.get().get(target_url, headers=headers, stream=True, allow_redirects=True,
+                                                   timeout=(cls.CONNECT_TIMEOUT, cls.READ_TIMEOUT),
+                                                   verify=verify_ssl) as response:
+                            content_range = response.headers.get('Content-Range', '')
+                            if (response.status_code != requests.codes.partial_content or
+                                    not content_range.startswith(f"bytes {position}-")):
+                                RichLogger.debug(f"Server ignored range [bold cyan]{headers['Range']}[/bold cyan]")
+                                return False
+                            file.seek(position)
+                            for chunk in response.raw.stream(cls.CHUNK_SIZE, decode_content=False):
+                                if not chunk:
+                                    continue
+                                chunk = chunk[:end + 1 - position]
+                                file.write(chunk)
+                                position += len(chunk)
+                                progress.advance(task, len(chunk))
+                                if position > end:
+                                    break
+                    except requests.exceptions.RequestException as e:
+                        RichLogger.debug(f"Segment {start}-{end} interrupted at {position}: [bold cyan]{str(e)}[/bold cyan]")
+                    if position <= end:
+                        attempts += 1
+                        if attempts > cls.MAX_RETRIES:
+                            return False
+                        time.sleep(random.randint(2, 6))
+            return True
 
-                try:
-                    # Get current downloaded size before making request
-                    downloaded_size = cls._get_download_size(file_path)
-
-                    # Set up headers for request
-                    headers = cls._get_wget_headers()
-
-                    # Add Range header if we have partial content and server supports resume
-                    if downloaded_size > 0 and cls._supports_partial:
-                        headers["Range"] = f"bytes={downloaded_size}-"
-                        if cls._expected_size:
-                            headers["Range"] = f"bytes={downloaded_size}-{cls._expected_size}"
-                        RichLogger.debug(f"Setting Range header: [bold cyan]{headers['Range']}[/bold cyan]")
-
-                    # Make HTTP GET request with streaming
-                    with session.get(
-                        url,
-                        headers=headers,
-                        stream=True,
-                        timeout=(cls.CONNECT_TIMEOUT, cls.READ_TIMEOUT),
-                        allow_redirects=True,
-                        verify=verify_ssl
-                    ) as response:
-                        # Log request/response details
-                        cls._log_request_and_response(response)
-
-                        # Update class variables with response information
-                        cls._expected_size = cls._get_expected_size(response)
-                        cls._supports_partial = cls._is_partial(response)
-
-                        response.raise_for_status()
-                        """
-                        100: continue
-                        101: switching_protocols
-                        102: processing
-                        103: checkpoint
-                        122: uri_too_long, request_uri_too_long
-                        200: ok, okay, all_ok, all_okay, all_good
-                        201: created
-                        202: accepted
-                        203: non_authoritative_info, non_authoritative_information
-                        204: no_content
-                        205: reset_content, reset
-                        206: partial_content, partial
-                        207: multi_status, multiple_status, multi_stati, multiple_stati
-                        208: already_reported
-                        226: im_used
-                        300: multiple_choices
-                        301: moved_permanently, moved
-                        302: found
-                        303: see_other, other
-                        304: not_modified
-                        305: use_proxy
-                        306: switch_proxy
-                        307: temporary_redirect, temporary_moved, temporary
-                        308: permanent_redirect, resume_incomplete, resume
-                        400: bad_request, bad
-                        401: unauthorized
-                        402: payment_required, payment
-                        403: forbidden
-                        404: not_found
-                        405: method_not_allowed, not_allowed
-                        406: not_acceptable
-                        407: proxy_authentication_required, proxy_auth, proxy_authentication
-                        408: request_timeout, timeout
-                        409: conflict
-                        410: gone
-                        411: length_required
-                        412: precondition_failed, precondition
-                        413: request_entity_too_large
-                        414: request_uri_too_large
-                        415: unsupported_media_type, unsupported_media, media_type
-                        416: requested_range_not_satisfiable, requested_range, range_not_satisfiable
-                        417: expectation_failed
-                        418: im_a_teapot, teapot, i_am_a_teapot
-                        421: misdirected_request
-                        422: unprocessable_entity, unprocessable
-                        423: locked
-                        424: failed_dependency, dependency
-                        425: unordered_collection, unordered
-                        428: precondition_required, precondition
-                        431: header_fields_too_large, fields_too_large
-                        449: retry_with, retry
-                        451: unavailable_for_legal_reasons, legal_reasons
-                        500: internal_server_error, server_error
-                        502: bad_gateway
-                        504: gateway_timeout
-                        506: variant_also_negotiates
-                        509: bandwidth_limit_exceeded, bandwidth
-                        511: network_authentication_required, network_auth, network_authentication
-                        """
-                        # Get expected file size
-                        if cls._expected_size:
-                            RichLogger.debug(f"Expected file size: "
-                                         f"[bold cyan]{cls._format_bytes(cls._expected_size, plain=True)}[/bold cyan]")
-
-                        # Determine file mode based on response status
-                        file_mode = 'wb'
-                        if response.status_code == requests.codes.ok:
-                            if downloaded_size > 0:
-                                RichLogger.debug(f"Restarting download from beginning. "
-                                             f"Existing file size: [bold cyan]{downloaded_size}[/bold cyan] bytes")
-                                FileUtils.delete_file(file_path)
-                                # Reset downloaded size after deletion
-                                downloaded_size = 0
-                        elif response.status_code == requests.codes.partial_content:
-                            RichLogger.debug(f"Resuming download from position: "
-                                         f"[bold cyan]{downloaded_size}[/bold cyan] bytes")
-                            file_mode = 'ab'
-                        else:
-                            RichLogger.warning(f"Unexpected status code: "
-                                           f"[bold cyan]{response.status_code}[/bold cyan]")
-                            retry_count += 1
-                            continue
-
-                        # Create progress bar with accurate starting position
-                        progress = cls._create_progress_bar()
-                        task = progress.add_task(
-                            f"[bold blue]Downloading[/bold blue] [cyan]{Path(url).name}[/cyan]",
-                            total=cls._expected_size,
-                            completed=downloaded_size  # Start from current downloaded position
-                        )
-                        progress.start()
-
-                        # Download content with progress tracking
-                        success = cls._get_content(
-                            response,
-                            file_path,
-                            file_mode,
-                            progress,
-                            task,
-                            downloaded_size,
-                            cls._expected_size
-                        )
-
-                        # Verify download size
-                        final_size = cls._get_download_size(file_path)
-                        if success:
-                            if cls._expected_size and final_size != cls._expected_size:
-                                RichLogger.warning(f"Download incomplete: expected "
-                                               f"[bold cyan]{cls._expected_size}[/bold cyan], "
-                                               f"got [bold cyan]{final_size}[/bold cyan]")
-                                success = False
-                                retry_count += 1
-                            else:
-                                RichLogger.info("Download completed successfully")
-                                break
-                        else:
-                            retry_count += 1
-
-                except requests.exceptions.HTTPError as e:
-                    RichLogger.warning(f"HTTP Error: [bold cyan]{str(e)}[/bold cyan]")
-                    retry_count += 1
-                except requests.exceptions.ConnectTimeout as e:
-                    RichLogger.warning(f"Connect Timeout Error: [bold cyan]{str(e)}[/bold cyan]")
-                    retry_count += 1
-                except requests.exceptions.ConnectionError as e:
-                    RichLogger.warning(f"Connection Error: [bold cyan]{str(e)}[/bold cyan]")
-                    retry_count += 1
-                except requests.exceptions.Timeout as e:
-                    RichLogger.warning(f"Timeout Error: [bold cyan]{str(e)}[/bold cyan]")
-                    retry_count += 1
-                except requests.exceptions.RequestException as e:
-                    RichLogger.warning(f"Request Exception: [bold cyan]{str(e)}[/bold cyan]")
-                    retry_count += 1
-                except Exception as e:
-                    RichLogger.error(f"Unexpected error during download attempt: {str(e)}")
-                    retry_count += 1
-                finally:
-                    # Ensure progress bar is stopped after each attempt
-                    if progress:
-                        progress.stop()
-
-                # Add wait time before next retry
-                if retry_count <= cls.MAX_RETRIES and not success:
-                    wait_time = random.randint(2, 6)
-                    RichLogger.info(f"Retrying in [bold cyan]{wait_time}[/bold cyan] seconds "
-                                f"(attempt [bold cyan]{retry_count}[/bold cyan]/"
-                                f"[bold cyan]{cls.MAX_RETRIES}[/bold cyan])")
-                    time.sleep(wait_time)
-
-        return success
+        success = False
+        try:
+            with open(part_path, 'wb') as file:
+                file.truncate(total_size)
+            progress.start()
+            with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix="mpt-segment") as executor:
+                success = all(executor.map(fetch_segment, segments))
+        except Exception as e:
+            RichLogger.warning(f"Segmented download failed: [bold cyan]{str(e)}[/bold cyan]")
+        finally:
+            progress.stop()
+
+        if not success:
+            RichLogger.warning("Segmented download failed, falling back to a single stream")
+            FileUtils.delete_file(part_path)
+            return None
+
+        os.replace(part_path, file_path)
+        RichLogger.info("Download completed successfully")
+        return FileUtils.calc_hash(file_path)
 
     @classmethod
     def _get_expected_size(cls, response):
@@ -450,7 +584,7 @@ class DownloadHandler:
         return 0
 
     @classmethod
-    def _get_content(cls, response, file_path, file_mode, progress, task, resume_position, expected_size):
+    def _get_content(cls, response, file_path, file_mode, progress, task, resume_position, expected_size, hash_func=None):
         """
         Stream and save HTTP response content with progress tracking and validation.
 
@@ -466,6 +600,7 @@ class DownloadHandler:
             task: Progress task identifier for updating the display
             resume_position: Byte position to resume downloading from
             expected_size: Expected total size of the complete file
+            hash_func: Optional hashlib object updated with every chunk written
 
         Returns:
             bool: True if content was successfully downloaded and saved, False otherwise
@@ -476,6 +611,8 @@ class DownloadHandler:
             for chunk in response.raw.stream(cls.CHUNK_SIZE, decode_content=False):
                 if chunk:
                     file.write(chunk)
+                    if hash_func is not None:
+                        hash_func.update(chunk)
                     downloaded += len(chunk)
                     # Update progress bar with accurate position
                     current_position = resume_position + downloaded
@@ -486,6 +623,23 @@ class DownloadHandler:
             progress.update(task, completed=expected_size)
         return True
 
+    @classmethod
+    def _hash_prefix(cls, file_path):
+        """
+        Hash the partially downloaded part of a file before resuming it.
+
+        Args:
+            file_path: Path to the partially downloaded file
+
+        Returns:
+            hashlib object: SHA-256 state covering the bytes already on disk
+        """
+        hash_func = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(cls.HASH_BUFFER_SIZE), b""):
+                hash_func.update(chunk)
+        return hash_func
+
     @classmethod
     def _get_wget_headers(cls):
         """
@@ -507,7 +661,7 @@ class DownloadHandler:
         return headers
 
     @classmethod
-    def _create_progress_bar(cls):
+    def _create_progress_bar(cls, disable=False):
         """
         Create a visually appealing progress bar for download tracking.
 
@@ -515,6 +669,9 @@ class DownloadHandler:
         that provides real-time feedback on download speed, progress percentage,
         and estimated time remaining.
 
+        Args:
+            disable: If True, create a progress object that renders nothing
+
         Returns:
             Progress: Configured Rich Progress object with download-specific columns
         """
@@ -531,7 +688,8 @@ class DownloadHandler:
             "•",
             TransferSpeedColumn(),
             expand=True,
-            transient=True
+            transient=True,
+            disable=disable
         )
 
     @classmethod
@@ -50,6 +50,9 @@ class FileUtils:
     challenging file system scenarios.
     """
 
+    # Read size used when hashing files
+    HASH_BUFFER_SIZE = 1024 * 1024
+
     @staticmethod
     def _move_to_recycle_bin(path):
         """
@@ -373,9 +376,15 @@ class FileUtils:
         """
         try:
             hash_func = getattr(hashlib, algorithm)()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_func.update(chunk)
+            # Read into one reusable large buffer instead of allocating small chunks
+            buffer = bytearray(FileUtils.HASH_BUFFER_SIZE)
+            view = memoryview(buffer)
+            with open(file_path, "rb", buffering=0) as f:
+                while True:
+                    size = f.readinto(buffer)
+                    if not size:
+                        break
+                    hash_func.update(view[:size])
             return hash_func.hexdigest()
         except (IOError, AttributeError, ValueError):
             return None
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import winreg
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from mpt import ROOT_DIR
+from mpt.config import UserConfig
+from mpt.file import FileUtils
+from mpt.log import RichLogger
+
+
+class BuildFingerprint:
+    """
+    Content-based fingerprints for rebuild detection.
+
+    A node fingerprint is a SHA-256 digest over everything that determines the result
+    of building a library node: the content of every file in its port directory
+    (config.yaml, build scripts, patches), the fingerprints recorded for its
+    dependencies, the triplet, the node name, the install prefixes that are passed
+    to the build environment, the toolchain set up by compiler.bat/compiler.sh and,
+    for git sources, the checked-out commit. Comparing
+    the stored fingerprint with a freshly computed one replaces the modification time
+    scans, so touching files or checking out the ports tree does not trigger rebuilds
+    while any real content change does.
+    """
+
+    # Bump when the fingerprint inputs change to invalidate all stored fingerprints
+    FORMAT_VERSION = 2
+
+    # Environment variables read by the compiler, the linker or compiler.bat/compiler.sh
+    TOOLCHAIN_VARIABLES = ('CL', '_CL_', 'LINK', '_LINK_', 'INCLUDE', 'LIB', 'LIBPATH', 'VSINSTALLDIR', 'CUDA_PATH')
+
+    # File content digests memoized by (path, mtime_ns, size)
+    _file_digests: Dict[tuple, str] = {}
+    _toolchain: Optional[Dict[str, str]] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def hash_file(cls, file_path: Path) -> str:
+        """
+        Compute the SHA-256 digest of a file, reusing earlier results for unchanged files.
+
+        Args:
+            file_path: Path of the file to hash
+
+        Returns:
+            str: Hexadecimal SHA-256 digest of the file content
+        """
+        stat = file_path.stat()
+        key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        with cls._lock:
+            digest = cls._file_digests.get(key)
+        if digest is None:
+            digest = FileUtils.calc_hash(file_path)
+            if digest is None:
+                raise OSError(f"Failed to hash {file_path}")
+            with cls._lock:
+                cls._file_digests[key] = digest
+        return digest
+
+    @classmethod
+    def port_digest(cls, lib_name: str, pattern: str = '*') -> str:
+        """
+        Compute a digest over the relative paths and contents of files in a port directory.
+
+        Args:
+            lib_name: Library name (directory name under ports/)
+            pattern: Glob pattern selecting the files to include (default: all files)
+
+        Returns:
+            str: Hexadecimal SHA-256 digest, stable across file timestamps
+        """
+        lib_dir = ROOT_DIR / 'ports' / lib_name
+        hash_func = hashlib.sha256()
+        if lib_dir.exists():
+            files = sorted(p for p in lib_dir.rglob(pattern) if p.is_file())
+            for file_path in files:
+                hash_func.update(file_path.relative_to(lib_dir).as_posix().encode('utf-8'))
+                hash_func.update(b'\0')
+                hash_func.update(cls.hash_file(file_path).encode('ascii'))
+                hash_func.update(b'\n')
+        return hash_func.hexdigest()
+
+    @classmethod
+    def patch_digest(cls, lib_name: str) -> str:
+        """
+        Compute a digest over the patch files (*.diff) of a port.
+
+        Args:
+            lib_name: Library name (directory name under ports/)
+
+        Returns:
+            str: Hexadecimal SHA-256 digest of the port's patches
+        """
+        return cls.port_digest(lib_name, '*.diff')
+
+    @staticmethod
+    def _find_visual_studio() -> Optional[Path]:
+        """
+        Locate the Visual Studio installation compiler.bat selects.
+
+        Returns:
+            Path: VSINSTALLDIR if set, otherwise the latest installation reported by vswhere,
+                  or None if no installation was found
+        """
+        if os.environ.get('VSINSTALLDIR'):
+            return Path(os.environ['VSINSTALLDIR'])
+        vswhere = Path(os.environ.get('ProgramFiles(x86)', r'C:\Program Files (x86)'),
+                       'Microsoft Visual Studio', 'Installer', 'vswhere.exe')
+        if not vswhere.exists():
+            return None
+        try:
+            output = subprocess.run(
+                [str(vswhere), '-nologo', '-latest', '-products', '*', '-all', '-property', 'installationPath'],
+                capture_output=True, text=True, timeout=60
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return Path(output.splitlines()[-1]) if output else None
+
+    @staticmethod
+    def _get_windows_sdk_version() -> Optional[str]:
+        """
+        Read the Windows 10/11 SDK version from the registry, like compiler.bat.
+
+        Returns:
+            str: SDK product version, or None if no SDK is registered
+        """
+        for key_path in (r'SOFTWARE\WOW6432Node\Microsoft\Microsoft SDKs\Windows\v10.0',
+                         r'SOFTWARE\Microsoft\Microsoft SDKs\Windows\v10.0'):
+            try:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
+                    return str(winreg.QueryValueEx(key, 'ProductVersion')[0])
+            except OSError:
+                continue
+        return None
+
+    @classmethod
+    def get_toolchain(cls) -> Dict[str, str]:
+        """
+        Describe the toolchain the build scripts compile with.
+
+        Collected once per run: the Visual C++ tools version of the Visual Studio
+        installation compiler.bat/compiler.sh select, the Windows SDK version and the
+        TOOLCHAIN_VARIABLES of the environment mpt runs in. A compiler, SDK or compiler
+        option change therefore changes every fingerprint.
+
+        Returns:
+            dict: Toolchain attribute -> value, empty values omitted
+        """
+        with cls._lock:
+            if cls._toolchain is not None:
+                return cls._toolchain
+        toolchain = {}
+        vs_dir = cls._find_visual_studio()
+        if vs_dir is not None:
+            toolchain['vs'] = str(vs_dir)
+            version_file = vs_dir / 'VC' / 'Auxiliary' / 'Build' / 'Microsoft.VCToolsVersion.default.txt'
+            try:
+                toolchain['msvc'] = version_file.read_text(encoding='utf-8').strip()
+            except OSError:
+                pass
+        sdk_version = cls._get_windows_sdk_version()
+        if sdk_version:
+            toolchain['sdk'] = sdk_version
+        for name in cls.TOOLCHAIN_VARIABLES:
+            if os.environ.get(name):
+                toolchain[f'env:{name}'] = os.environ[name]
+        with cls._lock:
+            cls._toolchain = toolchain
+        return toolchain
+
+    @classmethod
+    def compute(cls, triplet: str, node_name: str, config: dict, revision: Optional[str] = None,
+                dependencies: Optional[Dict[str, Optional[str]]] = None) -> Optional[str]:
+        """
+        Compute the fingerprint of a library node.
+
+        Dependencies contribute the fingerprint recorded when they were last built. A git
+        source tracking a branch gets a new revision when upstream moves, which changes
+        its fingerprint, so every node that depends on it is rebuilt as well.
+
+        Args:
+            triplet: Target triplet specification (e.g., "x64-windows")
+            node_name: Library identifier with optional dependency type suffix
+            config: Library configuration dictionary
+            revision: Commit checked out in the source directory of a git source
+            dependencies: Fingerprints to assume for dependencies instead of the recorded
+                          ones, used to predict fingerprints before dependencies are built
+
+        Returns:
+            str: Hexadecimal SHA-256 fingerprint, or None if it could not be computed
+        """
+        from mpt.dependency import DependencyResolver
+        from mpt.history import HistoryManager
+
+        try:
+            lib_name, dep_type = DependencyResolver.parse_dependency_name(node_name)
+            assumed = dependencies or {}
+            dependencies = {}
+            for dep in DependencyResolver.get_dependencies(lib_name, dep_type):
+                if assumed.get(dep):
+                    dependencies[dep] = assumed[dep]
+                    continue
+                dep_info = HistoryManager.get_library_info(triplet, dep) or {}
+                dependencies[dep] = dep_info.get('fingerprint') or str(dep_info.get('version'))
+
+            prefixes = {lib: str(path) for lib, path in UserConfig.get_prefixs(triplet).items()}
+            inputs = {
+                'format': cls.FORMAT_VERSION,
+                'triplet': triplet,
+                'node': node_name,
+                'version': str(config.get('version')),
+                'port': cls.port_digest(lib_name),
+                'dependencies': dependencies,
+                'prefix': str(UserConfig.get_prefix(triplet, lib_name)),
+                'prefixes': prefixes,
+                'toolchain': cls.get_toolchain()
+            }
+            if revision:
+                inputs['revision'] = revision
+            payload = json.dumps(inputs, sort_keys=True).encode('utf-8')
+            return hashlib.sha256(payload).hexdigest()
+        except Exception as e:
+            RichLogger.exception(f"[[bold cyan]{node_name}[/bold cyan]] Failed to compute build fingerprint: {e}")
+            return None
+
+    @staticmethod
+    def _get_stamp_path(source_dir: Path) -> Path:
+        """
+        Retrieve the path of the patch stamp that belongs to a source directory.
+
+        The stamp is kept next to the source directory so that cleaning or resetting
+        the source tree does not touch it.
+
+        Args:
+            source_dir: Source directory under buildtrees/sources
+
+        Returns:
+            Path: Path of the <source_dir>.patches stamp file
+        """
+        return source_dir.with_name(f"{source_dir.name}.patches")
+
+    @classmethod
+    def read_patch_stamp(cls, source_dir: Path) -> Optional[str]:
+        """
+        Read the patch digest recorded for a source directory.
+
+        Args:
+            source_dir: Source directory under buildtrees/sources
+
+        Returns:
+            str: Recorded patch digest, or None if no stamp exists
+        """
+        try:
+            return cls._get_stamp_path(source_dir).read_text(encoding='utf-8').strip() or None
+        except OSError:
+            return None
+
+    @classmethod
+    def write_patch_stamp(cls, source_dir: Path, digest: str) -> None:
+        """
+        Record the patch digest a source directory was prepared with.
+
+        Args:
+            source_dir: Source directory under buildtrees/sources
+            digest: Patch digest returned by patch_digest
+        """
+        try:
+            cls._get_stamp_path(source_dir).write_text(digest, encoding='utf-8')
+        except OSError as e:
+            RichLogger.warning(f"Failed to write patch stamp for [bold yellow]{source_dir}[/bold yellow]: {e}")
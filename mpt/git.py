@@ -4,14 +4,21 @@
 #
 import datetime
 import os
+import re
 import shutil
 import stat
 import subprocess
+import threading
 import time
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
+from mpt.config import UserConfig
 from mpt.file import FileUtils
+from mpt.gitmirror import GitMirror
+from mpt.gitquery import GitQuery
 from mpt.log import RichLogger
 
 
@@ -32,11 +39,25 @@ class GitHandler:
         RETRY_DELAY (int): Delay in seconds between retry attempts
         MAX_DELETE_RETRIES (int): Maximum retry attempts for directory deletion operations
         DELETE_RETRY_DELAY (int): Delay in seconds between delete retry attempts
+        SUBMODULE_JOBS (int): Default number of submodules fetched in parallel
     """
     MAX_RETRIES = 3
     RETRY_DELAY = 5
     MAX_DELETE_RETRIES = 5
     DELETE_RETRY_DELAY = 1
+    SUBMODULE_JOBS = 8
+    # Non-cone sparse checkout rule that keeps the submodule configuration checked out
+    SPARSE_GITMODULES = '/.gitmodules'
+
+    # Seconds spent updating each submodule in this run, and wall-clock seconds spent
+    # updating all submodules of a top-level repository, keyed by normalized path
+    _submodule_timings = {}
+    _submodule_elapsed = {}
+    _timing_lock = threading.Lock()
+
+    _COMMIT_ID = re.compile(r'[0-9a-fA-F]{7,40}')
+    _WILDCARDS = '*?[!'
+    _SUBMODULE_PATH = re.compile(r'^\s*path\s*=\s*(.+?)\s*$', re.MULTILINE)
 
     @staticmethod
     def is_git_source(url):
@@ -65,6 +86,9 @@ class GitHandler:
         3. Valid HEAD reference (branch or commit)
         4. Existence of at least one Git reference
 
+        The checks read the Git directory directly or go through the batched
+        GitQuery cache, so repeated validation costs no extra git processes.
+
         Args:
             repo_dir (Path): Filesystem path to the repository directory to validate
 
@@ -80,34 +104,18 @@ class GitHandler:
         if not git_dir.exists():
             return False
 
-        # Check if we can get the current HEAD reference (branch)
-        success, output = GitHandler._capture_git_command(
-            ['git', 'symbolic-ref', '--short', 'HEAD'],
-            repo_dir
-        )
+        query = GitQuery.for_repository(repo_dir)
 
-        # If the command succeeds, we have a valid branch reference
-        if success and output.strip():
+        # If HEAD names a branch, we have a valid branch reference
+        if query.get_symbolic_head():
             return True
 
-        # If symbolic-ref fails, check if HEAD points to a valid commit
-        success, output = GitHandler._capture_git_command(
-            ['git', 'rev-parse', 'HEAD'],
-            repo_dir
-        )
-
-        # If this succeeds, HEAD points to a valid commit
-        if success and output.strip():
+        # Otherwise check if HEAD points to a valid commit
+        if query.resolve('HEAD')[0]:
             return True
 
-        # Check if there are any references at all
-        success, output = GitHandler._capture_git_command(
-            ['git', 'for-each-ref', '--count=1'],
-            repo_dir
-        )
-
         # If we can list any references, the repository structure is valid
-        return success and output.strip() != ""
+        return bool(query.get_refs())
 
     @staticmethod
     def clone_repository(config, target_dir):
@@ -127,6 +135,10 @@ class GitHandler:
                 - version (str): Branch, tag, or commit to checkout
                 - recursive (bool, optional): Enable submodule cloning (default: True)
                 - depth (int, optional): Clone depth for shallow cloning
+                - filter (str, optional): Partial clone filter such as 'blob:none' or 'tree:0'
+                - include (list, optional): Directories (or patterns) for sparse checkout
+                - single_branch (bool, optional): Fetch only the requested branch (default: True)
+                - tags (bool, optional): Fetch tags besides the requested one (default: False)
             target_dir (Path): Target directory path for the cloned repository
 
         Returns:
@@ -154,18 +166,31 @@ class GitHandler:
                 # Valid repository exists, try to update instead of clone
                 return GitHandler.update_repository(target_dir, config)
 
-        # Build clone command with --branch parameter for both branches and tags
-        cmd = ['git', 'clone']
-        if recursive:
-            cmd.append('--recurse-submodules')
-        if depth:
-            cmd.extend(['--depth', str(depth)])
+        clone_options = GitHandler._get_clone_options(config)
+
+        # Prefer a local clone from the shared mirror; fall back to the network.
+        # Partial and shallow clones skip the mirror, see _uses_mirrors.
+        success = False
+        mirror_dir = GitMirror.ensure(url, version) if GitHandler._uses_mirrors(config) else None
+        if mirror_dir is not None:
+            success = GitHandler._clone_from_mirror(mirror_dir, url, version, target_dir, clone_options)
+            if not success:
+                RichLogger.warning(f"Cloning from Git mirror failed, cloning from remote: [bold cyan]{url}[/bold cyan]")
+                if target_dir.exists() and not FileUtils.delete_directory(target_dir):
+                    return False
 
-        # Use --branch parameter for both branches and tags
-        cmd.extend(['--branch', version, url, str(target_dir)])
+        if not success:
+            # Build clone command with --branch parameter for both branches and tags.
+            # Submodules are initialized afterwards by _update_submodules with the same options.
+            cmd = ['git', 'clone'] + clone_options
+            if depth:
+                cmd.extend(['--depth', str(depth)])
 
-        # Execute the clone command
-        success = GitHandler._run_git_command(cmd, target_dir.parent)
+            # Use --branch parameter for both branches and tags
+            cmd.extend(['--branch', version, url, str(target_dir)])
+
+            # Execute the clone command
+            success = GitHandler._run_git_command(cmd, target_dir.parent)
         if not success:
             # Clean up incomplete clone
             if GitHandler._is_only_git_directory(target_dir):
@@ -177,16 +202,279 @@ class GitHandler:
             FileUtils.delete_directory(target_dir)
             return False
 
+        # Restrict the working tree to the configured directories
+        if not GitHandler._apply_sparse_checkout(target_dir, config):
+            return False
+
         override_submodules = config.get('submodules', {})
 
         # For recursive clones, ensure submodules are properly initialized
         if recursive:
-            if not GitHandler._update_submodules(target_dir, depth, override_submodules):
+            if not GitHandler._update_submodules(target_dir, depth, override_submodules, config):
                 RichLogger.error("Submodule initialization failed during clone")
                 return False
 
         return True
 
+    @staticmethod
+    def _uses_mirrors(config):
+        """
+        Check whether a repository and its submodules may be served from local mirrors.
+
+        Mirrors always hold the complete history of every branch and tag. A partial
+        clone ('filter') cannot be served by them, and a shallow clone ('depth') would
+        have to download the full history into the mirror first, which costs far more
+        than the depth-limited transfer it asked for. Both therefore fetch directly
+        from the remote; the price is that a clean rebuild downloads them again.
+
+        Args:
+            config (dict, optional): Repository configuration with optional 'filter' and 'depth'
+
+        Returns:
+            bool: True if mirrors are enabled and the configuration allows using them
+        """
+        config = config or {}
+        return GitMirror.get_mirror_root() is not None and not config.get('filter') and not config.get('depth')
+
+    @staticmethod
+    def _get_clone_options(config):
+        """
+        Build the clone options that limit what is transferred and checked out.
+
+        Args:
+            config (dict): Repository configuration with optional 'filter', 'include',
+                           'single_branch' and 'tags' keys
+
+        Returns:
+            list: Options for 'git clone', defaulting to '--single-branch --no-tags'
+        """
+        options = []
+        if config.get('single_branch', True):
+            options.append('--single-branch')
+        if not config.get('tags', False):
+            options.append('--no-tags')
+        if config.get('filter'):
+            options.append(f"--filter={config['filter']}")
+        if GitHandler._get_sparse_patterns(config):
+            options.append('--sparse')
+        return options
+
+    @staticmethod
+    def _get_submodule_options(config):
+        """
+        Build the 'git submodule update' options matching the clone options of the superproject.
+
+        Args:
+            config (dict, optional): Repository configuration with optional 'filter'
+                                     and 'single_branch' keys
+
+        Returns:
+            list: Options for 'git submodule update'
+        """
+        if not config:
+            return []
+        options = []
+        if config.get('single_branch', True):
+            options.append('--single-branch')
+        if config.get('filter'):
+            options.append(f"--filter={config['filter']}")
+        return options
+
+    @staticmethod
+    def _get_sparse_patterns(config):
+        """
+        Read the sparse checkout patterns of a Git source from its 'include' key.
+
+        Entries below another plain path are dropped: the outer entry already checks
+        them out, and Git does not store them separately in cone mode.
+
+        Args:
+            config (dict, optional): Repository configuration
+
+        Returns:
+            list: Directory paths or patterns relative to the repository root
+        """
+        include = (config or {}).get('include') or []
+        if isinstance(include, str):
+            include = [include]
+        patterns = list(dict.fromkeys(str(pattern).replace('\\', '/').strip('/') for pattern in include if pattern))
+        plain = [pattern for pattern in patterns if not any(c in pattern for c in GitHandler._WILDCARDS)]
+        return [pattern for pattern in patterns if not any(pattern.startswith(f"{outer}/") for outer in plain)]
+
+    @staticmethod
+    def _read_sparse_patterns(repo_dir):
+        """
+        Recover the sparse checkout patterns currently applied to a working tree.
+
+        In cone mode Git stores every requested directory together with its parents;
+        a directory was requested explicitly when it is not followed by the negative
+        pattern Git adds for parent directories. In non-cone mode the patterns are
+        stored as given, plus the rule that keeps .gitmodules checked out.
+
+        Args:
+            repo_dir (Path): Repository directory
+
+        Returns:
+            list: Applied directories or patterns, empty if sparse checkout is not in use
+        """
+        git_dir = GitQuery.for_repository(repo_dir).get_git_dir()
+        sparse_file = git_dir / 'info' / 'sparse-checkout' if git_dir else None
+        if sparse_file is None or not sparse_file.is_file():
+            return []
+        try:
+            lines = [line.strip() for line in sparse_file.read_text(encoding='utf-8', errors='ignore').splitlines()]
+        except OSError:
+            return []
+        lines = [line for line in lines if line and not line.startswith('#')]
+        if lines == ['/*']:
+            # Left behind by 'git sparse-checkout disable'
+            return []
+        if lines[:2] != ['/*', '!/*/']:
+            # Non-cone patterns, without the .gitmodules rule added by _apply_sparse_checkout
+            return [line for line in lines if line != GitHandler.SPARSE_GITMODULES]
+        negated = {line[1:] for line in lines if line.startswith('!')}
+        return [line.strip('/') for line in lines[2:]
+                if not line.startswith('!') and f"{line}*/" not in negated]
+
+    @staticmethod
+    def _apply_sparse_checkout(repo_dir, config):
+        """
+        Make the sparse checkout of a working tree match the configured patterns.
+
+        Cone mode, which Git evaluates fastest, only accepts directories, so it is used
+        when every entry is a tree of HEAD. File paths, submodule paths and patterns with
+        wildcards use non-cone mode, where .gitmodules is added to the patterns so that
+        the submodules inside the checkout can still be initialized. Removing the
+        'include' key restores a full checkout.
+
+        Args:
+            repo_dir (Path): Repository directory
+            config (dict): Repository configuration
+
+        Returns:
+            bool: True if the working tree matches the configuration, False otherwise
+        """
+        patterns = GitHandler._get_sparse_patterns(config)
+        if sorted(patterns) == sorted(GitHandler._read_sparse_patterns(repo_dir)):
+            return True
+        if not patterns:
+            if not GitHandler._run_git_command(['git', 'sparse-checkout', 'disable'], repo_dir):
+                return False
+            # Git keeps the old patterns around; drop them so the state reads as a full checkout
+            git_dir = GitQuery.for_repository(repo_dir).get_git_dir()
+            if git_dir is not None:
+                (git_dir / 'info' / 'sparse-checkout').unlink(missing_ok=True)
+            return True
+        if GitHandler._are_directories(repo_dir, patterns):
+            cmd = ['git', 'sparse-checkout', 'set', '--cone'] + patterns
+        else:
+            cmd = ['git', 'sparse-checkout', 'set', '--no-cone'] + patterns + [GitHandler.SPARSE_GITMODULES]
+        if not GitHandler._run_git_command(cmd, repo_dir):
+            RichLogger.error(f"Failed to apply sparse checkout {patterns}: {repo_dir}")
+            return False
+        return True
+
+    @staticmethod
+    def _are_directories(repo_dir, patterns):
+        """
+        Check whether every sparse checkout entry names a directory of HEAD.
+
+        Args:
+            repo_dir (Path): Repository directory
+            patterns (list): Entries from _get_sparse_patterns, none nested in another
+
+        Returns:
+            bool: True if all entries are plain paths of trees, False otherwise
+        """
+        if any(c in pattern for pattern in patterns for c in GitHandler._WILDCARDS):
+            return False
+        success, output = GitHandler._capture_git_command(
+            ['git', 'ls-tree', '-d', 'HEAD', '--'] + patterns, repo_dir
+        )
+        if not success:
+            return False
+        trees = set()
+        for line in output.splitlines():
+            info, _, path = line.partition('\t')
+            if info.split()[1:2] == ['tree']:
+                trees.add(path)
+        return all(pattern in trees for pattern in patterns)
+
+    @staticmethod
+    def _filter_sparse_paths(repo_dir, paths):
+        """
+        Drop the paths that lie outside the sparse checkout of a repository.
+
+        Git marks index entries outside the sparse checkout as skip-worktree; such
+        submodules must neither be cloned nor reported as uninitialized.
+
+        Args:
+            repo_dir (Path): Repository directory
+            paths (list): Paths relative to the repository root
+
+        Returns:
+            list: Paths inside the checkout, in their original order
+        """
+        if not paths or not GitHandler._read_sparse_patterns(repo_dir):
+            return list(paths)
+        success, output = GitHandler._capture_git_command(['git', 'ls-files', '-t', '--'] + list(paths), repo_dir)
+        if not success:
+            return list(paths)
+        skipped = {line[2:] for line in output.splitlines() if line.startswith('S ')}
+        if skipped:
+            RichLogger.debug(f"Skipping submodules outside the sparse checkout: {', '.join(sorted(skipped))}")
+        return [path for path in paths if path not in skipped]
+
+    @staticmethod
+    def _clone_from_mirror(mirror_dir, url, version, target_dir, options=None):
+        """
+        Clone a repository from its local mirror and point 'origin' back at the upstream URL.
+
+        The clone hard-links or copies objects from the mirror, so it does not depend on
+        the mirror afterwards. Only used for clones without depth, see _uses_mirrors.
+        Submodules are initialized separately by _update_submodules.
+
+        Args:
+            mirror_dir (Path): Bare mirror of the repository
+            url (str): Upstream repository URL recorded as 'origin'
+            version (str): Branch or tag to checkout
+            target_dir (Path): Target directory path for the cloned repository
+            options (list, optional): Additional options for 'git clone'
+
+        Returns:
+            bool: True if cloning completed successfully, False otherwise
+        """
+        RichLogger.debug(f"Cloning from Git mirror: [bold cyan]{mirror_dir}[/bold cyan]")
+        cmd = ['git', 'clone'] + (options or []) + ['--branch', version, str(mirror_dir), str(target_dir)]
+        if not GitHandler._run_git_command(cmd, target_dir.parent):
+            return False
+        return GitHandler._run_git_command(['git', 'remote', 'set-url', 'origin', url], target_dir)
+
+    @staticmethod
+    def _get_fetch_source(repo_dir, version, config=None):
+        """
+        Determine where missing objects for a version should be fetched from.
+
+        Args:
+            repo_dir (Path): Repository directory
+            version (str): Target version/branch/tag
+            config (dict, optional): Repository configuration containing the upstream 'url'
+
+        Returns:
+            str: Path of the repository's mirror when available, otherwise 'origin'
+        """
+        if config and not GitHandler._uses_mirrors(config):
+            return 'origin'
+        url = config.get('url') if config else None
+        if not url:
+            success, output = GitHandler._capture_git_command(['git', 'remote', 'get-url', 'origin'], repo_dir)
+            url = output.strip() if success else None
+        if url:
+            mirror_dir = GitMirror.ensure(url, version)
+            if mirror_dir is not None:
+                return str(mirror_dir)
+        return 'origin'
+
     @staticmethod
     def update_repository(repo_dir, config):
         """
@@ -221,11 +509,13 @@ class GitHandler:
 
         # Determine if the version refers to a tag or branch
         is_tag = GitHandler._is_tag(repo_dir, version)
+        source = GitHandler._get_fetch_source(repo_dir, version, config)
+        filter_options = [f"--filter={config['filter']}"] if config.get('filter') else []
 
         # Optimized fetch: only fetch specific ref without fetching all tags/branches
         if is_tag:
             # Fetch only the specific tag without fetching all tags
-            cmd = ['git', 'fetch', 'origin', '--no-tags', 'tag', version]
+            cmd = ['git', 'fetch', source, '--no-tags'] + filter_options + ['tag', version]
             if depth:
                 cmd.extend(['--depth', str(depth)])
             success = GitHandler._run_git_command(cmd, repo_dir)
@@ -235,7 +525,7 @@ class GitHandler:
             success = GitHandler._run_git_command(['git', 'reset', '--hard', version], repo_dir)
         else:
             # Fetch only the specific branch without fetching all branches
-            cmd = ['git', 'fetch', 'origin', '--no-tags', version]
+            cmd = ['git', 'fetch', source, '--no-tags'] + filter_options + [version]
             if depth:
                 cmd.extend(['--depth', str(depth)])
             success = GitHandler._run_git_command(cmd, repo_dir)
@@ -252,16 +542,88 @@ class GitHandler:
         if not success:
             return False
 
+        # Follow changes of the configured sparse checkout directories
+        if not GitHandler._apply_sparse_checkout(repo_dir, config):
+            return False
+
         override_submodules = config.get('submodules', {})
 
         # Update submodules if recursive is enabled
         if recursive:
-            if not GitHandler._update_submodules(repo_dir, depth, override_submodules):
+            if not GitHandler._update_submodules(repo_dir, depth, override_submodules, config):
                 RichLogger.error("Submodule update failed during repository update")
                 return False
 
         return True
 
+    @staticmethod
+    def is_at_version(repo_dir: Path, version: str, config=None) -> bool:
+        """
+        Check locally whether a repository is already checked out at a pinned version.
+
+        This method resolves the configured version against local tags or as a commit
+        id and compares it with HEAD in one batched GitQuery lookup, without contacting
+        the remote. Branch names never match, because the remote branch may have moved
+        since the last fetch. Submodules are checked by looking for their .git entries
+        on disk, and the sparse checkout directories by reading Git's sparse-checkout
+        file, without spawning further processes.
+
+        Args:
+            repo_dir (Path): Repository directory to check
+            version (str): Tag or commit id from the port configuration
+            config (dict, optional): Repository configuration with sparse checkout 'include'
+
+        Returns:
+            bool: True if HEAD equals the pinned version and all submodules are present,
+                  False if the regular update is required
+        """
+        if not version or not (repo_dir / '.git').exists():
+            return False
+
+        if GitHandler._COMMIT_ID.fullmatch(version):
+            target = f'{version}^{{commit}}'
+        else:
+            target = f'refs/tags/{version}^{{commit}}'
+        head, commit = GitQuery.for_repository(repo_dir).resolve('HEAD', target)
+        if not head or head != commit:
+            return False
+
+        if sorted(GitHandler._get_sparse_patterns(config)) != sorted(GitHandler._read_sparse_patterns(repo_dir)):
+            return False
+
+        return GitHandler._has_checked_out_submodules(repo_dir)
+
+    @staticmethod
+    def _has_checked_out_submodules(repo_dir: Path) -> bool:
+        """
+        Check that every submodule listed in .gitmodules has been checked out, recursively.
+
+        Submodule paths that are absent from the working tree, such as those outside
+        the sparse checkout directories, are not required.
+
+        Args:
+            repo_dir (Path): Repository directory
+
+        Returns:
+            bool: True if every present submodule path contains a .git entry
+        """
+        gitmodules = repo_dir / '.gitmodules'
+        if not gitmodules.is_file():
+            return True
+        try:
+            content = gitmodules.read_text(encoding='utf-8', errors='ignore')
+        except OSError:
+            return False
+        for path in GitHandler._SUBMODULE_PATH.findall(content):
+            submodule_dir = repo_dir / path.strip('"')
+            if not submodule_dir.exists():
+                continue
+            if not (submodule_dir / '.git').exists():
+                return False
+            if not GitHandler._has_checked_out_submodules(submodule_dir):
+                return False
+        return True
+
     @staticmethod
     def _is_only_git_directory(path: Path) -> bool:
         """
@@ -313,10 +675,7 @@ class GitHandler:
             bool: True if reference is a tag, False otherwise
         """
         # Check local tags
-        success, output = GitHandler._capture_git_command(
-            ['git', 'tag', '-l', ref_name], repo_dir
-        )
-        if success and output.strip():
+        if GitQuery.for_repository(repo_dir).has_tag(ref_name):
             return True
 
         # Check remote tags if local check fails
@@ -329,18 +688,21 @@ class GitHandler:
         return False
 
     @staticmethod
-    def _update_submodules(repo_dir, depth=None, override_submodules=None):
+    def _update_submodules(repo_dir, depth=None, override_submodules=None, config=None):
         """
         Update and initialize Git submodules with optional depth limiting and submodule overrides.
 
         This method initializes and updates all submodules in a repository,
         with support for shallow cloning of submodules when depth is specified.
         It also allows overriding submodule URLs and branches through configuration.
+        Submodules are fetched in parallel; see _get_submodule_jobs.
 
         Args:
             repo_dir (Path): Parent repository directory containing submodules
             depth (int, optional): Maximum commit depth for submodule cloning
             override_submodules (dict, optional): Submodule override configuration
+            config (dict, optional): Repository configuration whose 'filter' and
+                                     'single_branch' settings also apply to submodules
 
         Returns:
             bool: True if all submodules were successfully updated, False otherwise
@@ -377,13 +739,15 @@ class GitHandler:
             if not success:
                 RichLogger.warning("Submodule sync failed after applying overrides")
 
-        # Build submodule update command
-        update_cmd = ['git', 'submodule', 'update', '--init', '--recursive', '--force', '--checkout']
-        if depth:
-            update_cmd.extend(['--depth', str(depth)])
-
-        # Execute the submodule update command
-        success = GitHandler._run_git_command(update_cmd, repo_dir)
+        # Update all submodules recursively, several at a time, from mirrors when available
+        use_mirrors = GitHandler._uses_mirrors(config)
+        start = time.monotonic()
+        success = GitHandler._update_submodule_tree(
+            repo_dir, depth, GitHandler._get_submodule_options(config),
+            use_mirrors, GitHandler._get_submodule_jobs(config)
+        )
+        with GitHandler._timing_lock:
+            GitHandler._submodule_elapsed[os.path.normcase(os.path.abspath(repo_dir))] = time.monotonic() - start
 
         # Verify submodules were updated correctly
         if success:
@@ -393,6 +757,265 @@ class GitHandler:
 
         return success
 
+    @staticmethod
+    def _get_submodule_jobs(config=None):
+        """
+        Determine how many submodules are fetched in parallel.
+
+        The per-port 'submodule_jobs' key takes precedence over 'submodule_jobs' in the
+        'git' section of settings.yaml, which defaults to SUBMODULE_JOBS.
+
+        Args:
+            config (dict, optional): Repository configuration
+
+        Returns:
+            int: Number of concurrent submodule fetches, at least 1
+        """
+        jobs = (config or {}).get('submodule_jobs')
+        if jobs is None:
+            jobs = (UserConfig.load().get('git') or {}).get('submodule_jobs', GitHandler.SUBMODULE_JOBS)
+        try:
+            return max(1, int(jobs))
+        except (TypeError, ValueError):
+            RichLogger.warning(f"Invalid submodule_jobs value [bold yellow]{jobs}[/bold yellow], "
+                               f"using {GitHandler.SUBMODULE_JOBS}")
+            return GitHandler.SUBMODULE_JOBS
+
+    @staticmethod
+    def _list_submodules(repo_dir):
+        """
+        Register the submodules of a repository and list where each one comes from.
+
+        Submodules are registered with 'git submodule init' first, so relative URLs in
+        .gitmodules are resolved against the superproject's origin.
+
+        Args:
+            repo_dir (Path): Repository directory containing submodules
+
+        Returns:
+            list: (path, name, url, commit) tuples, where commit is the revision recorded
+                  in the superproject; None if the submodules could not be registered
+        """
+        if not (repo_dir / '.gitmodules').is_file():
+            return []
+        if not GitHandler._run_git_command(['git', 'submodule', 'init'], repo_dir):
+            return None
+
+        success, output = GitHandler._capture_git_command(
+            ['git', 'config', '-f', '.gitmodules', '--get-regexp', r'^submodule\..*\.path$'],
+            repo_dir
+        )
+        if not success:
+            return []
+        names = {}
+        for line in output.splitlines():
+            key, _, path = line.partition(' ')
+            if path:
+                names[path.strip()] = key[len('submodule.'):-len('.path')]
+
+        # Commits recorded in the superproject for each submodule path
+        success, output = GitHandler._capture_git_command(['git', 'submodule', 'status'], repo_dir)
+        commits = {}
+        if success:
+            for line in output.splitlines():
+                parts = line[1:].split()
+                if len(parts) >= 2:
+                    commits[parts[1]] = parts[0]
+
+        submodules = []
+        for path, name in names.items():
+            success, output = GitHandler._capture_git_command(
+                ['git', 'config', '--get', f'submodule.{name}.url'], repo_dir
+            )
+            submodules.append((path, name, output.strip() if success else '', commits.get(path)))
+        return submodules
+
+    @staticmethod
+    def _redirect_submodules_to_mirrors(repo_dir, submodules, jobs):
+        """
+        Point submodules at their local mirrors for the next update.
+
+        The mirrors are made current for the commits recorded in the superproject in
+        parallel, then the submodule URLs in .git/config are replaced by the mirror
+        paths. Callers restore the upstream URLs with _restore_submodule_urls once the
+        update has run.
+
+        Args:
+            repo_dir (Path): Repository directory containing submodules
+            submodules (list): (path, name, url, commit) tuples from _list_submodules
+            jobs (int): Number of mirrors updated in parallel
+
+        Returns:
+            set: Paths of the submodules that were redirected to a mirror
+        """
+        def ensure(submodule):
+            path, name, url, commit = submodule
+            return GitMirror.ensure(url, commit) if url else None
+
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="mpt-mirror") as executor:
+            mirrors = list(executor.map(ensure, submodules))
+
+        redirected = set()
+        for (path, name, url, commit), mirror_dir in zip(submodules, mirrors):
+            if mirror_dir is not None and GitHandler._run_git_command(
+                    ['git', 'config', f'submodule.{name}.url', mirror_dir.as_posix()], repo_dir):
+                redirected.add(path)
+        return redirected
+
+    @staticmethod
+    def _restore_submodule_urls(repo_dir):
+        """
+        Restore the upstream URLs of submodules after an update from local mirrors.
+
+        'git submodule sync' rewrites both the URL in .git/config and the 'origin'
+        remote of every checked out submodule from .gitmodules.
+
+        Args:
+            repo_dir (Path): Repository directory containing submodules
+
+        Returns:
+            bool: True if the URLs were restored, False otherwise
+        """
+        success = GitHandler._run_git_command(['git', 'submodule', 'sync'], repo_dir)
+        if not success:
+            RichLogger.warning(f"Failed to restore submodule URLs: {repo_dir}")
+        return success
+
+    @staticmethod
+    def _run_submodule_updates(repo_dir, paths, depth=None, options=None, redirected=None, jobs=1):
+        """
+        Check out registered submodules of one repository in parallel and time each of them.
+
+        Every submodule is updated by its own 'git submodule update' process. The
+        submodules must already be registered, so the processes never write the
+        superproject's configuration concurrently.
+
+        Args:
+            repo_dir (Path): Repository directory containing the submodules
+            paths (list): Submodule paths to update
+            depth (int, optional): Maximum commit depth for submodules not served by a mirror
+            options (list, optional): Additional options for 'git submodule update'
+            redirected (set, optional): Paths currently pointing at a local mirror
+            jobs (int): Number of submodules updated in parallel
+
+        Returns:
+            list: Paths of the submodules that failed to update
+        """
+        redirected = redirected or set()
+
+        def update(path):
+            cmd = ['git']
+            if path in redirected:
+                # Submodule clones over the local transport are refused by default since
+                # Git 2.38.1; the mirrors are created by mpt itself, so allow it here only
+                cmd.extend(['-c', 'protocol.file.allow=always'])
+            cmd.extend(['submodule', 'update', '--force', '--checkout'] + (options or []))
+            if depth and path not in redirected:
+                cmd.extend(['--depth', str(depth)])
+            cmd.extend(['--', path])
+            start = time.monotonic()
+            success = GitHandler._run_git_command(cmd, repo_dir)
+            elapsed = time.monotonic() - start
+            with GitHandler._timing_lock:
+                GitHandler._submodule_timings[os.path.normcase(os.path.abspath(repo_dir / path))] = elapsed
+            RichLogger.debug(f"Submodule [bold cyan]{path}[/bold cyan] updated in "
+                             f"[bold yellow]{elapsed:.1f}s[/bold yellow]")
+            return success
+
+        if not paths:
+            return []
+        with ThreadPoolExecutor(max_workers=min(jobs, len(paths)), thread_name_prefix="mpt-submodule") as executor:
+            results = list(executor.map(update, paths))
+        return [path for path, success in zip(paths, results) if not success]
+
+    @staticmethod
+    def _update_submodule_tree(repo_dir, depth=None, options=None, use_mirrors=False, jobs=1):
+        """
+        Initialize and update submodules recursively, one nesting level at a time.
+
+        Submodules outside the sparse checkout are skipped. Submodules of one level
+        are checked out in parallel. Each nesting level is
+        handled separately because the URLs of nested submodules are only known once
+        their parent submodule has been checked out; nested levels of sibling
+        submodules are again processed in parallel and share the jobs of this level.
+
+        Args:
+            repo_dir (Path): Repository directory containing submodules
+            depth (int, optional): Maximum commit depth for submodules not served by a mirror
+            options (list, optional): Additional options for 'git submodule update'
+            use_mirrors (bool): Transfer objects from local mirrors where available
+            jobs (int): Maximum number of git processes run in parallel for this tree
+
+        Returns:
+            bool: True if all submodules were successfully updated, False otherwise
+        """
+        submodules = GitHandler._list_submodules(repo_dir)
+        if submodules is None:
+            return False
+        included = set(GitHandler._filter_sparse_paths(repo_dir, [path for path, _, _, _ in submodules]))
+        submodules = [submodule for submodule in submodules if submodule[0] in included]
+        if not submodules:
+            return True
+
+        redirected = GitHandler._redirect_submodules_to_mirrors(repo_dir, submodules, jobs) if use_mirrors else set()
+        paths = [path for path, _, _, _ in submodules]
+        failed = GitHandler._run_submodule_updates(repo_dir, paths, depth, options, redirected, jobs)
+        if redirected:
+            GitHandler._restore_submodule_urls(repo_dir)
+        if failed:
+            RichLogger.error(f"Failed to update submodules: {', '.join(failed)}")
+            return False
+
+        nested = [repo_dir / path for path in paths if (repo_dir / path / '.gitmodules').is_file()]
+        if not nested:
+            return True
+        # Split the jobs between the sibling subtrees so that no more than 'jobs'
+        # git processes run at once, however deep the submodules are nested
+        workers = min(jobs, len(nested))
+        nested_jobs = max(1, jobs // workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mpt-submodule") as executor:
+            results = list(executor.map(
+                lambda submodule_dir: GitHandler._update_submodule_tree(
+                    submodule_dir, depth, options, use_mirrors, nested_jobs),
+                nested
+            ))
+        return all(results)
+
+    @staticmethod
+    def get_submodule_timings(repo_dir):
+        """
+        Report how long each submodule below a repository took to update in this run.
+
+        Args:
+            repo_dir (Path): Top-level repository directory
+
+        Returns:
+            list: (relative path, seconds) tuples sorted by path, nested submodules included
+        """
+        root = os.path.normcase(os.path.abspath(repo_dir))
+        prefix = root.rstrip(os.sep) + os.sep
+        with GitHandler._timing_lock:
+            timings = [(Path(os.path.relpath(path, root)).as_posix(), elapsed)
+                       for path, elapsed in GitHandler._submodule_timings.items() if path.startswith(prefix)]
+        return sorted(timings)
+
+    @staticmethod
+    def get_submodule_elapsed(repo_dir) -> Optional[float]:
+        """
+        Report the wall-clock time spent updating the submodules of a repository in this run.
+
+        Submodules are updated in parallel, so this is usually much shorter than the
+        sum of the times reported by get_submodule_timings.
+
+        Args:
+            repo_dir (Path): Top-level repository directory
+
+        Returns:
+            float: Elapsed seconds, or None if the submodules were not updated in this run
+        """
+        with GitHandler._timing_lock:
+            return GitHandler._submodule_elapsed.get(os.path.normcase(os.path.abspath(repo_dir)))
+
     @staticmethod
     def verify_repository_integrity(repo_dir, config=None):
         """
@@ -670,14 +1293,15 @@ class GitHandler:
         """
         # Determine if the version is a tag
         is_tag = GitHandler._is_tag(repo_dir, version)
+        source = 'origin' if depth else GitHandler._get_fetch_source(repo_dir, version)
 
         # Build fetch command based on reference type
         if is_tag:
-            cmd = ['git', 'fetch', 'origin', '--no-tags', 'tag', version]
+            cmd = ['git', 'fetch', source, '--no-tags', 'tag', version]
             if depth:
                 cmd.extend(['--depth', str(depth)])
         else:
-            cmd = ['git', 'fetch', 'origin', '--no-tags', version]
+            cmd = ['git', 'fetch', source, '--no-tags', version]
             if depth:
                 cmd.extend(['--depth', str(depth)])
 
@@ -798,6 +1422,8 @@ class GitHandler:
 
                 # Check command exit status
                 returncode = p.wait()
+                # The command may have changed refs or objects; drop cached query answers
+                GitQuery.invalidate(cwd)
                 if returncode == 0:
                     return True
                 else:
@@ -879,13 +1505,21 @@ class GitHandler:
         Returns:
             float: Unix timestamp of the last commit, or 0 if unavailable
         """
-        # Get the timestamp of the most recent commit
-        cmd = ['git', 'log', '-1', '--format=%at']
-        success, output = GitHandler._capture_git_command(cmd, repo_dir)
-        if success:
-            return float(output.strip())
-        else:
-            return 0
+        # Get the author timestamp of HEAD from the batched object lookup
+        return GitQuery.for_repository(repo_dir).get_commit_time('HEAD')
+
+    @staticmethod
+    def get_head_commit(repo_dir: Path) -> Optional[str]:
+        """
+        Retrieve the id of the commit checked out in a repository.
+
+        Args:
+            repo_dir (Path): Repository directory to query
+
+        Returns:
+            str: Full commit id of HEAD, or None if unavailable
+        """
+        return GitQuery.for_repository(repo_dir).resolve('HEAD^{commit}')[0]
 
     @staticmethod
     def _repair_submodules(repo_dir, config):
@@ -909,34 +1543,45 @@ class GitHandler:
         if not success:
             return False
 
-        lines = output.splitlines()
+        # Uninitialized submodules outside the sparse checkout are intentional
+        uninitialized = [line.split()[1] for line in output.splitlines()
+                         if line.startswith('-') and len(line.split()) >= 2]
         all_repaired = True
 
-        # Process each submodule
-        for line in lines:
-            if line.startswith('-'):
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                submodule_path = parts[1]
-                RichLogger.info(f"Attempting to repair submodule: {submodule_path}")
-
-                # Delete problematic submodule directory
-                full_path = repo_dir / submodule_path
-                if full_path.exists():
-                    if not FileUtils.delete_directory(full_path):
-                        RichLogger.error(f"Failed to delete submodule directory: {submodule_path}")
-                        all_repaired = False
-                        continue
-
-                # Reinitialize the submodule
-                init_cmd = ['git', 'submodule', 'update', '--init', '--force', '--checkout', submodule_path]
-                if depth:
-                    init_cmd.extend(['--depth', str(depth)])
-                success = GitHandler._run_git_command(init_cmd, repo_dir)
-                if not success:
-                    RichLogger.error(f"Failed to reinitialize submodule: {submodule_path}")
+        # Delete the directories of uninitialized submodules
+        broken = []
+        for submodule_path in GitHandler._filter_sparse_paths(repo_dir, uninitialized):
+            RichLogger.info(f"Attempting to repair submodule: {submodule_path}")
+
+            # Delete problematic submodule directory
+            full_path = repo_dir / submodule_path
+            if full_path.exists():
+                if not FileUtils.delete_directory(full_path):
+                    RichLogger.error(f"Failed to delete submodule directory: {submodule_path}")
                     all_repaired = False
+                    continue
+            broken.append(submodule_path)
+
+        if broken:
+            # Register the submodules once, then reinitialize them in parallel,
+            # from local mirrors when available
+            submodules = GitHandler._list_submodules(repo_dir)
+            if submodules is None:
+                return False
+            jobs = GitHandler._get_submodule_jobs(config)
+            redirected = set()
+            if GitHandler._uses_mirrors(config):
+                redirected = GitHandler._redirect_submodules_to_mirrors(
+                    repo_dir, [submodule for submodule in submodules if submodule[0] in broken], jobs
+                )
+            failed = GitHandler._run_submodule_updates(
+                repo_dir, broken, depth, GitHandler._get_submodule_options(config), redirected, jobs
+            )
+            if redirected:
+                GitHandler._restore_submodule_urls(repo_dir)
+            for submodule_path in failed:
+                RichLogger.error(f"Failed to reinitialize submodule: {submodule_path}")
+                all_repaired = False
 
         # Verify all submodules were repaired successfully
         if all_repaired:
@@ -989,10 +1634,10 @@ class GitHandler:
         if not success:
             return False
 
-        # Check for uninitialized submodules
-        lines = output.splitlines()
-        for line in lines:
-            if line.startswith('-'):
-                RichLogger.error(f"Submodule not initialized: {line}")
-                return False
+        # Check for uninitialized submodules inside the sparse checkout
+        uninitialized = {line.split()[1]: line for line in output.splitlines()
+                         if line.startswith('-') and len(line.split()) >= 2}
+        for path in GitHandler._filter_sparse_paths(repo_dir, list(uninitialized)):
+            RichLogger.error(f"Submodule not initialized: {uninitialized[path]}")
+            return False
         return True
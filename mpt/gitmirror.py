@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import hashlib
+import os
+import re
+import threading
+import uuid
+
+from pathlib import Path
+from typing import Dict, Optional
+
+from mpt import ROOT_DIR
+from mpt.config import UserConfig
+from mpt.file import FileUtils
+from mpt.gitquery import GitQuery
+from mpt.log import RichLogger
+
+
+class GitMirror:
+    """
+    Local cache of bare Git mirrors shared by every clone of the same upstream URL.
+
+    Each upstream repository is mirrored once into buildtrees/git-mirrors/<hash of url>
+    as a bare repository holding all branches and tags. Source directories and
+    submodules are then cloned from that mirror on the local filesystem, and their
+    'origin' remote is pointed back at the upstream URL. Because the mirror lives
+    outside buildtrees/sources, a clean followed by a rebuild re-creates the source
+    tree without downloading the history again.
+
+    Mirrors are refreshed incrementally with 'git fetch', and only when needed:
+    a tag or commit that is already in the mirror can never move, so it is served
+    without contacting the remote; branches are fetched at most once per run.
+
+    Ports that set 'depth' or 'filter' bypass the mirrors and fetch from the remote:
+    a mirror always holds the full history, so serving a shallow clone from it
+    would download far more than the shallow clone itself. Those sources are
+    downloaded again after a clean.
+
+    The cache directory can be changed with the 'git_mirrors' key in settings.yaml,
+    for example to a network share. Setting 'git_mirrors: false' disables the cache
+    and restores direct network clones.
+    """
+
+    FETCH_REFSPECS = ['+refs/heads/*:refs/heads/*', '+refs/tags/*:refs/tags/*']
+
+    _COMMIT_ID = re.compile(r'[0-9a-fA-F]{7,40}')
+
+    _locks: Dict[str, threading.Lock] = {}
+    _refreshed = set()
+    _registry_lock = threading.Lock()
+
+    @staticmethod
+    def get_mirror_root() -> Optional[Path]:
+        """
+        Resolve the mirror cache directory from user settings.
+
+        Returns:
+            Path: Mirror cache directory, or None if mirrors are disabled
+        """
+        setting = UserConfig.load().get('git_mirrors', True)
+        if setting is False or (isinstance(setting, str) and setting.lower() in ('false', 'off', 'no')):
+            return None
+        if isinstance(setting, str) and setting:
+            return Path(setting)
+        return ROOT_DIR / 'buildtrees' / 'git-mirrors'
+
+    @staticmethod
+    def get_mirror_dir(mirror_root: Path, url: str) -> Path:
+        """
+        Compute the mirror location of an upstream URL.
+
+        Args:
+            mirror_root: Mirror cache directory
+            url: Upstream repository URL
+
+        Returns:
+            Path: <mirror_root>/<first 16 digits of the SHA-256 of the URL>
+        """
+        key = hashlib.sha256(url.rstrip('/').encode('utf-8')).hexdigest()[:16]
+        return mirror_root / key
+
+    @classmethod
+    def _get_lock(cls, url: str) -> threading.Lock:
+        """
+        Retrieve the lock serializing work on the mirror of one URL.
+
+        Args:
+            url: Upstream repository URL
+
+        Returns:
+            threading.Lock: Lock shared by all threads working on this mirror
+        """
+        with cls._registry_lock:
+            return cls._locks.setdefault(url, threading.Lock())
+
+    @staticmethod
+    def _is_valid_mirror(mirror_dir: Path) -> bool:
+        """
+        Check that a directory holds a usable bare repository.
+
+        Args:
+            mirror_dir: Mirror directory
+
+        Returns:
+            bool: True if the directory has the layout of a bare repository
+        """
+        return GitQuery.for_repository(mirror_dir).get_git_dir() == mirror_dir
+
+    @staticmethod
+    def _has_pinned_revision(mirror_dir: Path, revision: str) -> bool:
+        """
+        Check whether a revision that cannot move upstream is already in the mirror.
+
+        Tags and commit ids are immutable, so finding them locally means the mirror
+        is current for this revision. Branch names always return False because the
+        remote branch may have advanced.
+
+        Args:
+            mirror_dir: Mirror directory
+            revision: Tag name or commit id
+
+        Returns:
+            bool: True if the revision is a tag or commit present in the mirror
+        """
+        query = GitQuery.for_repository(mirror_dir)
+        if query.has_tag(revision):
+            return True
+        if GitMirror._COMMIT_ID.fullmatch(revision):
+            if f'refs/heads/{revision}' in query.get_refs():
+                return False
+            return query.resolve(f'{revision}^{{commit}}')[0] is not None
+        return False
+
+    @staticmethod
+    def _create(url: str, mirror_dir: Path) -> bool:
+        """
+        Create the mirror of an upstream repository.
+
+        The repository is fetched into a temporary directory that is renamed into place
+        on success, so an interrupted download never leaves a half-populated mirror.
+        Only branches and tags are mirrored; hosting-specific refs such as pull
+        requests are left out.
+
+        Args:
+            url: Upstream repository URL
+            mirror_dir: Mirror directory to create
+
+        Returns:
+            bool: True if the mirror was created, False otherwise
+        """
+        from mpt.git import GitHandler
+
+        mirror_dir.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir = mirror_dir.with_name(f"{mirror_dir.name}.{uuid.uuid4().hex}.tmp")
+        commands = [
+            ['git', 'init', '--bare', '--quiet', str(temp_dir)],
+            ['git', '-C', str(temp_dir), 'remote', 'add', 'origin', url],
+            ['git', '-C', str(temp_dir), 'config', 'remote.origin.fetch', GitMirror.FETCH_REFSPECS[0]],
+            ['git', '-C', str(temp_dir), 'config', '--add', 'remote.origin.fetch', GitMirror.FETCH_REFSPECS[1]],
+            ['git', '-C', str(temp_dir), 'fetch', '--prune', 'origin'],
+        ]
+        for cmd in commands:
+            if not GitHandler._run_git_command(cmd, mirror_dir.parent):
+                FileUtils.delete_directory(temp_dir)
+                return False
+        try:
+            os.replace(temp_dir, mirror_dir)
+            return True
+        except OSError as e:
+            RichLogger.warning(f"Failed to move Git mirror into place for [bold cyan]{url}[/bold cyan]: {e}")
+            FileUtils.delete_directory(temp_dir)
+            return GitMirror._is_valid_mirror(mirror_dir)
+
+    @classmethod
+    def ensure(cls, url: str, revision: Optional[str] = None) -> Optional[Path]:
+        """
+        Make the mirror of an upstream repository available and current for a revision.
+
+        The mirror is created on first use. An existing mirror is fetched from the
+        remote only if the requested revision is a branch, or a tag or commit it does
+        not contain yet; each mirror is fetched at most once per run.
+
+        Args:
+            url: Upstream repository URL
+            revision: Branch, tag or commit that is going to be checked out
+
+        Returns:
+            Path: Mirror directory, or None if mirrors are disabled or the mirror could
+                  not be created
+        """
+        from mpt.git import GitHandler
+
+        mirror_root = cls.get_mirror_root()
+        if mirror_root is None:
+            return None
+        mirror_dir = cls.get_mirror_dir(mirror_root, url)
+
+        with cls._get_lock(url):
+            if cls._is_valid_mirror(mirror_dir):
+                if revision and cls._has_pinned_revision(mirror_dir, revision):
+                    RichLogger.debug(f"Git mirror already has [bold yellow]{revision}[/bold yellow]: {url}")
+                    return mirror_dir
+                if url in cls._refreshed:
+                    return mirror_dir
+                RichLogger.info(f"Updating Git mirror of [bold cyan]{url}[/bold cyan]")
+                if not GitHandler._run_git_command(['git', 'fetch', '--prune', 'origin'], mirror_dir):
+                    RichLogger.warning(f"Failed to update Git mirror, using cached copy: [bold cyan]{url}[/bold cyan]")
+                cls._refreshed.add(url)
+                return mirror_dir
+
+            if mirror_dir.exists():
+                RichLogger.warning(f"Removing damaged Git mirror: [bold cyan]{mirror_dir}[/bold cyan]")
+                if not FileUtils.delete_directory(mirror_dir):
+                    return None
+
+            RichLogger.info(f"Creating Git mirror of [bold cyan]{url}[/bold cyan]")
+            if not cls._create(url, mirror_dir):
+                RichLogger.warning(f"Failed to create Git mirror of [bold cyan]{url}[/bold cyan]")
+                return None
+            cls._refreshed.add(url)
+            return mirror_dir
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import os
+import subprocess
+import threading
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from mpt.log import RichLogger
+
+
+class GitQuery:
+    """
+    Batched and memoized read-only queries against one Git repository.
+
+    Starting a process is expensive on Windows, so instead of running a separate git
+    command for every small question (rev-parse, log -1, tag -l, for-each-ref) the
+    answers are gathered in bulk and remembered for the rest of the run:
+    - all references are listed by a single 'git for-each-ref'
+    - objects are resolved by a single 'git cat-file --batch' that receives every
+      pending revision on its standard input; commit headers from its output also
+      give commit timestamps without 'git log'
+    - the symbolic HEAD is read directly from the Git directory
+
+    Cached answers are dropped with invalidate() whenever a command that may change
+    the repository runs (GitHandler does this for every non-query command). The
+    batch processes exit as soon as their input is consumed, so no process keeps
+    files in the repository open.
+    """
+
+    _instances: Dict[str, 'GitQuery'] = {}
+    _registry_lock = threading.Lock()
+    _stats = {'queries': 0, 'processes': 0}
+
+    def __init__(self, repo_dir: Path):
+        """
+        Create an empty query cache for a repository.
+
+        Args:
+            repo_dir: Working tree or bare repository directory
+        """
+        self.repo_dir = Path(repo_dir)
+        self._lock = threading.Lock()
+        self._refs: Optional[Dict[str, str]] = None
+        self._objects: Dict[str, Optional[Tuple[str, str, str]]] = {}
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        """
+        Normalize a path for use as a cache key.
+
+        Args:
+            path: Repository or parent directory
+
+        Returns:
+            str: Absolute, case-normalized path
+        """
+        return os.path.normcase(os.path.abspath(str(path)))
+
+    @classmethod
+    def for_repository(cls, repo_dir: Path) -> 'GitQuery':
+        """
+        Retrieve the shared query cache of a repository, creating it on first use.
+
+        Args:
+            repo_dir: Working tree or bare repository directory
+
+        Returns:
+            GitQuery: Query cache shared by all threads for this repository
+        """
+        key = cls._key(repo_dir)
+        with cls._registry_lock:
+            query = cls._instances.get(key)
+            if query is None:
+                query = cls(repo_dir)
+                cls._instances[key] = query
+            return query
+
+    @classmethod
+    def invalidate(cls, path: Optional[Path] = None) -> None:
+        """
+        Forget cached answers for a repository and every repository below it.
+
+        Args:
+            path: Directory whose repositories may have changed, or None for all
+        """
+        with cls._registry_lock:
+            if path is None:
+                cls._instances.clear()
+                return
+            key = cls._key(path)
+            prefix = key.rstrip(os.sep) + os.sep
+            for name in [name for name in cls._instances if name == key or name.startswith(prefix)]:
+                del cls._instances[name]
+
+    @classmethod
+    def get_statistics(cls) -> Dict[str, int]:
+        """
+        Summarize how many queries were answered and how many git processes they needed.
+
+        Returns:
+            dict: 'queries' and 'processes' counters for this run
+        """
+        with cls._registry_lock:
+            return dict(cls._stats)
+
+    @classmethod
+    def _count(cls, queries: int, processes: int) -> None:
+        with cls._registry_lock:
+            cls._stats['queries'] += queries
+            cls._stats['processes'] += processes
+
+    def _run(self, cmd: List[str], stdin: Optional[bytes] = None) -> Optional[bytes]:
+        """
+        Run one git process for this repository and return its standard output.
+
+        Args:
+            cmd: Git command and arguments as a list
+            stdin: Data written to the standard input of the process
+
+        Returns:
+            bytes: Standard output, or None if the command failed
+        """
+        RichLogger.debug(f"[bold green]{' '.join(cmd)}[/bold green]")
+        GitQuery._count(0, 1)
+        try:
+            result = subprocess.run(
+                cmd,
+                cwd=str(self.repo_dir),
+                input=stdin,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            RichLogger.exception(f"Error executing git command: {e}")
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    def get_git_dir(self) -> Optional[Path]:
+        """
+        Locate the Git directory of the repository without running git.
+
+        Returns:
+            Path: The .git directory, the directory a '.git' file points to (submodules
+                  and worktrees), the repository itself when it is bare, or None
+        """
+        dot_git = self.repo_dir / '.git'
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding='utf-8', errors='ignore').strip()
+            except OSError:
+                return None
+            if content.startswith('gitdir:'):
+                git_dir = Path(content[len('gitdir:'):].strip())
+                if not git_dir.is_absolute():
+                    git_dir = self.repo_dir / git_dir
+                return git_dir
+            return None
+        if (self.repo_dir / 'HEAD').is_file() and (self.repo_dir / 'objects').is_dir():
+            return self.repo_dir
+        return None
+
+    def get_symbolic_head(self) -> Optional[str]:
+        """
+        Read the branch HEAD points to.
+
+        Returns:
+            str: Full reference name such as 'refs/heads/main', or None when HEAD is
+                 detached or unreadable
+        """
+        GitQuery._count(1, 0)
+        git_dir = self.get_git_dir()
+        if git_dir is None:
+            return None
+        try:
+            content = (git_dir / 'HEAD').read_text(encoding='utf-8', errors='ignore').strip()
+        except OSError:
+            return None
+        if content.startswith('ref:'):
+            return content[len('ref:'):].strip()
+        return None
+
+    def get_refs(self) -> Dict[str, str]:
+        """
+        List all references with the commit or object they point to.
+
+        Annotated tags are peeled, so every tag maps to the commit it tags.
+
+        Returns:
+            dict: Full reference name -> object id, empty if listing failed
+        """
+        GitQuery._count(1, 0)
+        with self._lock:
+            if self._refs is None:
+                refs = {}
+                output = self._run(['git', 'for-each-ref', '--format=%(objectname) %(*objectname) %(refname)'])
+                for line in (output or b'').decode('utf-8', errors='ignore').splitlines():
+                    parts = line.split(' ', 2)
+                    if len(parts) == 3:
+                        refs[parts[2]] = parts[1] or parts[0]
+                self._refs = refs
+            return self._refs
+
+    def has_tag(self, name: str) -> bool:
+        """
+        Check whether a tag exists locally.
+
+        Args:
+            name: Tag name without the refs/tags/ prefix
+
+        Returns:
+            bool: True if refs/tags/<name> exists
+        """
+        return f'refs/tags/{name}' in self.get_refs()
+
+    def _lookup(self, revisions: List[str]) -> None:
+        """
+        Resolve every revision not yet cached with one 'git cat-file --batch' process.
+
+        Args:
+            revisions: Revision expressions such as 'HEAD' or 'v1.0^{commit}'
+        """
+        pending = [rev for rev in dict.fromkeys(revisions) if rev not in self._objects]
+        if not pending:
+            return
+        output = self._run(['git', 'cat-file', '--batch'], ''.join(f'{rev}\n' for rev in pending).encode('utf-8'))
+        if output is None:
+            for rev in pending:
+                self._objects[rev] = None
+            return
+
+        pos = 0
+        for rev in pending:
+            end = output.find(b'\n', pos)
+            if end < 0:
+                self._objects[rev] = None
+                continue
+            header = output[pos:end].decode('utf-8', errors='ignore').split()
+            pos = end + 1
+            if len(header) != 3 or not header[2].isdigit():
+                # '<rev> missing' or '<rev> ambiguous'
+                self._objects[rev] = None
+                continue
+            object_id, object_type, size = header[0], header[1], int(header[2])
+            content = output[pos:pos + size]
+            pos += size + 1
+            # Only commit headers are kept; other object contents are not needed
+            text = content.split(b'\n\n', 1)[0].decode('utf-8', errors='ignore') if object_type == 'commit' else ''
+            self._objects[rev] = (object_id, object_type, text)
+
+    def resolve(self, *revisions: str) -> List[Optional[str]]:
+        """
+        Resolve revision expressions to object ids in a single batch.
+
+        Args:
+            revisions: Revision expressions such as 'HEAD' or 'refs/tags/v1.0^{commit}'
+
+        Returns:
+            list: Object id for each revision, None for revisions that do not exist
+        """
+        GitQuery._count(len(revisions), 0)
+        with self._lock:
+            self._lookup(list(revisions))
+            return [self._objects[rev][0] if self._objects.get(rev) else None for rev in revisions]
+
+    def get_commit_time(self, revision: str = 'HEAD') -> float:
+        """
+        Retrieve the author timestamp of a commit, like 'git log -1 --format=%at'.
+
+        Args:
+            revision: Revision expression of the commit
+
+        Returns:
+            float: Unix timestamp of the commit, or 0 if unavailable
+        """
+        GitQuery._count(1, 0)
+        with self._lock:
+            self._lookup([revision])
+            entry = self._objects.get(revision)
+        if not entry or entry[1] != 'commit':
+            return 0
+        for line in entry[2].splitlines():
+            if line.startswith('author '):
+                parts = line.rsplit(' ', 2)
+                if len(parts) == 3 and parts[1].lstrip('-').isdigit():
+                    return float(parts[1])
+        return 0
@@ -86,8 +86,11 @@ class CommandLineHelp:
                 ("--fetch", "📥 Download source archives for specified libraries"),
                 ("--<lib>-prefix PATH", "📚 Set library-specific installation prefix"),
                 ("--triplet TRIPLET", "🎯 Specify target triplet in format {arch}-{os} (default: x64-windows)"),
+                ("-j, --jobs N", "⚡ Build up to N independent libraries in parallel (default: 1)"),
+                ("--keep-going", "⏭️ Continue building independent libraries after a failure"),
                 ("--add", "➕ Add and configure a new library with build system detection"),
                 ("--remove", "➖ Remove library configuration files"),
+                ("--owns PATH...", "🔎 Show which installed libraries own the specified paths"),
                 ("-h, --help", "💡 Show this help message and exit"),
                 ("[LIBRARIES]", "📦 List of libraries to process (optional)")
             ]
@@ -134,6 +137,8 @@ class CommandLineHelp:
                 ("mpt --install llvm-project", "🔧 Install complex toolchain (LLVM) for x64"),
                 ("mpt --install ffmpeg", "🎬 Install multimedia framework (FFmpeg) for x64"),
                 ("mpt --install openssl curl", "📡 Install networking libraries (OpenSSL, cURL) for x64"),
+                ("mpt --install --jobs 4 ffmpeg", "⚡ Install FFmpeg building up to 4 dependencies in parallel"),
+                ("mpt --install --jobs 4 --keep-going", "⏭️ Install all libraries in parallel, skipping only failed subtrees"),
                 ("mpt --install --triplet x86-windows gmp fftw", "🧮 Install math libraries for x86-windows triplet"),
                 ("mpt --uninstall", "🗑️ Uninstall all libraries for x64"),
                 ("mpt --triplet x86-windows --uninstall gmp fftw", "🗑️ Uninstall specific libraries for x86-windows"),
@@ -145,6 +150,7 @@ class CommandLineHelp:
                 ("mpt --clean gmp fftw", "🧹 Clean artifacts for specific libraries"),
                 ("mpt --fetch", "📥 Download sources for all libraries"),
                 ("mpt --fetch gmp fftw", "📥 Download sources for specific libraries"),
+                ("mpt --owns include/zlib.h", "🔎 Show which library installed include/zlib.h for x64"),
                 ("mpt --help", "📘 Display this help information"),
                 ("mpt --llvm-project-prefix D:\\LLVM", "📚 Set library-specific prefix for LLVM"),
                 ("mpt --install --perl-prefix D:\\Perl", "🐪 Install Perl with custom prefix"),
@@ -6,10 +6,16 @@ Copyright (c) 2024 Jianshan Jiang
 
 """
 
+import os
+import threading
+
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import List, Optional
 
 from mpt import ROOT_DIR
+from mpt.database import InstallDatabase
 from mpt.log import RichLogger
 from mpt.yaml import YamlUtils
 
@@ -20,8 +26,22 @@ class HistoryManager:
     Provides comprehensive tracking of library installations across different triplets,
     including version information, build timestamps. Maintains persistent records in
     separate YAML files for each triplet for better organization.
+
+    Records and installed file lists are stored in status.yaml and <lib>.list files, or
+    in the optional SQLite InstallDatabase when settings.yaml selects 'database: sqlite'.
+
+    Each triplet's records are loaded once per process and all lookups are served
+    from memory. Changes are written back atomically (temporary file + rename) when a
+    record is added or removed, or once at the end of a batch() block.
     """
 
+    # Serializes read-modify-write cycles of concurrent builds
+    _lock = threading.RLock()
+    # In-memory records per triplet, changed nodes per triplet and batch nesting depth
+    _records = {}
+    _dirty = {}
+    _batch_depth = 0
+
     @classmethod
     def _get_record_path(cls, triplet: str) -> Path:
         """
@@ -44,6 +64,9 @@ class HistoryManager:
         """
         Load installation records from triplet-specific YAML storage with error handling.
 
+        The file is only parsed on first access; later calls return the same in-memory
+        dictionary, which is updated in place by add_record and remove_record.
+
         Args:
             triplet: Target triplet identifier
 
@@ -51,30 +74,127 @@ class HistoryManager:
             dict: Nested dictionary structure containing installation records for the triplet,
                   or empty dictionary if file doesn't exist or errors occur
         """
-        record_path = cls._get_record_path(triplet)
-        if not record_path.exists():
-            return {}
-        records = YamlUtils.load(record_path, f"status.yaml") or {}
-        return records
+        with cls._lock:
+            records = cls._records.get(triplet)
+            if records is None:
+                record_path = cls._get_record_path(triplet)
+                records = {}
+                if InstallDatabase.enabled():
+                    records = InstallDatabase.load_records(triplet)
+                elif record_path.exists():
+                    records = YamlUtils.load(record_path, f"status.yaml") or {}
+                cls._records[triplet] = records
+            return records
 
     @classmethod
-    def _save_records(cls, triplet: str, records: dict) -> bool:
+    def _save_records(cls, triplet: str, records: dict, nodes: Optional[set] = None) -> bool:
         """
         Persist installation records to triplet-specific YAML storage.
 
         Args:
             triplet: Target triplet identifier
             records: Complete installation records structure to persist for the triplet
+            nodes: Nodes changed since the last write; the database only rewrites these,
+                   while status.yaml is always written as a whole
 
         Returns:
             bool: True if records were successfully written to disk, False on any error
         """
+        if InstallDatabase.enabled():
+            return InstallDatabase.save_records(triplet, records, nodes)
+
         record_path = cls._get_record_path(triplet)
         record_path.parent.mkdir(parents=True, exist_ok=True)
-        return YamlUtils.dump(record_path, records, f"status.yaml", sort_keys=True)
+        temp_path = record_path.with_name(f"{record_path.name}.tmp")
+        if not YamlUtils.dump(temp_path, records, f"status.yaml", sort_keys=True):
+            return False
+        try:
+            # Replace the previous file in one step so readers never see a partial write
+            os.replace(temp_path, record_path)
+            return True
+        except OSError as e:
+            RichLogger.exception(f"Error replacing [bold red]{record_path}[/bold red]: {e}")
+            return False
+
+    @classmethod
+    def _commit(cls, triplet: str, node_name: str) -> bool:
+        """
+        Persist the in-memory records of a triplet, or defer the write inside a batch.
+
+        Args:
+            triplet: Target triplet identifier
+            node_name: Node whose record was added, changed or removed
+
+        Returns:
+            bool: True if records were written or queued for the end of the batch,
+                  False on persistence error
+        """
+        with cls._lock:
+            nodes = cls._dirty.setdefault(triplet, set())
+            nodes.add(node_name)
+            if cls._batch_depth > 0:
+                return True
+            if cls._save_records(triplet, cls._load_records(triplet), nodes):
+                del cls._dirty[triplet]
+                return True
+            # Keep the change pending so that a later flush can retry it
+            return False
+
+    @classmethod
+    def flush(cls) -> bool:
+        """
+        Write every triplet with pending changes back to its status.yaml.
+
+        Returns:
+            bool: True if all pending changes were persisted, False otherwise
+        """
+        success = True
+        with cls._lock:
+            for triplet in sorted(cls._dirty):
+                if cls._save_records(triplet, cls._load_records(triplet), cls._dirty[triplet]):
+                    del cls._dirty[triplet]
+                else:
+                    success = False
+        return success
 
     @classmethod
-    def add_record(cls, triplet: str, node_name: str, version: str) -> bool:
+    @contextmanager
+    def batch(cls):
+        """
+        Group several record changes into a single write per triplet.
+
+        Record changes made inside the block only update memory; every modified
+        status.yaml is flushed once when the outermost block exits.
+
+        Yields:
+            None
+        """
+        with cls._lock:
+            cls._batch_depth += 1
+        try:
+            yield
+        finally:
+            with cls._lock:
+                cls._batch_depth -= 1
+                if cls._batch_depth == 0 and not cls.flush():
+                    RichLogger.error("Failed to save batched installation records")
+
+    @classmethod
+    def reload(cls, triplet: str = None) -> None:
+        """
+        Discard in-memory records so that the next access reads status.yaml again.
+
+        Args:
+            triplet: Target triplet identifier, or None to discard all triplets
+        """
+        with cls._lock:
+            if triplet is None:
+                cls._records.clear()
+            else:
+                cls._records.pop(triplet, None)
+
+    @classmethod
+    def add_record(cls, triplet: str, node_name: str, version: str, fingerprint: Optional[str] = None) -> bool:
         """
         Create or update an installation record for a specific library node and triplet.
 
@@ -82,23 +202,27 @@ class HistoryManager:
             triplet: Target triplet identifier (e.g., 'x64-windows')
             node_name: Library node identifier with optional dependency type
             version: Version string of the installed library
+            fingerprint: Build fingerprint the node was built with, if known
 
         Returns:
             bool: True if record was successfully created or updated, False on error
         """
         try:
-            records = cls._load_records(triplet)
+            with cls._lock:
+                records = cls._load_records(triplet)
 
-            # Initialize library record if it doesn't exist
-            if node_name not in records:
-                records[node_name] = {}
+                # Initialize library record if it doesn't exist
+                if node_name not in records:
+                    records[node_name] = {}
 
-            records[node_name] = {
-                'version': version,
-                'built': datetime.now()
-            }
+                records[node_name] = {
+                    'version': version,
+                    'built': datetime.now()
+                }
+                if fingerprint:
+                    records[node_name]['fingerprint'] = fingerprint
 
-            success = cls._save_records(triplet, records)
+                success = cls._commit(triplet, node_name)
             if not success:
                 RichLogger.error(f"[[bold red]{node_name}[/bold red]] Failed to add record for library on triplet [magenta]{triplet}[/magenta]")
             else:
@@ -121,22 +245,50 @@ class HistoryManager:
             bool: True if record was removed or didn't exist, False on persistence error
         """
         try:
-            records = cls._load_records(triplet)
-            if not records:
+            with cls._lock:
+                records = cls._load_records(triplet)
+                if not records:
+                    return True
+
+                if node_name in records:
+                    # Remove the specific library record
+                    del records[node_name]
+                    success = cls._commit(triplet, node_name)
+                    if success:
+                        RichLogger.info(f"[[bold green]{node_name}[/bold green]] Successfully removed installation record for triplet [magenta]{triplet}[/magenta]")
+                    return success
                 return True
-
-            if node_name in records:
-                # Remove the specific library record
-                del records[node_name]
-                success = cls._save_records(triplet, records)
-                if success:
-                    RichLogger.info(f"[[bold green]{node_name}[/bold green]] Successfully removed installation record for triplet [magenta]{triplet}[/magenta]")
-                return success
-            return True
         except Exception as e:
             RichLogger.exception(f"Error removing record for {node_name} on {triplet}: {e}")
             return False
 
+    @classmethod
+    def set_fingerprint(cls, triplet: str, node_name: str, fingerprint: str) -> bool:
+        """
+        Attach a build fingerprint to an existing installation record.
+
+        Used to upgrade records written before fingerprints were stored without
+        changing their version or build time.
+
+        Args:
+            triplet: Target triplet identifier
+            node_name: Library node identifier
+            fingerprint: Build fingerprint of the installed node
+
+        Returns:
+            bool: True if the fingerprint was stored, False if no record exists or on error
+        """
+        try:
+            with cls._lock:
+                records = cls._load_records(triplet)
+                if node_name not in records:
+                    return False
+                records[node_name]['fingerprint'] = fingerprint
+                return cls._commit(triplet, node_name)
+        except Exception as e:
+            RichLogger.exception(f"Error storing fingerprint for {node_name} on {triplet}: {e}")
+            return False
+
     @classmethod
     def check_installed(cls, triplet: str, node_name: str) -> bool:
         """
@@ -184,7 +336,7 @@ class HistoryManager:
 
             # Compare versions
             current_version = config.get('version', 'unknown')
-            if current_version != lib_info.get('version'):
+            if str(current_version) != str(lib_info.get('version')):
                 return True
 
             return False
@@ -202,8 +354,8 @@ class HistoryManager:
             node_name: Library node identifier for information lookup
 
         Returns:
-            dict: Dictionary containing version string, datetime object for build time,
-                 or None if no record exists
+            dict: Dictionary containing version string, datetime object for build time
+                 and build fingerprint (None for older records), or None if no record exists
         """
         try:
             records = cls._load_records(triplet)
@@ -212,7 +364,8 @@ class HistoryManager:
 
             record = records[node_name]
             result = {
-                'version': record.get('version')
+                'version': record.get('version'),
+                'fingerprint': record.get('fingerprint')
             }
 
             time_val = record.get('built')
@@ -240,8 +393,95 @@ class HistoryManager:
             dict: Dictionary of library records for the triplet, or empty dict if none
         """
         try:
-            records = cls._load_records(triplet)
-            return records
+            return dict(cls._load_records(triplet))
         except Exception as e:
             RichLogger.exception(f"Error getting records for triplet {triplet}: {e}")
             return {}
+
+    @classmethod
+    def _get_file_list_path(cls, triplet: str, lib: str) -> Path:
+        """
+        Retrieve the filesystem path of the installed file list of a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            Path: Absolute path of installed/info/<triplet>/<lib>.list
+        """
+        return ROOT_DIR / 'installed' / 'info' / triplet / f"{lib}.list"
+
+    @classmethod
+    def save_file_list(cls, triplet: str, lib: str, files: List[str]) -> bool:
+        """
+        Persist the files installed by a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+            files: Installed paths relative to the library prefix
+
+        Returns:
+            bool: True if the file list was stored, False on error
+        """
+        try:
+            if InstallDatabase.enabled():
+                return InstallDatabase.save_files(triplet, lib, sorted(files))
+
+            list_file = cls._get_file_list_path(triplet, lib)
+            list_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(list_file, 'w', encoding='utf-8') as f:
+                for file_path in sorted(files):
+                    f.write(f"{file_path}\n")
+            return True
+        except Exception as e:
+            RichLogger.exception(f"Error saving installed file list for {lib} on {triplet}: {e}")
+            return False
+
+    @classmethod
+    def load_file_list(cls, triplet: str, lib: str) -> Optional[List[str]]:
+        """
+        Retrieve the files installed by a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            list: Installed paths relative to the library prefix, or None if no list is recorded
+        """
+        try:
+            if InstallDatabase.enabled():
+                return InstallDatabase.load_files(triplet, lib)
+
+            list_file = cls._get_file_list_path(triplet, lib)
+            if not list_file.exists():
+                return None
+            content = list_file.read_text(encoding='utf-8', errors='ignore')
+            return [line.strip() for line in content.splitlines() if line.strip()]
+        except Exception as e:
+            RichLogger.exception(f"Error reading installed file list for {lib} on {triplet}: {e}")
+            return None
+
+    @classmethod
+    def remove_file_list(cls, triplet: str, lib: str) -> bool:
+        """
+        Forget the files installed by a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            bool: True if the file list was removed or did not exist, False on error
+        """
+        try:
+            if InstallDatabase.enabled():
+                return InstallDatabase.delete_files(triplet, lib)
+
+            cls._get_file_list_path(triplet, lib).unlink(missing_ok=True)
+            return True
+        except Exception as e:
+            RichLogger.exception(f"Error removing installed file list for {lib} on {triplet}: {e}")
+            return False
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import json
+import os
+import threading
+
+from typing import Any, Dict, List, Optional
+
+from mpt import ROOT_DIR
+from mpt.config import LibraryConfig
+from mpt.log import RichLogger
+
+
+class PortIndex:
+    """
+    Persistent index of the port metadata used by listing, validation and dependency resolution.
+
+    Keeps a compact summary of every ports/<lib>/config.yaml in buildtrees/index.json so
+    that commands which only need names, versions and dependencies do not have to parse
+    every port configuration on startup. Each entry remembers the modification time and
+    size of its config.yaml; only ports whose file changed are re-parsed, new ports are
+    added and removed ports are dropped whenever the index is refreshed.
+    """
+
+    # Bump when the layout of an index entry changes to force a full rebuild
+    INDEX_VERSION = 1
+    INDEX_FILE = ROOT_DIR / 'buildtrees' / 'index.json'
+
+    # Configuration keys copied into each index entry
+    INDEX_FIELDS = ('name', 'version', 'url', 'sha256', 'supports', 'dependencies', 'script')
+
+    _ports: Optional[Dict[str, Dict[str, Any]]] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the port index, refreshing it from the ports directory once per process.
+
+        Returns:
+            Dictionary mapping library names to their indexed metadata
+        """
+        with cls._lock:
+            if cls._ports is None:
+                cls._ports = cls._refresh()
+            return cls._ports
+
+    @classmethod
+    def get(cls, lib: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve the indexed metadata of a single library.
+
+        Args:
+            lib: Name of the library to look up
+
+        Returns:
+            Dictionary with the indexed configuration fields, or None if the port does not exist
+        """
+        return cls.load().get(lib)
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """
+        List the names of all ports known to the index.
+
+        Returns:
+            Sorted list of library names
+        """
+        return sorted(cls.load().keys())
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """
+        Drop the in-process index so the next access rescans the ports directory.
+        """
+        with cls._lock:
+            cls._ports = None
+
+    @classmethod
+    def _refresh(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Bring the persisted index up to date with the ports directory.
+
+        Returns:
+            Dictionary mapping library names to their indexed metadata
+        """
+        ports_dir = ROOT_DIR / 'ports'
+        stored = cls._read_index()
+        ports = {}
+        parsed = 0
+
+        try:
+            lib_dirs = [d for d in ports_dir.iterdir() if d.is_dir()]
+        except OSError as e:
+            RichLogger.exception(f"Failed to scan ports directory [bold red]{ports_dir}[/bold red]: {e}")
+            return {}
+
+        for lib_dir in lib_dirs:
+            lib_name = lib_dir.name
+            try:
+                stat = (lib_dir / 'config.yaml').stat()
+            except OSError:
+                continue
+
+            entry = stored.get(lib_name)
+            if entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+                ports[lib_name] = entry
+                continue
+
+            config = LibraryConfig.load(lib_name)
+            if not config:
+                RichLogger.warning(
+                    f"No valid configuration found for library: [bold yellow]{lib_name}[/bold yellow] "
+                    f"in directory: [cyan]{lib_dir}[/cyan]"
+                )
+                continue
+
+            entry = {field: config.get(field) for field in cls.INDEX_FIELDS}
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            ports[lib_name] = entry
+            parsed += 1
+
+        if parsed or ports.keys() != stored.keys():
+            RichLogger.debug(f"Port index updated: [bold yellow]{parsed}[/bold yellow] re-parsed, "
+                             f"[bold cyan]{len(ports)}[/bold cyan] ports indexed")
+            cls._write_index(ports)
+        return ports
+
+    @classmethod
+    def _read_index(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Read the persisted index, ignoring missing, corrupt or outdated files.
+
+        Returns:
+            Dictionary of stored index entries, empty if the index must be rebuilt
+        """
+        try:
+            with open(cls.INDEX_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != cls.INDEX_VERSION:
+                return {}
+            return data.get('ports', {}) or {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            RichLogger.warning(f"Ignoring unreadable port index [bold yellow]{cls.INDEX_FILE}[/bold yellow]: {e}")
+            return {}
+
+    @classmethod
+    def _write_index(cls, ports: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Atomically persist the index next to the build trees.
+
+        Args:
+            ports: Dictionary mapping library names to their indexed metadata
+
+        Returns:
+            bool: True if the index was written, False otherwise
+        """
+        temp_file = cls.INDEX_FILE.with_suffix('.json.tmp')
+        try:
+            cls.INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': cls.INDEX_VERSION, 'ports': ports}, f, default=str)
+            os.replace(temp_file, cls.INDEX_FILE)
+            return True
+        except Exception as e:
+            RichLogger.exception(f"Failed to write port index [bold red]{cls.INDEX_FILE}[/bold red]: {e}")
+            try:
+                temp_file.unlink()
+            except OSError:
+                pass
+            return False
@@ -12,8 +12,11 @@ from urllib.parse import urljoin
 
 from mpt import ROOT_DIR
 from mpt.config import LibraryConfig
+from mpt.digest import DigestCache
+from mpt.index import PortIndex
 from mpt.file import FileUtils
 from mpt.log import RichLogger
+from mpt.session import HttpSession
 from mpt.source import SourceManager
 
 
@@ -53,6 +56,8 @@ class LibraryManager:
         if not LibraryConfig.dump(lib, config):
             RichLogger.error(f"Failed to save configuration for library [bold red]{lib}[/bold red]")
             return
+        LibraryConfig.invalidate(lib)
+        PortIndex.invalidate()
         RichLogger.debug(f"[SUCCESS] Configuration created at {lib_dir / 'config.yaml'}")
 
     @staticmethod
@@ -82,6 +87,8 @@ class LibraryManager:
 
             # Remove directory and all contents
             FileUtils.delete_directory(lib_dir, permanent=False)
+            LibraryConfig.invalidate(lib)
+            PortIndex.invalidate()
 
             RichLogger.info(f"Successfully removed library [cyan]{lib}[/cyan]")
             return True
@@ -162,8 +169,8 @@ class LibraryManager:
                 # Construct the correct .gitmodules URL
                 gitmodules_url = LibraryManager._get_gitmodules_url(source_config["url"], branch)
 
-                response = requests.get(gitmodules_url, timeout=10, verify=False)
-                has_gitmodules = response.status_code == 200
+                with HttpSession.get().get(gitmodules_url, timeout=10, verify=False) as response:
+                    has_gitmodules = response.status_code == 200
 
             except requests.Timeout:
                 RichLogger.warning(f"Timeout occurred while checking .gitmodules for {source_name}")
@@ -226,7 +233,7 @@ class LibraryManager:
                     download_filepath = ROOT_DIR / 'downloads' / download_filename
                     # Calculate SHA256
                     if download_filepath.exists():
-                        sha256_value = FileUtils.calc_hash(download_filepath)
+                        sha256_value = DigestCache.get_digest(download_filepath)
                         source_config['sha256'] = sha256_value
                         RichLogger.info(f"Automatically calculated SHA256 for {source_name}: {sha256_value}")
                     else:
@@ -9,6 +9,7 @@ Copyright (c) 2024 Jianshan Jiang
 
 import logging
 import os
+import threading
 
 from pathlib import Path
 
@@ -37,7 +38,9 @@ class RichLogger:
         log_path=False            # Disable automatic logging to file for clean console output
     )
     _formatter = None
-    _file_handler = None
+    _file_handlers = {}
+    _console_levels = {}
+    _handlers_lock = threading.Lock()
 
     @classmethod
     def initialize(cls, log_level=logging.DEBUG):
@@ -94,6 +97,8 @@ class RichLogger:
         # Configure formatter for log messages
         cls._formatter = logging.Formatter("%(message)s")
         console_handler.setFormatter(cls._formatter)
+        # Allow worker threads to raise their own console threshold
+        console_handler.addFilter(cls._filter_console_record)
         cls._logger.addHandler(console_handler)
 
         # Install rich traceback handler for better exception reporting
@@ -111,12 +116,16 @@ class RichLogger:
         Ensures proper directory creation and handles existing file handlers gracefully.
         Supports UTF-8 encoding for international character compatibility.
 
+        The handler only accepts records emitted by the calling thread, so concurrent
+        builds running on worker threads each write to their own log file.
+
         Args:
             log_file (str or Path): Filesystem path where log messages should be written
             level (int): Minimum severity level for messages to be written to the file
 
         Note:
-            Replaces any existing file handler to ensure only one file output is active
+            Replaces any existing file handler of the calling thread to ensure only one
+            file output is active per thread
         """
         # Remove existing file handler if present
         cls.remove_file_logging()
@@ -127,13 +136,17 @@ class RichLogger:
             if log_dir:
                 os.makedirs(log_dir, exist_ok=True)
 
-            # Create file handler
-            cls._file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-            cls._file_handler.setLevel(level)
-            cls._file_handler.setFormatter(cls._formatter)
+            # Create file handler restricted to records from the current thread
+            thread_id = threading.get_ident()
+            file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+            file_handler.setLevel(level)
+            file_handler.setFormatter(cls._formatter)
+            file_handler.addFilter(lambda record: record.thread == thread_id)
 
             # Add handler to logger
-            cls._logger.addHandler(cls._file_handler)
+            with cls._handlers_lock:
+                cls._file_handlers[thread_id] = file_handler
+            cls._logger.addHandler(file_handler)
         except Exception as e:
             cls._logger.error(f"Failed to add file logging: {e}")
 
@@ -142,18 +155,50 @@ class RichLogger:
         """
         Remove file-based logging from the logging configuration.
 
-        Safely detaches and closes the file handler to release file resources and
-        stop writing log messages to disk. Handles cleanup even if no file handler
-        is currently active.
+        Safely detaches and closes the file handler of the calling thread to release
+        file resources and stop writing log messages to disk. Handles cleanup even if
+        no file handler is currently active.
         """
-        if cls._file_handler:
+        with cls._handlers_lock:
+            file_handler = cls._file_handlers.pop(threading.get_ident(), None)
+        if file_handler:
             try:
-                cls._logger.removeHandler(cls._file_handler)
-                cls._file_handler.close()
+                cls._logger.removeHandler(file_handler)
+                file_handler.close()
             except Exception as e:
                 cls._logger.error(f"Failed to remove file logging: {e}")
-            finally:
-                cls._file_handler = None
+
+    @classmethod
+    def set_console_level(cls, level=None):
+        """
+        Set the minimum console severity for messages emitted by the calling thread.
+
+        Used by parallel builds so that worker threads keep their detailed output in
+        per-node log files instead of interleaving it on the shared console.
+
+        Args:
+            level (int, optional): Minimum level shown on the console for this thread,
+                                   or None to restore the global logger level
+        """
+        with cls._handlers_lock:
+            if level is None:
+                cls._console_levels.pop(threading.get_ident(), None)
+            else:
+                cls._console_levels[threading.get_ident()] = level
+
+    @classmethod
+    def _filter_console_record(cls, record):
+        """
+        Decide whether a log record should reach the console handler.
+
+        Args:
+            record (logging.LogRecord): Record about to be emitted
+
+        Returns:
+            bool: True if the record meets the console level of its originating thread
+        """
+        level = cls._console_levels.get(record.thread)
+        return level is None or record.levelno >= level
 
     @classmethod
     def debug(cls, msg, *args, markup=True, **kwargs):
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from mpt.config import UserConfig
+from mpt.log import RichLogger
+from mpt.session import HttpSession
+
+
+class MirrorList:
+    """
+    Alternative locations for source archives.
+
+    Besides the 'url' of a source, archives can be taken from:
+    - per-port mirrors: a 'mirrors' list of complete URLs in the port's config.yaml
+      (or in an entry of its 'extras')
+    - global mirrors: a 'mirrors' list in settings.yaml whose entries are base URLs
+      or directories; the archive is looked up there under its downloads/ file name
+      (<name>-<version>.<ext>), so a copy of another machine's downloads directory
+      works as a mirror
+
+    Entries without a URL scheme, or with the file:// scheme, are local directories
+    or files. They are always tried first, which lets an air-gapped build farm be
+    seeded once from a shared directory. Remote candidates are probed concurrently
+    and tried in the order of their measured response time; candidates that do
+    not answer the probe are kept as a last resort.
+    """
+
+    PROBE_TIMEOUT = 5  # Seconds for the latency probe of a remote candidate
+
+    @staticmethod
+    def is_local(location: str) -> bool:
+        """
+        Determine whether a mirror location refers to the local filesystem.
+
+        Args:
+            location: URL or filesystem path
+
+        Returns:
+            bool: True for plain paths, drive-letter paths and file:// URLs
+        """
+        scheme = urlparse(location).scheme.lower()
+        return scheme in ('', 'file') or len(scheme) == 1
+
+    @staticmethod
+    def to_local_path(location: str) -> Path:
+        """
+        Convert a local mirror location into a filesystem path.
+
+        Args:
+            location: Plain path or file:// URL
+
+        Returns:
+            Path: Filesystem path of the location
+        """
+        parsed = urlparse(location)
+        if parsed.scheme.lower() == 'file':
+            path = unquote(parsed.path)
+            # file:///C:/mirror -> C:/mirror
+            if len(path) > 2 and path[0] == '/' and path[2] == ':':
+                path = path[1:]
+            return Path(path)
+        return Path(location)
+
+    @staticmethod
+    def get_candidates(config: dict, archive_filename: str) -> List[str]:
+        """
+        Collect every location an archive can be fetched from, without duplicates.
+
+        Args:
+            config: Source configuration containing 'url' and optional 'mirrors'
+            archive_filename: File name of the archive in the downloads directory
+
+        Returns:
+            list: Candidate URLs or local paths, in configuration order
+        """
+        candidates = []
+        for url in config.get('mirrors') or []:
+            candidates.append(str(url))
+        candidates.append(config['url'])
+        for base in UserConfig.load().get('mirrors') or []:
+            base = str(base)
+            if MirrorList.is_local(base):
+                candidates.append(str(MirrorList.to_local_path(base) / archive_filename))
+            else:
+                candidates.append(f"{base.rstrip('/')}/{archive_filename}")
+        return list(dict.fromkeys(candidates))
+
+    @staticmethod
+    def _probe(url: str) -> Optional[float]:
+        """
+        Measure how long a remote candidate takes to answer a HEAD request.
+
+        Args:
+            url: Remote candidate URL
+
+        Returns:
+            float: Response time in seconds, or None if the candidate is unreachable
+                   or does not have the file
+        """
+        from mpt.download import DownloadHandler
+
+        try:
+            start = time.monotonic()
+            with HttpSession.get().head(url, headers=DownloadHandler._get_wget_headers(),
+                                        timeout=MirrorList.PROBE_TIMEOUT, allow_redirects=True,
+                                        verify=False) as response:
+                elapsed = time.monotonic() - start
+            # Some servers reject HEAD although GET works; keep them as reachable
+            if response.status_code < 400 or response.status_code in (403, 405):
+                return elapsed
+            RichLogger.debug(f"Mirror probe returned [bold yellow]{response.status_code}[/bold yellow]: {url}")
+        except requests.exceptions.RequestException as e:
+            RichLogger.debug(f"Mirror probe failed for {url}: {str(e)}")
+        return None
+
+    @staticmethod
+    def rank(candidates: List[str]) -> List[str]:
+        """
+        Order candidates for download: local files, then remote candidates by latency.
+
+        Args:
+            candidates: Candidate URLs or local paths
+
+        Returns:
+            list: Candidates in the order they should be tried
+        """
+        local = [c for c in candidates if MirrorList.is_local(c)]
+        remote = [c for c in candidates if not MirrorList.is_local(c)]
+        if len(remote) <= 1:
+            return local + remote
+
+        with ThreadPoolExecutor(max_workers=len(remote), thread_name_prefix="mpt-probe") as executor:
+            latencies = list(executor.map(MirrorList._probe, remote))
+
+        measured: List[Tuple[float, int, str]] = []
+        unreachable = []
+        for index, (url, latency) in enumerate(zip(remote, latencies)):
+            if latency is None:
+                unreachable.append(url)
+            else:
+                measured.append((latency, index, url))
+        measured.sort()
+        for latency, _, url in measured:
+            RichLogger.debug(f"Mirror latency [bold cyan]{latency * 1000:.0f} ms[/bold cyan]: {url}")
+        return local + [url for _, _, url in measured] + unreachable
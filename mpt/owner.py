@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import json
+import os
+import threading
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from mpt import ROOT_DIR
+from mpt.config import UserConfig
+from mpt.database import InstallDatabase
+from mpt.log import RichLogger
+
+
+class OwnershipIndex:
+    """
+    Reverse index from installed paths to the libraries that installed them.
+
+    With 'database: sqlite' the indexed files table of InstallDatabase is the only
+    ownership store and every query is answered by the database.
+
+    Otherwise each triplet keeps installed/info/<triplet>/owners.json with the
+    normalized absolute paths recorded for every library, together with the
+    modification time and size of the library's .list file. In memory the paths are
+    also indexed by path, so ownership queries and collision checks are dictionary
+    lookups instead of a scan over every installed file list, and a library's
+    entries are dropped without scanning the whole index. Changes are written back
+    once by flush(); libraries whose .list file no longer matches the stored stamp
+    (for example after an interrupted run) are re-read when the index is loaded.
+    """
+
+    INDEX_VERSION = 2
+
+    # In-memory state per triplet: library -> (list file stamp, owned paths) and
+    # normalized absolute path -> owning libraries
+    _libs: Dict[str, Dict[str, Tuple[Optional[list], Set[str]]]] = {}
+    _paths: Dict[str, Dict[str, List[str]]] = {}
+    _dirty = set()
+    _lock = threading.RLock()
+
+    @staticmethod
+    def normalize(path) -> str:
+        """
+        Normalize a path into the key form used by the index.
+
+        Args:
+            path: Absolute path of an installed file
+
+        Returns:
+            str: Absolute path with platform case and separator normalization applied
+        """
+        return os.path.normcase(os.path.abspath(str(path)))
+
+    @classmethod
+    def _get_index_path(cls, triplet: str) -> Path:
+        """
+        Retrieve the filesystem path of the ownership index of a triplet.
+
+        Args:
+            triplet: Target triplet identifier
+
+        Returns:
+            Path: Absolute path of installed/info/<triplet>/owners.json
+        """
+        return ROOT_DIR / 'installed' / 'info' / triplet / 'owners.json'
+
+    @staticmethod
+    def _get_stamp(triplet: str, lib: str) -> Optional[list]:
+        """
+        Read the modification time and size of a library's installed file list.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            list: [mtime_ns, size], or None if the library has no file list
+        """
+        from mpt.history import HistoryManager
+        try:
+            stat = HistoryManager._get_file_list_path(triplet, lib).stat()
+            return [stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            return None
+
+    @classmethod
+    def _read_lib(cls, triplet: str, lib: str) -> Set[str]:
+        """
+        Read the normalized absolute paths recorded for a library.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+
+        Returns:
+            set: Normalized absolute paths from the library's file list
+        """
+        from mpt.history import HistoryManager
+        prefix = UserConfig.get_prefix(triplet, lib)
+        return {cls.normalize(prefix / file_path) for file_path in HistoryManager.load_file_list(triplet, lib) or []}
+
+    @classmethod
+    def _load(cls, triplet: str) -> Dict[str, List[str]]:
+        """
+        Load the index of a triplet and refresh libraries whose file list changed.
+
+        Args:
+            triplet: Target triplet identifier
+
+        Returns:
+            dict: In-memory index mapping normalized paths to owning libraries
+        """
+        with cls._lock:
+            paths = cls._paths.get(triplet)
+            if paths is not None:
+                return paths
+
+            stored = {}
+            index_path = cls._get_index_path(triplet)
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == cls.INDEX_VERSION:
+                    stored = data.get('libs', {}) or {}
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                RichLogger.warning(f"Rebuilding unreadable ownership index [bold yellow]{index_path}[/bold yellow]: {e}")
+
+            info_dir = index_path.parent
+            listed = {list_file.stem for list_file in info_dir.glob('*.list')} if info_dir.exists() else set()
+            libs = {}
+            refreshed = 0
+            for lib in sorted(listed):
+                stamp = cls._get_stamp(triplet, lib)
+                entry = stored.get(lib) or {}
+                if stamp is not None and entry.get('stamp') == stamp:
+                    libs[lib] = (stamp, set(entry.get('files', [])))
+                else:
+                    libs[lib] = (stamp, cls._read_lib(triplet, lib))
+                    refreshed += 1
+            if refreshed or set(stored) != listed:
+                RichLogger.debug(f"Refreshed ownership index of [magenta]{triplet}[/magenta] for "
+                                 f"[bold cyan]{refreshed}[/bold cyan] libraries")
+                cls._dirty.add(triplet)
+
+            paths = {}
+            for lib, (_, owned) in libs.items():
+                for key in owned:
+                    paths.setdefault(key, []).append(lib)
+            cls._libs[triplet] = libs
+            cls._paths[triplet] = paths
+            return paths
+
+    @classmethod
+    def _drop_owner(cls, triplet: str, lib: str) -> None:
+        """
+        Remove a library from the entries of the paths it owns.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name to remove
+        """
+        paths = cls._paths[triplet]
+        _, owned = cls._libs[triplet].pop(lib, (None, set()))
+        for key in owned:
+            owners = paths.get(key)
+            if owners and lib in owners:
+                owners.remove(lib)
+                if not owners:
+                    del paths[key]
+
+    @classmethod
+    def flush(cls) -> bool:
+        """
+        Atomically write every changed ownership index back to its owners.json.
+
+        Returns:
+            bool: True if all changed indexes were written, False otherwise
+        """
+        success = True
+        with cls._lock:
+            for triplet in sorted(cls._dirty):
+                index_path = cls._get_index_path(triplet)
+                temp_path = index_path.with_name(f"{index_path.name}.tmp")
+                libs = {lib: {'stamp': stamp, 'files': sorted(owned)}
+                        for lib, (stamp, owned) in cls._libs.get(triplet, {}).items()}
+                try:
+                    index_path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(temp_path, 'w', encoding='utf-8') as f:
+                        json.dump({'version': cls.INDEX_VERSION, 'libs': libs}, f)
+                    os.replace(temp_path, index_path)
+                    cls._dirty.discard(triplet)
+                except Exception as e:
+                    RichLogger.exception(f"Failed to write ownership index [bold red]{index_path}[/bold red]: {e}")
+                    success = False
+        return success
+
+    @staticmethod
+    def _same_prefix(triplet: str, lib: str, prefix: Path) -> bool:
+        """
+        Check whether a library installs into a given prefix.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+            prefix: Installation prefix
+
+        Returns:
+            bool: True if the library's prefix is the given prefix
+        """
+        return OwnershipIndex.normalize(UserConfig.get_prefix(triplet, lib)) == OwnershipIndex.normalize(prefix)
+
+    @classmethod
+    def update(cls, triplet: str, lib: str, files: List[str]) -> Dict[str, List[str]]:
+        """
+        Record the installed files of a library and report paths owned by other libraries.
+
+        Must be called after the library's file list was saved with HistoryManager.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+            files: Installed paths relative to the library prefix
+
+        Returns:
+            dict: Mapping of each colliding relative path to the other libraries that own it
+        """
+        prefix = UserConfig.get_prefix(triplet, lib)
+        collisions = {}
+
+        if InstallDatabase.enabled():
+            for file_path, other in InstallDatabase.find_collisions(triplet, lib):
+                # Shared directories such as include/ or lib/ are not collisions
+                if cls._same_prefix(triplet, other, prefix) and not (prefix / file_path).is_dir():
+                    collisions.setdefault(file_path, []).append(other)
+            return collisions
+
+        with cls._lock:
+            paths = cls._load(triplet)
+            cls._drop_owner(triplet, lib)
+            owned = set()
+            for file_path in files:
+                key = cls.normalize(prefix / file_path)
+                owned.add(key)
+                owners = paths.setdefault(key, [])
+                if owners and lib not in owners and not (prefix / file_path).is_dir():
+                    collisions[file_path] = list(owners)
+                if lib not in owners:
+                    owners.append(lib)
+            cls._libs[triplet][lib] = (cls._get_stamp(triplet, lib), owned)
+            cls._dirty.add(triplet)
+        return collisions
+
+    @classmethod
+    def remove(cls, triplet: str, lib: str) -> None:
+        """
+        Forget every path owned by a library.
+
+        With the SQLite backend this is done by removing the library's file list.
+
+        Args:
+            triplet: Target triplet identifier
+            lib: Library name
+        """
+        if InstallDatabase.enabled():
+            return
+        with cls._lock:
+            cls._load(triplet)
+            cls._drop_owner(triplet, lib)
+            cls._dirty.add(triplet)
+
+    @classmethod
+    def find_owners(cls, triplet: str, path: str) -> List[str]:
+        """
+        Find the libraries that installed a path.
+
+        Relative paths are resolved against the default prefix of the triplet and
+        against every library-specific prefix configured for it.
+
+        Args:
+            triplet: Target triplet identifier
+            path: Absolute path, or path relative to an install prefix
+
+        Returns:
+            list: Sorted names of the owning libraries, empty if the path is not owned
+        """
+        prefixes = [ROOT_DIR / 'installed' / triplet] + list(UserConfig.get_prefixs(triplet).values())
+        candidates = [Path(path)]
+        if not candidates[0].is_absolute():
+            candidates = [prefix / path for prefix in prefixes]
+
+        owners = set()
+        if InstallDatabase.enabled():
+            for candidate in candidates:
+                key = cls.normalize(candidate)
+                for prefix in prefixes:
+                    base = cls.normalize(prefix).rstrip(os.sep) + os.sep
+                    if not key.startswith(base):
+                        continue
+                    relative = os.path.abspath(str(candidate))[len(base):].replace('\\', '/')
+                    owners.update(lib for lib in InstallDatabase.find_owners(triplet, relative)
+                                  if cls._same_prefix(triplet, lib, prefix))
+            return sorted(owners)
+
+        with cls._lock:
+            paths = cls._load(triplet)
+            for candidate in candidates:
+                owners.update(paths.get(cls.normalize(candidate), []))
+        return sorted(owners)
@@ -2,16 +2,17 @@
 #
 #  Copyright (c) 2024 Jianshan Jiang
 #
-import os
 import subprocess
+import uuid
+
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 from rich.text import Text
 
 from mpt import ROOT_DIR
 from mpt.bash import BashUtils
 from mpt.log import RichLogger
-from mpt.path import PathUtils
+from mpt.unidiff import UnifiedDiff
 from mpt.view import RichPanel
 
 
@@ -30,20 +31,28 @@ class PatchHandler:
         source_dir: Path,
         patch_dir: Optional[Path] = None,
         patch_files: Optional[List[Path]] = None,
-        config: Optional[dict] = None
+        config: Optional[dict] = None,
+        dry_run: bool = False
     ) -> bool:
         """
         Execute the complete patch application process with comprehensive validation and error handling.
 
         Coordinates the full patch application workflow including source directory validation,
-        patch file discovery from multiple sources, bash environment setup, and sequential
-        patch application. Provides detailed logging and error reporting for each step.
+        patch file discovery from multiple sources and sequential patch application. The whole
+        series is applied in this process by the built-in unified diff engine (UnifiedDiff),
+        with the same offset, fuzz and already-applied handling as 'patch -Np1'. Only the file
+        sections the engine cannot apply are handed to GNU patch through bash, so a port with
+        many patches no longer starts a shell per patch file.
 
         Parameters:
             source_dir (Path): Target directory where source code is located and patches should be applied
             patch_dir (Optional[Path]): Directory containing patch files to discover and apply
             patch_files (Optional[List[Path]]): Explicit list of patch files to apply, bypassing discovery
             config (Optional[dict]): Library configuration dictionary used for library-specific patch discovery
+            dry_run (bool): Only check that the series applies; later patches are checked against the
+                            in-memory result of earlier ones and nothing is written to source_dir.
+                            Sections handed to GNU patch are checked with 'patch --dry-run'
+                            against the files on disk
 
         Returns:
             bool: True if all patches were applied successfully or no patches were found,
@@ -71,57 +80,62 @@ class PatchHandler:
         if not patches:
             return True
 
-        # Find bash executable for patch application
-        bash_path = BashUtils.find_bash()
-        if not bash_path:
-            RichLogger.error("Bash not found, cannot apply patches")
-            return False
-        RichLogger.debug(f"Using bash executable: [bold cyan]{bash_path}[/bold cyan]")
-
         # Apply patches one by one
         patch_status = True
         successful_patches = 0
-        original_dir = Path.cwd()
-        RichLogger.debug(f"Original working directory: [bold cyan]{original_dir}[/bold cyan]")
+        overlay: Dict[str, Optional[bytes]] = {}
+        bash_path = None
+
+        def read(path: str) -> Optional[bytes]:
+            if path in overlay:
+                return overlay[path]
+            target = source_dir / path
+            return target.read_bytes() if target.is_file() else None
+
+        def exists(path: str) -> bool:
+            if path in overlay:
+                return overlay[path] is not None
+            return (source_dir / path).is_file()
 
         try:
-            # Change to source directory for patch application
-            os.chdir(source_dir)
             for idx, patch in enumerate(patches, start=1):
                 try:
-                    RichLogger.info(f"Applying patch ([bold cyan]{idx}[/bold cyan]/[bold cyan]{len(patches)}[/bold cyan]): [bold cyan]{patch.name}[/bold cyan]")
-                    # Convert Windows path to Unix path for compatibility
-                    unix_patch_path = PathUtils.win_to_unix(patch)
+                    action = "Checking" if dry_run else "Applying"
+                    RichLogger.info(f"{action} patch ([bold cyan]{idx}[/bold cyan]/[bold cyan]{len(patches)}[/bold cyan]): [bold cyan]{patch.name}[/bold cyan]")
                     if not Path(patch).exists():
                         RichLogger.error(f"Patch file not found: [bold red]{patch}[/bold red]")
                         patch_status = False
                         continue
-                    # Build patch command
-                    cmd = f"patch -Np1 -i \"{unix_patch_path}\""
-                    RichLogger.debug(f"Executing patch command: [bold cyan]{cmd}[/bold cyan]")
-                    # Execute patch command
-                    p = subprocess.Popen(
-                        [bash_path, "-c", cmd],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT
-                    )
-                    # Process output in real-time
-                    for line in iter(p.stdout.readline, b''):
-                        decoded_line = line.decode('utf-8', errors='ignore').rstrip()
-                        RichLogger.info(decoded_line, markup=False)
-                        if p.poll() is not None:
-                            break
-                    # Wait for process completion
-                    exit_code = p.wait()
-                    if exit_code == 0:
-                        successful_patches += 1
-                        RichLogger.debug(f"Successfully applied patch: [bold cyan]{patch.name}[/bold cyan]")
-                    else:
-                        RichLogger.error(f"Patch application failed: [bold red]{patch.name}[/bold red]")
-                        RichLogger.debug(f"Command used: [bold cyan]{cmd}[/bold cyan]")
-                        RichLogger.debug(f"Working directory: [bold cyan]{os.getcwd()}[/bold cyan]")
-                        RichLogger.debug(f"Patch path: [bold cyan]{unix_patch_path}[/bold cyan]")
+
+                    changes, fallback, skipped = UnifiedDiff.apply_patch(patch, read, exists)
+                    if dry_run:
+                        overlay.update(changes)
+                    elif not PatchHandler._write_changes(source_dir, changes):
                         patch_status = False
+                        continue
+                    for path in changes:
+                        RichLogger.debug(f"Patched file: [bold cyan]{path}[/bold cyan]")
+
+                    if fallback:
+                        # Sections the built-in engine cannot apply go to GNU patch
+                        if bash_path is None:
+                            bash_path = BashUtils.find_bash()
+                            if not bash_path:
+                                RichLogger.error("Bash not found, cannot apply patches")
+                                return False
+                            RichLogger.debug(f"Using bash executable: [bold cyan]{bash_path}[/bold cyan]")
+                        RichLogger.debug(f"Passing [bold cyan]{len(fallback)}[/bold cyan] file sections of {patch.name} to GNU patch")
+                        if not PatchHandler._run_gnu_patch(bash_path, source_dir, ''.join(fallback), dry_run):
+                            RichLogger.error(f"Patch application failed: [bold red]{patch.name}[/bold red]")
+                            RichLogger.debug(f"Working directory: [bold cyan]{source_dir}[/bold cyan]")
+                            patch_status = False
+                            continue
+
+                    successful_patches += 1
+                    if skipped and not changes and not fallback:
+                        RichLogger.info(f"Patch already applied: [bold cyan]{patch.name}[/bold cyan]")
+                    else:
+                        RichLogger.debug(f"Successfully applied patch: [bold cyan]{patch.name}[/bold cyan]")
                 except Exception as e:
                     RichLogger.exception(f"Unexpected error applying patch {patch.name}: [bold red]{e}[/bold red]")
                     patch_status = False
@@ -133,9 +147,75 @@ class PatchHandler:
         except Exception as e:
             RichLogger.exception(f"Unexpected error during patch application: [bold red]{e}[/bold red]")
             return False
+
+    @staticmethod
+    def _write_changes(source_dir: Path, changes: Dict[str, Optional[bytes]]) -> bool:
+        """
+        Write the files changed by one patch into the source tree.
+
+        Parameters:
+            source_dir (Path): Root of the source tree
+            changes (Dict[str, Optional[bytes]]): Relative path -> new content, None to remove the file
+
+        Returns:
+            bool: True if every file was written or removed, False otherwise
+        """
+        for path, content in changes.items():
+            target = source_dir / path
+            try:
+                if content is None:
+                    if target.exists():
+                        target.unlink()
+                else:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(content)
+            except OSError as e:
+                RichLogger.exception(f"Failed to write patched file [bold red]{target}[/bold red]: {e}")
+                return False
+        return True
+
+    @staticmethod
+    def _run_gnu_patch(bash_path: str, source_dir: Path, patch_text: str, dry_run: bool = False) -> bool:
+        """
+        Apply patch sections with GNU patch as a fallback for the built-in engine.
+
+        The sections are written to a temporary file inside source_dir, so the command can
+        refer to it by a relative path and no Windows to Unix path conversion is needed.
+
+        Parameters:
+            bash_path (str): Bash executable used to run patch
+            source_dir (Path): Directory the patch is applied in
+            patch_text (str): Unified diff sections, decoded as latin-1
+            dry_run (bool): Only check whether the sections apply
+
+        Returns:
+            bool: True if GNU patch succeeded, False otherwise
+        """
+        patch_file = source_dir / f".mpt-patch-{uuid.uuid4().hex}.diff"
+        try:
+            patch_file.write_bytes(patch_text.encode(UnifiedDiff.ENCODING))
+            cmd = f"patch -Np1 {'--dry-run ' if dry_run else ''}-i \"{patch_file.name}\""
+            RichLogger.debug(f"Executing patch command: [bold cyan]{cmd}[/bold cyan]")
+            # Execute patch command inside the source directory
+            p = subprocess.Popen(
+                [bash_path, "-c", cmd],
+                cwd=str(source_dir),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+            # Process output in real-time
+            for line in iter(p.stdout.readline, b''):
+                decoded_line = line.decode('utf-8', errors='ignore').rstrip()
+                RichLogger.info(decoded_line, markup=False)
+            return p.wait() == 0
+        except OSError as e:
+            RichLogger.exception(f"Error executing GNU patch: {e}")
+            return False
         finally:
-            os.chdir(original_dir)
-            RichLogger.debug(f"Restored original working directory: [bold cyan]{original_dir}[/bold cyan]")
+            try:
+                patch_file.unlink()
+            except OSError:
+                pass
 
     @staticmethod
     def _show_patch_summary(total: int, successful: int):
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import fnmatch
+import os
+import re
+
+from typing import Iterable, Optional
+
+
+class PathMatcher:
+    """
+    Precompiled matcher for a list of include or exclude path patterns.
+
+    Patterns are classified once when the matcher is created:
+    - literal paths are looked up in a set
+    - 'dir/' patterns and 'prefix*' patterns become a single startswith() check
+    - '*.ext' patterns become a single endswith() check
+    - everything else is translated and joined into one combined regular expression
+    so testing a path costs roughly the same for one pattern or for hundreds.
+
+    Two pattern dialects are supported:
+    - fnmatch (default), as used for archive members: '*' also matches '/' and a
+      pattern ending in '/' selects everything below that directory
+    - glob (glob=True), as used by Path.glob for source tree exclusions: '*' and '?'
+      stay within one path segment and '**' matches any number of directories
+
+    Matching follows the case sensitivity of the platform, like fnmatch and
+    Path.glob do.
+    """
+
+    _CASE_SENSITIVE = os.path.normcase('A') == 'A'
+    _WILDCARDS = re.compile(r'[*?\[]')
+
+    def __init__(self, patterns: Optional[Iterable[str]], glob: bool = False):
+        """
+        Compile a list of patterns.
+
+        Args:
+            patterns: Patterns to match, None or empty for a matcher that matches nothing
+            glob: If True, use Path.glob segment semantics instead of fnmatch semantics
+        """
+        self.patterns = [str(pattern).replace('\\', '/') for pattern in (patterns or []) if pattern]
+        self.glob = glob
+        literals = set()
+        prefixes = []
+        dir_prefixes = []
+        suffixes = []
+        expressions = []
+
+        for pattern in self.patterns:
+            if glob:
+                pattern = pattern.strip('/')
+                if not self._WILDCARDS.search(pattern):
+                    literals.add(self._fold(pattern))
+                elif pattern.startswith('**/*') and not self._WILDCARDS.search(pattern[4:]) and '/' not in pattern[4:]:
+                    suffixes.append(self._fold(pattern[4:]))
+                else:
+                    expressions.append(self._translate_glob(pattern))
+            elif pattern.endswith('/'):
+                dir_prefixes.append(pattern.rstrip('/') + '/')
+            elif not self._WILDCARDS.search(pattern):
+                literals.add(self._fold(pattern))
+            elif pattern.startswith('*') and not self._WILDCARDS.search(pattern[1:]):
+                suffixes.append(self._fold(pattern[1:]))
+            elif pattern.endswith('*') and not self._WILDCARDS.search(pattern[:-1]):
+                prefixes.append(self._fold(pattern[:-1]))
+            else:
+                expressions.append(fnmatch.translate(pattern))
+
+        self._literals = literals
+        self._prefixes = tuple(prefixes)
+        self._dir_prefixes = tuple(dir_prefixes)
+        self._suffixes = tuple(suffixes)
+        flags = 0 if self._CASE_SENSITIVE else re.IGNORECASE
+        self._regex = re.compile('|'.join(f"(?:{expr})" for expr in expressions), flags) if expressions else None
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def __repr__(self) -> str:
+        return f"PathMatcher({self.patterns!r}, glob={self.glob})"
+
+    @classmethod
+    def _fold(cls, path: str) -> str:
+        """
+        Apply the platform case folding used for comparisons.
+
+        Args:
+            path: Path or pattern fragment
+
+        Returns:
+            str: The fragment, lowercased on case-insensitive platforms
+        """
+        return path if cls._CASE_SENSITIVE else path.lower()
+
+    @staticmethod
+    def _translate_glob(pattern: str) -> str:
+        """
+        Translate a Path.glob style pattern into a regular expression.
+
+        Args:
+            pattern: Pattern with '/' separators, '*', '?', '[...]' and '**'
+
+        Returns:
+            str: Regular expression matching the whole relative path
+        """
+        result = []
+        i, n = 0, len(pattern)
+        while i < n:
+            c = pattern[i]
+            if c == '*':
+                if pattern.startswith('/**', i - 1) and i + 2 == n:
+                    # Trailing '/**' also matches the directory itself
+                    result[-1] = '(?:/.*)?'
+                    i += 2
+                    continue
+                if pattern.startswith('**/', i):
+                    result.append('(?:.*/)?')
+                    i += 3
+                    continue
+                if pattern.startswith('**', i):
+                    result.append('.*')
+                    i += 2
+                    continue
+                result.append('[^/]*')
+            elif c == '?':
+                result.append('[^/]')
+            elif c == '[':
+                end = pattern.find(']', i + 2 if pattern.startswith('[!', i) else i + 1)
+                if end < 0:
+                    result.append(re.escape(c))
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    result.append('[' + body.replace('\\', '\\\\') + ']')
+                    i = end
+            else:
+                result.append(re.escape(c))
+            i += 1
+        return ''.join(result) + r'\Z'
+
+    def matches(self, path: str) -> bool:
+        """
+        Test a relative path against all patterns.
+
+        Args:
+            path: Path relative to the archive root or source directory
+
+        Returns:
+            bool: True if any pattern matches the path
+        """
+        path = path.replace('\\', '/')
+        if self._dir_prefixes and path.startswith(self._dir_prefixes):
+            return True
+        folded = self._fold(path)
+        if folded in self._literals:
+            return True
+        if self._prefixes and folded.startswith(self._prefixes):
+            return True
+        if self._suffixes and folded.endswith(self._suffixes):
+            return True
+        return bool(self._regex and self._regex.match(path))
+
+    def matches_directory(self, path: str) -> bool:
+        """
+        Test whether every path below a directory is matched, so it can be pruned.
+
+        Args:
+            path: Directory path relative to the archive root or source directory
+
+        Returns:
+            bool: True if the directory and its whole subtree are matched
+        """
+        path = path.replace('\\', '/').rstrip('/')
+        if self.glob:
+            return self.matches(path)
+        return bool(self._dir_prefixes) and (path + '/').startswith(self._dir_prefixes)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import logging
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from mpt.config import LibraryConfig
+from mpt.log import RichLogger
+from mpt.source import SourceManager
+
+
+class SourcePrefetcher:
+    """
+    Background source acquisition for a set of libraries.
+
+    Once the dependency graph is known, the archives and repositories of every library
+    in it are downloaded, cloned, extracted and patched on a worker pool, so the build
+    of one node overlaps with fetching the sources of the nodes after it. Concurrent
+    transfers are bounded globally and per remote host to stay polite to mirrors and
+    git hosting services.
+
+    SourceManager.fetch_source serializes fetches of the same library and reuses a
+    source prepared earlier in the run, so a build that reaches a library whose
+    prefetch is still running waits for it instead of fetching a second time. A
+    failed prefetch is simply retried by the build.
+    """
+
+    # Maximum number of sources fetched at the same time
+    MAX_WORKERS = 8
+    # Maximum number of concurrent transfers from a single host
+    PER_HOST_LIMIT = 2
+
+    def __init__(self, libraries: Iterable[str], max_workers: Optional[int] = None):
+        """
+        Initialize the prefetcher for a list of libraries.
+
+        Args:
+            libraries: Library names in the order their sources are needed; duplicates are ignored
+            max_workers: Maximum number of concurrent fetches (default: MAX_WORKERS)
+        """
+        self.libraries = list(dict.fromkeys(libraries))
+        self.max_workers = max(1, int(max_workers or self.MAX_WORKERS))
+        self.futures: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._host_limits: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def select_libraries(triplet: str, nodes: Iterable[str]) -> list:
+        """
+        List the libraries whose sources the build of some nodes is going to need.
+
+        Nodes that the binary cache will restore do not need their sources. Their
+        fingerprints are predicted in dependency order: a dependency that is going to
+        be built or restored gets the fingerprint computed here, and git sources, whose
+        fingerprint depends on the commit fetched later, make their dependents
+        unpredictable, so those are fetched.
+
+        Args:
+            triplet: Target triplet specification
+            nodes: Node names in topological order (dependencies first)
+
+        Returns:
+            list: Library names in the order their sources are needed
+        """
+        from mpt.cache import BinaryCache
+        from mpt.dependency import DependencyResolver
+        from mpt.fingerprint import BuildFingerprint
+        from mpt.history import HistoryManager
+
+        nodes = list(nodes)
+        libs = [DependencyResolver.parse_dependency_name(node)[0] for node in nodes]
+        if not BinaryCache.get_cache_dir():
+            return list(dict.fromkeys(libs))
+
+        predicted: Dict[str, Optional[str]] = {}
+        needed = []
+        for node_name, lib in zip(nodes, libs):
+            config = LibraryConfig.load(lib) or {}
+            deps = DependencyResolver.get_dependencies(*DependencyResolver.parse_dependency_name(node_name))
+            fingerprint = None
+            if not SourceManager.is_git_url(config.get('url', '')) and all(predicted.get(dep, '') is not None for dep in deps):
+                fingerprint = BuildFingerprint.compute(triplet, node_name, config, dependencies=predicted)
+            predicted[node_name] = fingerprint
+
+            lib_info = HistoryManager.get_library_info(triplet, node_name)
+            restored = (config.get('script') and BinaryCache.contains(fingerprint) and
+                        (not lib_info or (lib_info.get('fingerprint') and lib_info['fingerprint'] != fingerprint)))
+            if restored:
+                RichLogger.debug(f"[[bold cyan]{node_name}[/bold cyan]] Binary cache hit expected, not prefetching its source")
+            else:
+                needed.append(lib)
+        return list(dict.fromkeys(needed))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+    def start(self) -> None:
+        """
+        Submit the sources of all libraries to the worker pool in the given order.
+        """
+        if self._executor or not self.libraries:
+            return
+        RichLogger.info(f"Prefetching sources of [bold yellow]{len(self.libraries)}[/bold yellow] libraries "
+                        f"with up to [bold cyan]{self.max_workers}[/bold cyan] concurrent transfers")
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mpt-fetch")
+        for lib in self.libraries:
+            self.futures[lib] = self._executor.submit(self._fetch, lib)
+
+    def wait(self, lib: str) -> Optional[Path]:
+        """
+        Wait for the prefetch of a library to finish.
+
+        Args:
+            lib: Library name
+
+        Returns:
+            Path: Prepared source directory, or None if the library was not prefetched or failed
+        """
+        future = self.futures.get(lib)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            RichLogger.exception(f"[[bold cyan]{lib}[/bold cyan]] Source prefetch failed: {str(e)}")
+            return None
+
+    def shutdown(self, cancel_pending: bool = True) -> None:
+        """
+        Stop the worker pool.
+
+        Args:
+            cancel_pending: If True, prefetches that have not started yet are cancelled
+                            (fetches already in progress always run to completion)
+        """
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+            self._executor = None
+
+    def _get_host_limit(self, url: str) -> threading.Semaphore:
+        """
+        Retrieve the semaphore bounding concurrent transfers from the host of a URL.
+
+        Args:
+            url: Source URL of a library
+
+        Returns:
+            threading.Semaphore: Semaphore shared by all libraries hosted on the same server
+        """
+        host = (urlparse(url).hostname or url).lower()
+        with self._lock:
+            return self._host_limits.setdefault(host, threading.Semaphore(self.PER_HOST_LIMIT))
+
+    def _fetch(self, lib: str) -> Optional[Path]:
+        """
+        Fetch the source of a single library on a worker thread.
+
+        Args:
+            lib: Library name
+
+        Returns:
+            Path: Prepared source directory, or None on failure
+        """
+        # Keep the console readable while several transfers run in the background
+        RichLogger.set_console_level(logging.WARNING)
+        try:
+            config = LibraryConfig.load(lib)
+            if not config or not config.get('url'):
+                return None
+            with self._get_host_limit(config['url']):
+                source_dir = SourceManager.fetch_source(config)
+            if source_dir:
+                RichLogger.debug(f"[[bold cyan]{lib}[/bold cyan]] Source prefetched: [bold green]{source_dir}[/bold green]")
+            return source_dir
+        finally:
+            RichLogger.set_console_level(None)
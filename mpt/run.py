@@ -7,9 +7,11 @@ import os
 import re
 import subprocess
 import sys
+import threading
+import uuid
 
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, List
+from typing import Callable, Dict, Any, Optional, Union, List
 from rich.text import Text
 
 from mpt import ROOT_DIR
@@ -33,8 +35,31 @@ class Runner:
 
     # Class variables
     _saved_console_mode = None
-    _proc_env = None  # Process environment variables
-    _prefix = None
+    # Per-thread build state (process environment and install prefix) so that
+    # several libraries can be built concurrently by the build scheduler
+    _local = threading.local()
+    # One lock per install prefix: the prefix is monitored to find the files a script
+    # installs, so only one script at a time may write into the same prefix
+    _prefix_locks: Dict[str, threading.Lock] = {}
+    _prefix_locks_guard = threading.Lock()
+    # Environment variable naming the token a build script prints when its install
+    # stage starts; the script then waits for a line on stdin before installing
+    INSTALL_GATE_VAR = 'MPT_INSTALL_GATE'
+
+    @classmethod
+    def get_prefix_lock(cls, prefix: Union[str, Path]) -> threading.Lock:
+        """
+        Retrieve the lock serializing the scripts that install into one prefix.
+
+        Args:
+            prefix: Installation prefix of the library being built
+
+        Returns:
+            threading.Lock: Lock shared by all builds installing into this prefix
+        """
+        key = os.path.normcase(os.path.abspath(str(prefix)))
+        with cls._prefix_locks_guard:
+            return cls._prefix_locks.setdefault(key, threading.Lock())
 
     @classmethod
     def _setup_basic_environment(cls, triplet: str, lib_config: Dict[str, Any]) -> None:
@@ -48,7 +73,7 @@ class Runner:
         # Parse architecture from triplet (e.g., 'x64' from 'x64-windows', 'arm64' from 'arm64-windows-static')
         arch = triplet.split('-')[0] if '-' in triplet else triplet
         # Set basic environment variables
-        cls._proc_env['ARCH'] = arch
+        cls._local.proc_env['ARCH'] = arch
 
         # Set library-specific environment variables
         lib_name = lib_config.get('name')
@@ -68,10 +93,10 @@ class Runner:
                 lib_rootdir = PathUtils.win_to_unix(lib_rootdir)
                 lib_srcdir = PathUtils.win_to_unix(lib_srcdir)
 
-        cls._proc_env['ROOT_DIR'] = lib_rootdir
-        cls._proc_env['SRC_DIR'] = lib_srcdir
-        cls._proc_env['PKG_NAME'] = lib_name
-        cls._proc_env['PKG_VER'] = lib_ver
+        cls._local.proc_env['ROOT_DIR'] = lib_rootdir
+        cls._local.proc_env['SRC_DIR'] = lib_srcdir
+        cls._local.proc_env['PKG_NAME'] = lib_name
+        cls._local.proc_env['PKG_VER'] = lib_ver
 
     @classmethod
     def _setup_prefix_environment(cls, triplet: str, lib: str, lib_config: Dict[str, Any]) -> str:
@@ -87,7 +112,7 @@ class Runner:
             str: The primary prefix path for the current library
         """
         prefix = str(ROOT_DIR / 'installed' / triplet)
-        cls._proc_env['_PREFIX'] = prefix
+        cls._local.proc_env['_PREFIX'] = prefix
         prefix_paths = [prefix]
         user_settings = UserConfig.load()
         prefix_config = user_settings.get('prefix', {}) or {}
@@ -96,26 +121,26 @@ class Runner:
             for lib_name, lib_prefix in prefix_config[triplet].items():
                 # Create environment variable name from library name
                 prefix_env = lib_name.replace('-', '_').upper() + '_PREFIX'
-                cls._proc_env[prefix_env] = lib_prefix
+                cls._local.proc_env[prefix_env] = lib_prefix
                 # Update prefix if this is the current library
                 if lib_name == lib:
                     prefix = lib_prefix
                 # Add binary directory to PATH if it exists
                 bin_dir = Path(lib_prefix) / 'bin'
                 if bin_dir.exists():
-                    current_path = cls._proc_env.get('PATH', '')
+                    current_path = cls._local.proc_env.get('PATH', '')
                     if str(bin_dir) not in current_path:
-                        cls._proc_env['PATH'] = f"{str(bin_dir)}{os.pathsep}{current_path}"
+                        cls._local.proc_env['PATH'] = f"{str(bin_dir)}{os.pathsep}{current_path}"
                 # Add to prefix paths
                 prefix_paths.append(lib_prefix)
         # Set final environment variables
-        cls._proc_env['PREFIX_PATH'] = os.pathsep.join(prefix_paths)
-        cls._prefix = prefix
+        cls._local.proc_env['PREFIX_PATH'] = os.pathsep.join(prefix_paths)
+        cls._local.prefix = prefix
         lib_script = lib_config.get('script')
         if lib_script:
             if Path(lib_script).name.endswith('.sh'):
                 prefix = PathUtils.win_to_unix(prefix)
-        cls._proc_env['PREFIX'] = prefix
+        cls._local.proc_env['PREFIX'] = prefix
         return prefix
 
     @classmethod
@@ -135,12 +160,12 @@ class Runner:
 
             dep_src_env = dep_name.replace('-', '_').upper() + '_SRC'
             if SourceManager.is_git_url(dep_url):
-                cls._proc_env[dep_src_env] = str(ROOT_DIR / 'buildtrees' / 'sources' / f"{dep_name}")
+                cls._local.proc_env[dep_src_env] = str(ROOT_DIR / 'buildtrees' / 'sources' / f"{dep_name}")
             else:
-                cls._proc_env[dep_src_env] = str(ROOT_DIR / 'buildtrees' / 'sources' / f"{dep_name}-{dep_ver}")
+                cls._local.proc_env[dep_src_env] = str(ROOT_DIR / 'buildtrees' / 'sources' / f"{dep_name}-{dep_ver}")
 
             dep_ver_env = dep_name.replace('-', '_').upper() + '_VER'
-            cls._proc_env[dep_ver_env] = str(dep_ver)
+            cls._local.proc_env[dep_ver_env] = str(dep_ver)
 
     @classmethod
     def _setup_environment(cls, triplet: str, lib: str) -> None:
@@ -152,7 +177,7 @@ class Runner:
             lib: Library name for library-specific configuration loading
         """
         # Create fresh environment copy to ensure isolation
-        cls._proc_env = os.environ.copy()
+        cls._local.proc_env = os.environ.copy()
 
         # Load library configuration
         lib_config = LibraryConfig.load(lib)
@@ -224,7 +249,9 @@ class Runner:
             RichLogger.exception(f"Restore console mode error: {e}")
 
     @classmethod
-    def execute(cls, cmds: Union[List[str], str], shell: bool = False, log_file: Optional[Union[str, Path]] = None) -> int:
+    def execute(cls, cmds: Union[List[str], str], shell: bool = False, log_file: Optional[Union[str, Path]] = None,
+                cwd: Optional[Union[str, Path]] = None, gate_token: Optional[str] = None,
+                on_gate: Optional[Callable[[], None]] = None) -> int:
         """
         Execute system commands with real-time output processing and error detection.
 
@@ -239,6 +266,10 @@ class Runner:
             cmds: Command specification as either a list of arguments or a single string
             shell: If True, execute the command through the system shell
             log_file: Optional path for capturing process output to a log file
+            cwd: Optional working directory for the process (defaults to the current directory)
+            gate_token: Optional output line at which the process waits on its stdin
+            on_gate: Called when the process prints gate_token; the process continues
+                     once it returns
 
         Returns:
             int: Exit code of the executed process (0 for success), or -1 if execution
@@ -255,13 +286,22 @@ class Runner:
             p = subprocess.Popen(
                 cmds,
                 shell=shell,
-                env=cls._proc_env,
+                cwd=str(cwd) if cwd else None,
+                env=getattr(cls._local, 'proc_env', None),
+                stdin=subprocess.PIPE if gate_token else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT
             )
             # Process output in real-time
             for line in iter(p.stdout.readline, b''):
                 decoded_line = line.decode('utf-8', errors='ignore').rstrip()
+                if gate_token and p.stdin and not p.stdin.closed and decoded_line.strip() == gate_token:
+                    if on_gate:
+                        on_gate()
+                    # Release the waiting script; later reads of stdin see end of file
+                    p.stdin.write(b'ok\n')
+                    p.stdin.close()
+                    continue
                 if error_pattern.search(decoded_line):
                     RichLogger.error(decoded_line, markup=False)
                 elif warning_pattern.search(decoded_line):
@@ -271,6 +311,8 @@ class Runner:
                 if p.poll() is not None:
                     break
             # Wait for process completion
+            if p.stdin and not p.stdin.closed:
+                p.stdin.close()
             exit_code = p.wait()
             return exit_code
 
@@ -285,11 +327,34 @@ class Runner:
             cls._restore_console_mode()
             RichLogger.debug(f"Process exit code: {exit_code}")
 
+    @staticmethod
+    def _has_install_gate(script_file: Path) -> bool:
+        """
+        Check whether a build script announces its install stage to mpt.
+
+        Args:
+            script_file: Path to the build script
+
+        Returns:
+            bool: True if the script waits at the install gate when MPT_INSTALL_GATE is set
+        """
+        try:
+            return Runner.INSTALL_GATE_VAR in script_file.read_text(encoding='utf-8', errors='ignore')
+        except OSError:
+            return False
+
     @classmethod
     def run_script(cls, triplet: str, lib: str, script_file: Union[str, Path], log_file: Optional[Union[str, Path]] = None) -> tuple:
         """
         Execute script files with file system monitoring and environment configuration.
 
+        The install prefix is monitored to find the files a script installs, so only
+        one script at a time may install into the same prefix. Port scripts print the
+        token in MPT_INSTALL_GATE at the start of their install stage and wait for a
+        line on stdin; the prefix lock is taken and the monitor started only then, so
+        the configure and build stages of libraries sharing a prefix run in parallel.
+        Scripts without the gate hold the prefix lock for their whole run.
+
         Args:
             triplet: Target triplet specification for environment configuration
             lib: Library name for library-specific environment setup
@@ -304,23 +369,45 @@ class Runner:
         cls._setup_environment(triplet, lib)
         script_file = Path(script_file) if isinstance(script_file, str) else script_file
         script_dir = script_file.parent
-        orig_dir = os.getcwd()
-        Path(cls._prefix).mkdir(parents=True, exist_ok=True)
-        file_monitor = Win32FileMonitor(cls._prefix)
-        file_monitor.start_monitoring()
+        prefix = cls._local.prefix
+        Path(prefix).mkdir(parents=True, exist_ok=True)
+        prefix_lock = cls.get_prefix_lock(prefix)
+        gate_token = None
+        if cls._has_install_gate(script_file):
+            gate_token = f"mpt-install-gate-{uuid.uuid4().hex}"
+            cls._local.proc_env[cls.INSTALL_GATE_VAR] = gate_token
+        state = {'locked': False, 'monitor': None}
+
+        def enter_install_stage():
+            if not prefix_lock.acquire(blocking=False):
+                RichLogger.info(f"[[bold cyan]{lib}[/bold cyan]] Waiting for another build installing into "
+                                f"[bold cyan]{prefix}[/bold cyan]")
+                prefix_lock.acquire()
+            state['locked'] = True
+            state['monitor'] = Win32FileMonitor(prefix)
+            state['monitor'].start_monitoring()
+
         try:
-            os.chdir(script_dir)
             if script_file.name.endswith('.bat'):
-                cmds = [script_file.name]
+                cmds = [str(script_file)]
             else:
                 bash_path = BashUtils.find_bash()
                 if not bash_path:
                     RichLogger.critical("Bash not found")
                     return False, []
                 cmds = [bash_path, script_file.name]
+            if not gate_token:
+                enter_install_stage()
             # Execute the script using original execute method
-            exit_code = cls.execute(cmds, log_file=log_file)
+            exit_code = cls.execute(cmds, log_file=log_file, cwd=script_dir,
+                                    gate_token=gate_token, on_gate=enter_install_stage)
             success = exit_code == 0
+            file_monitor = state['monitor']
+            if file_monitor is None:
+                if success:
+                    RichLogger.warning(f"[[bold cyan]{lib}[/bold cyan]] Build script finished without reaching "
+                                       f"its install stage, no installed files were recorded")
+                return success, []
             # Collect monitoring results
             file_monitor.stop_monitoring()
             new_files = file_monitor.get_new_files()
@@ -329,5 +416,7 @@ class Runner:
             RichLogger.exception(f"Failed to execute script: {e}")
             return False, []
         finally:
-            file_monitor.stop_monitoring()
-            os.chdir(orig_dir)
+            if state['monitor']:
+                state['monitor'].stop_monitoring()
+            if state['locked']:
+                prefix_lock.release()
@@ -634,6 +634,11 @@ class RuntimeManager:
                         return False
                     patch_files.append(patch_file.resolve())
 
+                # The target is a shared installation: check the whole series before changing any file
+                if not PatchHandler.apply_patches(source_dir=target_path, patch_files=patch_files, dry_run=True):
+                    RichLogger.error(f"Patches do not apply for extension: [bold cyan]{ext_name}[/bold cyan]")
+                    return False
+
                 if PatchHandler.apply_patches(
                     source_dir=target_path,
                     patch_files=patch_files
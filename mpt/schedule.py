@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import logging
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from graphlib import TopologicalSorter
+from typing import Dict, Optional
+
+from mpt import ROOT_DIR
+from mpt.config import LibraryConfig
+from mpt.log import RichLogger
+
+
+class BuildScheduler:
+    """
+    Parallel build scheduler for dependency graphs.
+
+    Walks a dependency graph with graphlib.TopologicalSorter and runs every node
+    whose dependencies are satisfied on a bounded worker pool. Nodes that refer to
+    the same library (e.g. "pcre" and "pcre:required") share a source tree and a
+    build script, so they are never built at the same time.
+
+    Supports two failure modes:
+    - fail-fast (default): after a failure, stop scheduling the nodes of every
+      group (requested root) that contains the failed node and wait for the builds
+      that are already running; groups that do not contain it are still built
+    - keep-going: keep building every node that does not depend on a failed one
+
+    Note:
+        Installed files are detected by monitoring the install prefix, so the
+        install stages of build scripts that install into the same prefix never run
+        at the same time (see Runner.run_script). Source acquisition, patching,
+        configuring and compiling run in parallel.
+    """
+
+    # Node status values reported in the scheduler results
+    STATUS_BUILT = 'built'
+    STATUS_FAILED = 'failed'
+    STATUS_SKIPPED = 'skipped'
+
+    def __init__(self, triplet: str, graph: Dict[str, set], jobs: int = 1, keep_going: bool = False,
+                 groups: Optional[Dict[str, set]] = None):
+        """
+        Initialize the scheduler for a dependency graph.
+
+        Args:
+            triplet: Target triplet (e.g., x64-windows) passed to each build
+            graph: Dependency graph mapping node names to their dependency node names
+            jobs: Maximum number of nodes built concurrently
+            keep_going: If True, continue building independent nodes after a failure
+            groups: Mapping of requested root to the nodes it needs; fail-fast only
+                    cancels the groups containing a failed node. Defaults to a single
+                    group holding the whole graph
+        """
+        self.triplet = triplet
+        self.graph = graph
+        self.jobs = max(1, int(jobs or 1))
+        self.keep_going = keep_going
+        self.groups = groups or {None: set(graph)}
+        self.results: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def run(self) -> Dict[str, Dict]:
+        """
+        Build every node of the graph in dependency order.
+
+        Returns:
+            dict: Mapping of node name to a result dictionary with keys
+                  'status' (built, failed or skipped), 'duration' in seconds
+                  and 'log' (path of the node build log, or None)
+        """
+        sorter = TopologicalSorter(self.graph)
+        sorter.prepare()
+
+        pending = []            # Ready nodes waiting for their library to be free
+        running = {}            # Future -> node name
+        busy_libs = set()       # Libraries currently being built
+        cancelled = set()       # Groups cut off by fail-fast
+
+        RichLogger.info(f"Scheduling [bold yellow]{len(self.graph)}[/bold yellow] nodes "
+                        f"with [bold cyan]{self.jobs}[/bold cyan] parallel job(s)")
+
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="mpt-build") as executor:
+            while True:
+                pending.extend(sorter.get_ready())
+                if cancelled:
+                    # Drop nodes that are only needed by cancelled groups
+                    pending = [node for node in pending if self._is_wanted(node, cancelled)]
+
+                # Submit ready nodes while there are free workers
+                for node_name in list(pending):
+                    if len(running) >= self.jobs:
+                        break
+                    lib_name = self._lib_name(node_name)
+                    if lib_name in busy_libs:
+                        continue
+                    pending.remove(node_name)
+                    busy_libs.add(lib_name)
+                    RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Build scheduled")
+                    running[executor.submit(self._build_node, node_name)] = node_name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node_name = running.pop(future)
+                    busy_libs.discard(self._lib_name(node_name))
+                    result = self.results.get(node_name, {})
+                    duration = result.get('duration', 0.0)
+                    if result.get('status') == self.STATUS_BUILT:
+                        RichLogger.info(f"[[bold cyan]{node_name}[/bold cyan]] Finished in [bold green]{duration:.1f}s[/bold green]")
+                        sorter.done(node_name)
+                    else:
+                        RichLogger.error(f"[[bold cyan]{node_name}[/bold cyan]] Failed after [bold red]{duration:.1f}s[/bold red]")
+                        if not self.keep_going:
+                            hit = [group for group, nodes in self.groups.items()
+                                   if group not in cancelled and node_name in nodes]
+                            cancelled.update(hit)
+                            names = ', '.join(str(group) for group in hit if group is not None)
+                            RichLogger.error(f"[[bold cyan]{node_name}[/bold cyan]] Build failed, "
+                                             f"{'cancelling ' + names + ', ' if names else ''}"
+                                             f"waiting for [bold yellow]{len(running)}[/bold yellow] running build(s)")
+
+        # Nodes that never became ready depend on a failed node (or were cut off by fail-fast)
+        for node_name in self.graph:
+            if node_name not in self.results:
+                self.results[node_name] = {'status': self.STATUS_SKIPPED, 'duration': 0.0, 'log': None}
+
+        return self.results
+
+    def _is_wanted(self, node_name: str, cancelled: set) -> bool:
+        """
+        Check whether a node is still needed by a group that was not cancelled.
+
+        Args:
+            node_name: Node identifier with optional dependency type suffix
+            cancelled: Groups cut off by fail-fast
+
+        Returns:
+            bool: True if at least one live group contains the node
+        """
+        return any(node_name in nodes for group, nodes in self.groups.items() if group not in cancelled)
+
+    def _build_node(self, node_name: str) -> None:
+        """
+        Build a single node on a worker thread and record its result.
+
+        Args:
+            node_name: Node identifier with optional dependency type suffix
+        """
+        from mpt.build import BuildManager
+
+        lib_name = self._lib_name(node_name)
+        log_file = ROOT_DIR / 'buildtrees' / 'logs' / self.triplet / f"{lib_name}.log"
+        start = time.monotonic()
+        success = False
+
+        # Keep the detailed output of concurrent builds in their own log files
+        if self.jobs > 1:
+            RichLogger.set_console_level(logging.WARNING)
+        try:
+            config = LibraryConfig.load(lib_name)
+            if not config:
+                RichLogger.error(f"[[bold cyan]{node_name}[/bold cyan]] Failed to load configuration")
+            else:
+                success = BuildManager.build_library(self.triplet, node_name, config)
+        except Exception as e:
+            RichLogger.exception(f"[[bold cyan]{node_name}[/bold cyan]] Unexpected build error: {str(e)}")
+        finally:
+            if self.jobs > 1:
+                RichLogger.set_console_level(None)
+
+        with self._lock:
+            self.results[node_name] = {
+                'status': self.STATUS_BUILT if success else self.STATUS_FAILED,
+                'duration': time.monotonic() - start,
+                'log': log_file if log_file.exists() else None
+            }
+
+    @staticmethod
+    def _lib_name(node_name: str) -> str:
+        """
+        Extract the library name from a node name.
+
+        Args:
+            node_name: Node identifier with optional dependency type suffix
+
+        Returns:
+            str: Library name without the dependency type
+        """
+        from mpt.dependency import DependencyResolver
+        lib_name, _ = DependencyResolver.parse_dependency_name(node_name)
+        return lib_name
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import threading
+
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from mpt.config import UserConfig
+from mpt.log import RichLogger
+
+
+class HttpSession:
+    """
+    Process-wide pooled HTTP connections for every request made by mpt.
+
+    All threads share one HTTPAdapter, whose urllib3 pool manager keeps connections
+    alive per host, so consecutive downloads from the same server (github.com,
+    ftp.gnu.org, sourceforge, ...) reuse established TCP and TLS connections
+    instead of handshaking again. Each thread gets its own lightweight
+    requests.Session on top of the shared adapter, because Session state such as
+    the cookie jar is not safe to mutate from several threads.
+
+    Pool sizes are read from the 'http' section of settings.yaml:
+
+        http:
+          pool_connections: 16         # number of hosts whose connections are kept
+          max_connections_per_host: 8  # concurrent connections to a single host
+
+    Requests beyond max_connections_per_host wait for a free connection, which
+    bounds the load put on any single server.
+    """
+
+    # Defaults for the settings.yaml 'http' section
+    POOL_CONNECTIONS = 16
+    MAX_CONNECTIONS_PER_HOST = 8
+
+    # Retry policy for transient failures, applied by the shared adapter
+    MAX_RETRIES = 3
+    BACKOFF_FACTOR = 0.1
+    STATUS_FORCELIST = [408, 429, 500, 502, 503, 504]  # HTTP status codes that should trigger a retry
+
+    _adapter: Optional[HTTPAdapter] = None
+    _local = threading.local()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_adapter(cls) -> HTTPAdapter:
+        """
+        Create the shared adapter on first use.
+
+        Returns:
+            HTTPAdapter: Adapter holding the process-wide connection pools
+        """
+        with cls._lock:
+            if cls._adapter is None:
+                settings = UserConfig.load().get('http') or {}
+                pool_connections = int(settings.get('pool_connections', cls.POOL_CONNECTIONS))
+                max_per_host = int(settings.get('max_connections_per_host', cls.MAX_CONNECTIONS_PER_HOST))
+                retry_strategy = Retry(
+                    total=cls.MAX_RETRIES,
+                    backoff_factor=cls.BACKOFF_FACTOR,
+                    status_forcelist=cls.STATUS_FORCELIST,
+                    allowed_methods=["GET", "HEAD"],
+                    respect_retry_after_header=True
+                )
+                cls._adapter = HTTPAdapter(
+                    pool_connections=max(1, pool_connections),
+                    pool_maxsize=max(1, max_per_host),
+                    pool_block=True,
+                    max_retries=retry_strategy
+                )
+                RichLogger.debug(f"HTTP connection pool: [bold cyan]{pool_connections}[/bold cyan] hosts, "
+                                 f"[bold cyan]{max_per_host}[/bold cyan] connections per host")
+            return cls._adapter
+
+    @classmethod
+    def get(cls) -> requests.Session:
+        """
+        Retrieve the calling thread's session on top of the shared connection pools.
+
+        Returns:
+            requests.Session: Session with the shared adapter mounted for HTTP and HTTPS
+        """
+        session = getattr(cls._local, 'session', None)
+        if session is None:
+            adapter = cls._get_adapter()
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            cls._local.session = session
+        return session
+
+    @classmethod
+    @contextmanager
+    def use(cls):
+        """
+        Context manager yielding the calling thread's shared session.
+
+        Unlike 'with requests.Session()', leaving the block keeps the session and its
+        pooled connections open for later requests.
+
+        Yields:
+            requests.Session: The thread's shared session
+        """
+        yield cls.get()
+
+    @classmethod
+    def get_statistics(cls) -> Dict[str, int]:
+        """
+        Summarize connection reuse across all hosts contacted in this process.
+
+        Returns:
+            dict: 'hosts', 'requests' and 'connections' counters, where requests
+                  minus connections is the number of requests served over a reused
+                  connection
+        """
+        stats = {'hosts': 0, 'requests': 0, 'connections': 0}
+        adapter = cls._adapter
+        if adapter is None:
+            return stats
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            stats['hosts'] += 1
+            stats['requests'] += pool.num_requests
+            stats['connections'] += pool.num_connections
+        return stats
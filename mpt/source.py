@@ -6,17 +6,23 @@ import os
 import re
 import shutil
 import subprocess
+import threading
 
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from mpt import ROOT_DIR
 from mpt.archive import ArchiveHandler
+from mpt.digest import DigestCache
 from mpt.download import DownloadHandler
 from mpt.file import FileUtils
+from mpt.fingerprint import BuildFingerprint
 from mpt.git import GitHandler
 from mpt.log import RichLogger
+from mpt.mirror import MirrorList
 from mpt.patch import PatchHandler
+from mpt.pattern import PathMatcher
+from mpt.store import DownloadStore
 
 
 class SourceManager:
@@ -26,8 +32,17 @@ class SourceManager:
     Provides end-to-end source code handling including Git repository management, archive processing,
     patch application, and exclusion filtering. Supports complex source configurations with multiple
     extra sources and robust error recovery mechanisms.
+
+    Sources may be fetched from several threads (see SourcePrefetcher). Each library is
+    fetched under its own lock, and a source prepared earlier in the same run is reused,
+    so a build waiting on a prefetch in progress simply picks up its result.
     """
 
+    # Per-library fetch locks and source directories already prepared in this run
+    _fetch_locks: Dict[str, threading.Lock] = {}
+    _fetched: Dict[str, Path] = {}
+    _registry_lock = threading.Lock()
+
     @staticmethod
     def _apply_exclusions(directory: Path, patterns: list) -> bool:
         """
@@ -37,6 +52,9 @@ class SourceManager:
         specified target directory. Handles both files and directories with appropriate
         deletion methods and provides detailed logging of exclusion operations.
 
+        The patterns are compiled into one matcher (Path.glob semantics) and the tree is
+        walked once; matched directories are removed without descending into them.
+
         Args:
             directory: Target directory where exclusion patterns should be applied
             patterns: List of glob patterns specifying files/directories to exclude
@@ -45,15 +63,32 @@ class SourceManager:
             bool: True if all exclusion operations completed successfully, False if any errors occurred
         """
         success = True
-        for pattern in patterns:
-            for item in directory.glob(pattern):
+        matcher = PathMatcher(patterns, glob=True)
+        for root, dirs, files in os.walk(directory):
+            root_path = Path(root)
+            relative_root = root_path.relative_to(directory).as_posix()
+            prefix = '' if relative_root == '.' else f"{relative_root}/"
+            for name in list(dirs):
+                item = root_path / name
+                if not matcher.matches_directory(prefix + name):
+                    continue
+                dirs.remove(name)
                 try:
-                    if item.is_file() or item.is_symlink():
+                    if item.is_symlink():
                         item.unlink()
-                        RichLogger.debug(f"Excluded file: [bold cyan]{item}[/bold cyan]")
-                    elif item.is_dir():
+                    else:
                         shutil.rmtree(item)
-                        RichLogger.debug(f"Excluded directory: [bold cyan]{item}[/bold cyan]")
+                    RichLogger.debug(f"Excluded directory: [bold cyan]{item}[/bold cyan]")
+                except Exception as e:
+                    RichLogger.error(f"Failed to exclude [bold cyan]{item}[/bold cyan]: [bold red]{str(e)}[/bold red]")
+                    success = False
+            for name in files:
+                if not matcher.matches(prefix + name):
+                    continue
+                item = root_path / name
+                try:
+                    item.unlink()
+                    RichLogger.debug(f"Excluded file: [bold cyan]{item}[/bold cyan]")
                 except Exception as e:
                     RichLogger.error(f"Failed to exclude [bold cyan]{item}[/bold cyan]: [bold red]{str(e)}[/bold red]")
                     success = False
@@ -116,16 +151,27 @@ class SourceManager:
         Returns:
             Path: Path to the processed source directory, or None on failure
         """
-        source_dir = SourceManager._process_source(config)
-        if not source_dir:
-            RichLogger.error(f"Source fetch failed for [bold cyan]{config['name']}[/bold cyan]")
-            return None
-        if 'extras' in config:
-            for extra in config['extras']:
-                extra_path = SourceManager._process_source(extra, base_dir=source_dir)
-                if not extra_path:
-                    RichLogger.warning(f"Failed to process extra source: [bold cyan]{extra['name']}[/bold cyan]")
-        return source_dir
+        name = config['name']
+        with SourceManager._registry_lock:
+            fetch_lock = SourceManager._fetch_locks.setdefault(name, threading.Lock())
+
+        with fetch_lock:
+            source_dir = SourceManager._fetched.get(name)
+            if source_dir and source_dir.exists():
+                RichLogger.debug(f"Reusing source prepared in this run: [bold cyan]{source_dir}[/bold cyan]")
+                return source_dir
+
+            source_dir = SourceManager._process_source(config)
+            if not source_dir:
+                RichLogger.error(f"Source fetch failed for [bold cyan]{name}[/bold cyan]")
+                return None
+            if 'extras' in config:
+                for extra in config['extras']:
+                    extra_path = SourceManager._process_source(extra, base_dir=source_dir)
+                    if not extra_path:
+                        RichLogger.warning(f"Failed to process extra source: [bold cyan]{extra['name']}[/bold cyan]")
+            SourceManager._fetched[name] = source_dir
+            return source_dir
 
     @staticmethod
     def _process_source(config: dict,
@@ -173,17 +219,34 @@ class SourceManager:
             else:
                 target_dir = ROOT_DIR / 'buildtrees' / 'sources' / f"{name}-{version}"
             lib_dir = ROOT_DIR / 'ports' / f"{name}"
-            # Check if any .diff file in port directory is newer than main source directory
+            patch_digest = BuildFingerprint.patch_digest(name)
+            # Check if the port patches changed since the source directory was prepared
             if target_dir.exists() and lib_dir.exists():
-                # Get the latest modification time of source directory
-                target_mtime = target_dir.stat().st_mtime
-                # Check all .diff files in port directory
-                for diff_file in lib_dir.glob('*.diff'):
-                    if diff_file.is_file() and diff_file.stat().st_mtime > target_mtime:
-                        RichLogger.info(f"[[bold cyan]{name}[/bold cyan]] {diff_file.name} is newer than source")
+                patch_stamp = BuildFingerprint.read_patch_stamp(target_dir)
+                if patch_stamp is not None:
+                    if patch_stamp != patch_digest:
+                        RichLogger.info(f"[[bold cyan]{name}[/bold cyan]] Patches changed since source was prepared")
                         from mpt.clean import CleanManager
                         # Remove source directory to ensure fresh extraction with patches
                         CleanManager.clean_source(name, config)
+                else:
+                    # Sources prepared before patch stamps existed: compare timestamps once
+                    target_mtime = target_dir.stat().st_mtime
+                    for diff_file in lib_dir.glob('*.diff'):
+                        if diff_file.is_file() and diff_file.stat().st_mtime > target_mtime:
+                            RichLogger.info(f"[[bold cyan]{name}[/bold cyan]] {diff_file.name} is newer than source")
+                            from mpt.clean import CleanManager
+                            # Remove source directory to ensure fresh extraction with patches
+                            CleanManager.clean_source(name, config)
+                            break
+            if target_dir.exists():
+                source_dir = SourceManager._handle_existing_source(config, target_dir, force_extract)
+            else:
+                RichLogger.debug(f"Target directory does not exist: [bold green]{target_dir}[/bold green]")
+                source_dir = SourceManager._fetch_new_source(config, target_dir, force_extract)
+            if source_dir:
+                BuildFingerprint.write_patch_stamp(target_dir, patch_digest)
+            return source_dir
         if target_dir.exists():
             return SourceManager._handle_existing_source(config, target_dir, force_extract)
         else:
@@ -279,7 +342,8 @@ class SourceManager:
         Implements a comprehensive archive management strategy with multiple scenarios:
         - Existing file without verification requirements
         - Existing file with hash verification
-        - New file download with optional verification
+        - Archive with the same hash already in the content-addressed download store
+        - New file download from the source URL or one of its mirrors, with optional verification
         - Error handling for download failures and verification mismatches
 
         Args:
@@ -291,31 +355,90 @@ class SourceManager:
         url = config['url']
         archive_filename = SourceManager._get_archive_filename(url, config)
         archive_path = ROOT_DIR / 'downloads' / archive_filename
+        expected_hash = config.get('sha256')
         # Case 1: File exists and no hash verification needed
-        if archive_path.exists() and 'sha256' not in config:
+        if archive_path.exists() and not expected_hash:
             RichLogger.info(f"Using existing archive: [bold cyan]{archive_filename}[/bold cyan]")
             return archive_path
         # Case 2: File exists but verification required
-        if archive_path.exists() and 'sha256' in config:
-            expected_hash = config['sha256']
+        if archive_path.exists() and expected_hash:
             # Perform single verification
             if ArchiveHandler.verify_hash(archive_path, expected_hash):
+                SourceManager._store_archive(archive_path, expected_hash)
                 return archive_path
             else:
                 RichLogger.warning(f"Archive verification failed - removing invalid file: [bold cyan]{archive_filename}[/bold cyan]")
                 FileUtils.delete_file(archive_path)
-        # Case 3: File doesn't exist, need to download
-        if not DownloadHandler.download_file(url, archive_path):
-            RichLogger.error(f"Archive download failed: [bold cyan]{archive_filename}[/bold cyan]")
-            return None
-        # Case 4: Verification needed after download
-        if 'sha256' in config:
-            expected_hash = config['sha256']
-            if not ArchiveHandler.verify_hash(archive_path, expected_hash):
-                RichLogger.error(f"Downloaded archive failed verification: [bold cyan]{archive_filename}[/bold cyan]")
+        # Case 3: Same content already downloaded for another port or version
+        if expected_hash and DownloadStore.checkout(expected_hash, archive_path):
+            if ArchiveHandler.verify_hash(archive_path, expected_hash):
+                return archive_path
+            # The stored copy is damaged, drop it so it is replaced by the next download
+            DownloadStore.remove(expected_hash)
+            FileUtils.delete_file(archive_path)
+        # Case 4: Download from the source URL or a mirror (the digest is computed while writing)
+        candidates = MirrorList.rank(MirrorList.get_candidates(config, archive_filename))
+        for index, candidate in enumerate(candidates):
+            actual_hash = SourceManager._fetch_candidate(candidate, archive_path)
+            if not actual_hash:
+                # A partial file must not be resumed from a different location
+                if index + 1 < len(candidates) and archive_path.exists():
+                    FileUtils.delete_file(archive_path)
+                continue
+            DigestCache.store(archive_path, actual_hash)
+            # Case 5: Verification needed after download
+            if expected_hash and not ArchiveHandler.verify_hash(archive_path, expected_hash, actual_hash):
+                RichLogger.error(f"Downloaded archive failed verification: [bold cyan]{candidate}[/bold cyan]")
                 FileUtils.delete_file(archive_path)
-                return None
-        return archive_path
+                continue
+            SourceManager._store_archive(archive_path, actual_hash)
+            return archive_path
+        RichLogger.error(f"Archive download failed: [bold cyan]{archive_filename}[/bold cyan]")
+        return None
+
+    @staticmethod
+    def _fetch_candidate(candidate: str, archive_path: Path) -> Optional[str]:
+        """
+        Fetch an archive from a single download candidate.
+
+        Args:
+            candidate: Remote URL, local file path or file:// URL
+            archive_path: Destination path in the downloads directory
+
+        Returns:
+            str: SHA-256 digest of the fetched archive, or None if the candidate failed
+        """
+        if not MirrorList.is_local(candidate):
+            RichLogger.debug(f"Downloading from [bold cyan]{candidate}[/bold cyan]")
+            return DownloadHandler.download_and_hash(candidate, archive_path)
+
+        local_path = MirrorList.to_local_path(candidate)
+        if not local_path.is_file():
+            RichLogger.debug(f"Archive not found in local mirror: [bold cyan]{local_path}[/bold cyan]")
+            return None
+        try:
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(local_path, archive_path)
+            RichLogger.info(f"Copied archive from local mirror: [bold cyan]{local_path}[/bold cyan]")
+            return FileUtils.calc_hash(archive_path)
+        except OSError as e:
+            RichLogger.warning(f"Failed to copy archive from local mirror [bold cyan]{local_path}[/bold cyan]: {e}")
+            return None
+
+    @staticmethod
+    def _store_archive(archive_path: Path, digest: str) -> None:
+        """
+        Deduplicate a verified archive through the content-addressed download store.
+
+        Args:
+            archive_path: Verified archive in the downloads directory
+            digest: SHA-256 digest of the archive
+        """
+        digest = digest.lower()
+        inode = archive_path.stat().st_ino
+        if DownloadStore.add(archive_path, digest) and archive_path.stat().st_ino != inode:
+            # The file was replaced by a link to the stored copy, refresh its cached digest entry
+            DigestCache.store(archive_path, digest)
 
     @staticmethod
     def _update_git_repository(config: dict, source_dir: Path) -> Optional[Path]:
@@ -323,6 +446,7 @@ class SourceManager:
         Update existing Git repositories with robust error recovery and integrity checking.
 
         Provides sophisticated Git repository management including:
+        - Local-only fast path when HEAD already equals the pinned tag or commit
         - Repository integrity validation before update attempts
         - Graceful update operations with comprehensive error handling
         - Automatic repair mechanisms for corrupted repositories
@@ -335,6 +459,12 @@ class SourceManager:
         Returns:
             Path: Path to the updated repository, or None on failure
         """
+        # Fast path: a pinned tag or commit that is already checked out needs no network access
+        if GitHandler.is_at_version(source_dir, str(config.get('version', '')), config):
+            RichLogger.info(f"Git repository already at [bold yellow]{config['version']}[/bold yellow]: "
+                            f"[bold cyan]{config['name']}[/bold cyan]")
+            return source_dir
+
         RichLogger.info(f"Updating Git repository: [bold cyan]{config['name']}[/bold cyan]")
         if not GitHandler.verify_repository_integrity(source_dir, config):
             RichLogger.warning(f"Repository integrity issue detected: [bold cyan]{source_dir}[/bold cyan]")
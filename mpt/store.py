@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import os
+import shutil
+import uuid
+
+from pathlib import Path
+
+from mpt import ROOT_DIR
+from mpt.file import FileUtils
+from mpt.log import RichLogger
+
+
+class DownloadStore:
+    """
+    Content-addressed store for downloaded archives.
+
+    Every archive is kept once under downloads/.store/<first two digits>/<sha256>,
+    and the usual downloads/<name>-<version>.<ext> file is a hard link to it. Ports
+    or versions that reference an archive with the same SHA-256 are served from the
+    store without downloading, and the content exists on disk only once. When hard
+    links are not supported the file is copied instead, which keeps the behavior
+    correct at the cost of the disk space saving.
+    """
+
+    @staticmethod
+    def get_store_dir() -> Path:
+        """
+        Retrieve the root directory of the store.
+
+        Returns:
+            Path: downloads/.store under the project root
+        """
+        return ROOT_DIR / 'downloads' / '.store'
+
+    @staticmethod
+    def _get_entry_path(digest: str) -> Path:
+        """
+        Compute the store location of a digest.
+
+        Args:
+            digest: Hexadecimal SHA-256 digest
+
+        Returns:
+            Path: <store>/<first two digits>/<digest>
+        """
+        digest = digest.lower()
+        return DownloadStore.get_store_dir() / digest[:2] / digest
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> None:
+        """
+        Place a file at a new path, sharing its content when the filesystem allows it.
+
+        Args:
+            source: Existing file
+            target: Path to create (must not exist)
+        """
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    @staticmethod
+    def checkout(digest: str, target: Path) -> bool:
+        """
+        Make a stored archive available at a downloads path.
+
+        Args:
+            digest: Hexadecimal SHA-256 digest of the wanted archive
+            target: Path the archive should appear at
+
+        Returns:
+            bool: True if the archive was placed at the target, False if not stored or on error
+        """
+        entry = DownloadStore._get_entry_path(digest)
+        if not entry.is_file():
+            return False
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.exists():
+                target.unlink()
+            DownloadStore._link_or_copy(entry, target)
+            RichLogger.info(f"Using stored archive [bold yellow]{digest[:12]}[/bold yellow] for [bold cyan]{target.name}[/bold cyan]")
+            return True
+        except OSError as e:
+            RichLogger.warning(f"Failed to use stored archive for [bold cyan]{target.name}[/bold cyan]: {e}")
+            return False
+
+    @staticmethod
+    def remove(digest: str) -> None:
+        """
+        Drop a store entry, e.g. one whose content no longer matches its digest.
+
+        Args:
+            digest: Hexadecimal SHA-256 digest of the entry
+        """
+        entry = DownloadStore._get_entry_path(digest)
+        try:
+            entry.unlink(missing_ok=True)
+            RichLogger.warning(f"Removed corrupt stored archive [bold yellow]{digest[:12]}[/bold yellow]")
+        except OSError as e:
+            RichLogger.warning(f"Failed to remove stored archive [bold yellow]{digest[:12]}[/bold yellow]: {e}")
+
+    @staticmethod
+    def _is_intact(entry: Path, file_path: Path, digest: str) -> bool:
+        """
+        Check that a store entry still holds the content of a verified archive.
+
+        Args:
+            entry: Existing store entry
+            file_path: Verified archive with the same digest
+            digest: Hexadecimal SHA-256 digest of the archive
+
+        Returns:
+            bool: True if the entry has the archive's size and digest
+        """
+        if entry.stat().st_size != file_path.stat().st_size:
+            return False
+        return (FileUtils.calc_hash(entry) or '').lower() == digest.lower()
+
+    @staticmethod
+    def add(file_path: Path, digest: str) -> bool:
+        """
+        Add a verified archive to the store and link the downloads path to the stored copy.
+
+        An existing entry is only shared after its size and digest were checked; an
+        entry that no longer matches is replaced by the verified archive.
+
+        Args:
+            file_path: Archive in the downloads directory
+            digest: Hexadecimal SHA-256 digest of the archive
+
+        Returns:
+            bool: True if the archive is in the store afterwards, False on error
+        """
+        entry = DownloadStore._get_entry_path(digest)
+        try:
+            intact = entry.exists() and (os.path.samefile(entry, file_path) or
+                                         DownloadStore._is_intact(entry, file_path, digest))
+            if entry.exists() and not intact:
+                RichLogger.warning(f"Replacing corrupt stored archive [bold yellow]{digest[:12]}[/bold yellow] "
+                                   f"with [bold cyan]{file_path.name}[/bold cyan]")
+            if not intact:
+                entry.parent.mkdir(parents=True, exist_ok=True)
+                # Unique temporary name so concurrent fetches never write the same file
+                temp_path = entry.with_name(f"{entry.name}.{uuid.uuid4().hex}.tmp")
+                DownloadStore._link_or_copy(file_path, temp_path)
+                os.replace(temp_path, entry)
+            elif not os.path.samefile(entry, file_path):
+                # Same content already stored: share it instead of keeping a second copy
+                temp_path = file_path.with_name(f"{file_path.name}.{uuid.uuid4().hex}.tmp")
+                DownloadStore._link_or_copy(entry, temp_path)
+                os.replace(temp_path, file_path)
+            return True
+        except OSError as e:
+            RichLogger.warning(f"Failed to add [bold cyan]{file_path.name}[/bold cyan] to the download store: {e}")
+            return False
@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import re
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from mpt.log import RichLogger
+
+
+class UnifiedDiff:
+    """
+    Pure-Python parser and applier for unified diffs, equivalent to 'patch -Np1'.
+
+    A patch file is split into per-file sections. Each section is applied in memory
+    with the same tolerances GNU patch uses:
+    - offset: a hunk that does not match at its recorded line is searched for in the
+      whole file, nearest position first
+    - fuzz: up to MAX_FUZZ leading and trailing context lines may be ignored
+    - reverse detection: a section whose first hunk matches reversed before it
+      matches forward is reported as already applied and left untouched, like
+      'patch -N' does
+    Line endings of the patched file are preserved and lines are compared without
+    their terminators, so LF patches apply to CRLF sources. File contents are
+    handled as latin-1 text, which maps every byte to one character and keeps
+    files in any encoding byte-exact.
+
+    Sections the engine cannot handle (git renames, mode changes, binary patches,
+    malformed hunks, paths outside the source tree, hunks that do not match) are
+    returned with their original text so the caller can hand them to GNU patch.
+    """
+
+    MAX_FUZZ = 2
+    ENCODING = 'latin-1'
+
+    _HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+    _EPOCH = re.compile(r'\b(?:1970-01-01|1969-12-31)\b')
+    _UNSUPPORTED_HEADERS = ('rename from ', 'rename to ', 'copy from ', 'copy to ',
+                            'old mode ', 'new mode ', 'GIT binary patch', 'Binary files ')
+
+    # Section status values
+    APPLIED = 'applied'
+    ALREADY_APPLIED = 'already applied'
+    FAILED = 'failed'
+
+    @staticmethod
+    def _parse_name(header: str) -> Tuple[str, bool]:
+        """
+        Extract the file name from a '---' or '+++' header line.
+
+        Args:
+            header: Header line without the '--- ' or '+++ ' prefix
+
+        Returns:
+            tuple: (name, is_null) where is_null tells whether the name is /dev/null or
+                   carries the epoch timestamp 'diff -N' uses for absent files
+        """
+        header = header.rstrip('\r\n')
+        name, _, timestamp = header.partition('\t')
+        name = name.strip()
+        if len(name) >= 2 and name[0] == '"' and name[-1] == '"':
+            name = name[1:-1]
+        is_null = name == '/dev/null' or bool(UnifiedDiff._EPOCH.search(timestamp))
+        return name, is_null
+
+    @staticmethod
+    def strip_path(name: str, strip: int = 1) -> Optional[str]:
+        """
+        Remove leading path components from a file name, like 'patch -p<strip>'.
+
+        Args:
+            name: File name from the patch header
+            strip: Number of leading components to remove
+
+        Returns:
+            str: Relative path, or None for /dev/null and for names that would leave
+                 the source tree
+        """
+        if name == '/dev/null' or '\\' in name:
+            return None
+        parts = [part for part in name.split('/') if part not in ('', '.')]
+        parts = parts[strip:]
+        if not parts or '..' in parts:
+            return None
+        return '/'.join(parts)
+
+    @staticmethod
+    def parse(text: str) -> List[dict]:
+        """
+        Split a patch into per-file sections and parse their hunks.
+
+        Args:
+            text: Patch file content
+
+        Returns:
+            list: Sections as dictionaries with 'old' and 'new' names, 'old_null' and
+                  'new_null' flags, 'hunks', the original 'text' of the section and an
+                  'unsupported' reason (None when the engine can apply it)
+        """
+        lines = text.splitlines(keepends=True)
+        sections = []
+        header: List[str] = []
+        header_reason: Optional[str] = None
+
+        def flush_header():
+            # Extended headers without ---/+++ lines (mode changes, binary patches)
+            if header_reason:
+                sections.append({'old': '', 'new': '', 'old_null': False, 'new_null': False,
+                                 'hunks': [], 'text': ''.join(header), 'unsupported': header_reason})
+
+        i, n = 0, len(lines)
+        while i < n:
+            line = lines[i]
+            if line.startswith('--- ') and i + 1 < n and lines[i + 1].startswith('+++ '):
+                old, old_null = UnifiedDiff._parse_name(line[4:])
+                new, new_null = UnifiedDiff._parse_name(lines[i + 1][4:])
+                raw = header + [line, lines[i + 1]]
+                section = {'old': old, 'new': new, 'old_null': old_null, 'new_null': new_null,
+                           'hunks': [], 'unsupported': header_reason}
+                header, header_reason = [], None
+                i += 2
+
+                while i < n and lines[i].startswith('@@'):
+                    match = UnifiedDiff._HUNK_HEADER.match(lines[i])
+                    if not match:
+                        section['unsupported'] = section['unsupported'] or f"malformed hunk header: {lines[i].strip()}"
+                        break
+                    raw.append(lines[i])
+                    i += 1
+                    old_len = int(match.group(2)) if match.group(2) is not None else 1
+                    new_len = int(match.group(4)) if match.group(4) is not None else 1
+                    hunk_lines = []
+                    old_count = new_count = 0
+                    while i < n and (old_count < old_len or new_count < new_len or lines[i].startswith('\\')):
+                        body = lines[i]
+                        tag = body[0] if body not in ('\n', '\r\n') else ' '
+                        if tag == '\\':
+                            # '\ No newline at end of file' refers to the previous line
+                            if hunk_lines:
+                                hunk_lines[-1][2] = True
+                        elif tag in (' ', '-', '+'):
+                            hunk_lines.append([tag, body[1:].rstrip('\r\n'), False])
+                            if tag != '+':
+                                old_count += 1
+                            if tag != '-':
+                                new_count += 1
+                        else:
+                            break
+                        raw.append(body)
+                        i += 1
+                    if old_count != old_len or new_count != new_len:
+                        section['unsupported'] = section['unsupported'] or "truncated hunk"
+                    section['hunks'].append({
+                        'old_start': int(match.group(1)), 'old_len': old_len,
+                        'new_start': int(match.group(3)), 'new_len': new_len,
+                        'lines': hunk_lines
+                    })
+                section['text'] = ''.join(raw)
+                sections.append(section)
+                continue
+
+            if line.startswith('diff ') or line.startswith('Index: '):
+                flush_header()
+                header, header_reason = [line], None
+            elif header:
+                header.append(line)
+                if line.startswith(UnifiedDiff._UNSUPPORTED_HEADERS):
+                    header_reason = header_reason or line.strip()
+            i += 1
+
+        flush_header()
+        return sections
+
+    @staticmethod
+    def _search_order(expected: int, last: int) -> List[int]:
+        """
+        List candidate positions nearest to the expected position first.
+
+        Args:
+            expected: Position the hunk header points to
+            last: Largest valid position
+
+        Returns:
+            list: Positions from 0 to last ordered by distance from expected
+        """
+        expected = min(max(expected, 0), max(last, 0))
+        order = [expected]
+        for distance in range(1, max(expected, last - expected) + 1):
+            if expected + distance <= last:
+                order.append(expected + distance)
+            if expected - distance >= 0:
+                order.append(expected - distance)
+        return order
+
+    @staticmethod
+    def _locate(keys: List[str], hunk_lines: List[list], expected: int,
+                max_fuzz: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Find where a hunk applies, allowing offset and fuzz.
+
+        Follows GNU patch: a hunk with fewer leading than trailing context lines was
+        made at the start of the file and only matches there, a hunk with fewer
+        trailing than leading context lines only matches at the end of the file,
+        until the fuzz makes up the difference.
+
+        Args:
+            keys: Current file lines without terminators
+            hunk_lines: [tag, text, no_eol] entries of the hunk (already oriented)
+            expected: 0-based position the hunk header points to
+            max_fuzz: Maximum number of context lines to ignore at each end
+
+        Returns:
+            tuple: (position, leading lines ignored, trailing lines ignored), or None
+        """
+        lead = 0
+        while lead < len(hunk_lines) and hunk_lines[lead][0] == ' ':
+            lead += 1
+        trail = 0
+        while trail < len(hunk_lines) - lead and hunk_lines[len(hunk_lines) - 1 - trail][0] == ' ':
+            trail += 1
+        context = max(lead, trail)
+
+        tried = set()
+        for fuzz in range(max_fuzz + 1):
+            # Negative values anchor the hunk at the start or end of the file
+            lead_fuzz, trail_fuzz = fuzz + lead - context, fuzz + trail - context
+            cut_lead, cut_trail = min(max(lead_fuzz, 0), lead), min(max(trail_fuzz, 0), trail)
+            if (cut_lead, cut_trail, lead_fuzz < 0, trail_fuzz < 0) in tried:
+                continue
+            tried.add((cut_lead, cut_trail, lead_fuzz < 0, trail_fuzz < 0))
+            lines = hunk_lines[cut_lead:len(hunk_lines) - cut_trail]
+            old = [text for tag, text, _ in lines if tag != '+']
+            last = len(keys) - len(old)
+            if last < 0:
+                continue
+            if lead_fuzz < 0:
+                candidates = [0]
+            elif trail_fuzz < 0:
+                candidates = [last]
+            elif not old:
+                # Pure insertion without context
+                return min(max(expected + cut_lead, 0), len(keys)), cut_lead, cut_trail
+            else:
+                candidates = UnifiedDiff._search_order(expected + cut_lead, last)
+            for pos in candidates:
+                if (not old or keys[pos] == old[0]) and keys[pos:pos + len(old)] == old:
+                    return pos, cut_lead, cut_trail
+        return None
+
+    @staticmethod
+    def _is_reversed(keys: List[str], hunks: List[dict]) -> bool:
+        """
+        Tell whether a section looks already applied, checked in GNU patch order.
+
+        Like GNU patch, only the first hunk is considered: at each fuzz level the
+        reversed hunk is tried as soon as the forward hunk fails, before the forward
+        hunk is searched with more fuzz.
+
+        Args:
+            keys: Current file lines without terminators
+            hunks: Parsed hunks of the section
+
+        Returns:
+            bool: True if the first hunk matches reversed before it matches forward
+        """
+        hunk = hunks[0]
+        reversed_lines = [[{'+': '-', '-': '+'}.get(tag, tag), text, no_eol] for tag, text, no_eol in hunk['lines']]
+        forward = hunk['old_start'] - 1 if hunk['old_len'] else hunk['old_start']
+        backward = hunk['new_start'] - 1 if hunk['new_len'] else hunk['new_start']
+        for fuzz in range(UnifiedDiff.MAX_FUZZ + 1):
+            if UnifiedDiff._locate(keys, hunk['lines'], forward, fuzz) is not None:
+                return False
+            if UnifiedDiff._locate(keys, reversed_lines, backward, fuzz) is not None:
+                return True
+        return False
+
+    @staticmethod
+    def _apply_hunks(content: List[str], hunks: List[dict], reverse: bool, eol: str,
+                     max_fuzz: int, label: str) -> Optional[List[str]]:
+        """
+        Apply all hunks of a section to file lines.
+
+        Args:
+            content: File lines including their terminators
+            hunks: Parsed hunks of the section
+            reverse: Apply the hunks reversed (for already-applied detection)
+            eol: Line terminator used for inserted lines
+            max_fuzz: Maximum fuzz allowed for each hunk
+            label: File name used in log messages
+
+        Returns:
+            list: Patched file lines, or None if any hunk does not apply
+        """
+        result = list(content)
+        delta = 0
+        drift = 0
+        final_no_eol = None
+        for number, hunk in enumerate(hunks, start=1):
+            if reverse:
+                lines = [[{'+': '-', '-': '+'}.get(tag, tag), text, no_eol] for tag, text, no_eol in hunk['lines']]
+                start, length = hunk['new_start'], hunk['new_len']
+            else:
+                lines = hunk['lines']
+                start, length = hunk['old_start'], hunk['old_len']
+            expected = (start - 1 if length else start) + delta + drift
+            keys = [line.rstrip('\r\n') for line in result]
+            found = UnifiedDiff._locate(keys, lines, expected, max_fuzz)
+            if found is None:
+                if not reverse:
+                    RichLogger.debug(f"Hunk #{number} does not match in [bold cyan]{label}[/bold cyan]")
+                return None
+            pos, cut_lead, cut_trail = found
+            lines = lines[cut_lead:len(lines) - cut_trail]
+            if not reverse and (pos != expected + cut_lead or cut_lead or cut_trail):
+                RichLogger.debug(f"Hunk #{number} of [bold cyan]{label}[/bold cyan] applied at line {pos + 1}"
+                                 f" (offset {pos - expected - cut_lead}, fuzz {max(cut_lead, cut_trail)})")
+
+            replacement = []
+            index = pos
+            for tag, text, no_eol in lines:
+                if tag == ' ':
+                    replacement.append(result[index])
+                    index += 1
+                elif tag == '-':
+                    index += 1
+                else:
+                    replacement.append(text + eol)
+            old_size = index - pos
+            if index == len(result):
+                # The hunk reaches the end of the file: it decides the final newline
+                new_side = [no_eol for tag, _, no_eol in lines if tag != '-']
+                final_no_eol = new_side[-1] if new_side else final_no_eol
+            result[pos:index] = replacement
+            drift = pos - (expected + cut_lead)
+            delta += len(replacement) - old_size
+
+        # Lines that are no longer last need a terminator; the last one follows the patch
+        for index in range(len(result) - 1):
+            if not result[index].endswith('\n'):
+                result[index] += eol
+        if result and final_no_eol is not None:
+            last = result[-1].rstrip('\r\n')
+            result[-1] = last if final_no_eol else last + (result[-1][len(last):] or eol)
+        return result
+
+    @staticmethod
+    def _detect_eol(lines: List[str]) -> str:
+        """
+        Determine the predominant line terminator of a file.
+
+        Args:
+            lines: File lines including their terminators
+
+        Returns:
+            str: '\\r\\n' if most lines end with CRLF, otherwise '\\n'
+        """
+        crlf = sum(1 for line in lines if line.endswith('\r\n'))
+        return '\r\n' if crlf * 2 > len(lines) else '\n'
+
+    @staticmethod
+    def get_target(section: dict, exists: Callable[[str], bool], strip: int = 1) -> Optional[str]:
+        """
+        Choose the file a section applies to.
+
+        Args:
+            section: Parsed section
+            exists: Function telling whether a relative path currently exists
+            strip: Number of leading path components to remove
+
+        Returns:
+            str: Relative path of the target file, or None if no valid path is given
+        """
+        old = None if section['old'] == '/dev/null' else UnifiedDiff.strip_path(section['old'], strip)
+        new = None if section['new'] == '/dev/null' else UnifiedDiff.strip_path(section['new'], strip)
+        if old and exists(old):
+            return old
+        if new and exists(new):
+            return new
+        return new or old
+
+    @staticmethod
+    def apply_section(section: dict, content: Optional[bytes],
+                      label: str) -> Tuple[str, Optional[bytes]]:
+        """
+        Apply one parsed section to the current content of its target file.
+
+        Args:
+            section: Parsed section without an 'unsupported' reason
+            content: Current file content, or None if the file does not exist
+            label: File name used in log messages
+
+        Returns:
+            tuple: (status, new content) where status is APPLIED, ALREADY_APPLIED or
+                   FAILED, and new content is None when the file is to be removed
+        """
+        hunks = section['hunks']
+        lines = content.decode(UnifiedDiff.ENCODING).splitlines(keepends=True) if content is not None else []
+        eol = UnifiedDiff._detect_eol(lines) if lines else '\n'
+        removes = section['new'] == '/dev/null' or (section['new_null'] and all(h['new_len'] == 0 for h in hunks))
+
+        creates = section['old'] == '/dev/null' or (section['old_null'] and all(h['old_len'] == 0 for h in hunks))
+
+        if content is None and removes:
+            return UnifiedDiff.ALREADY_APPLIED, None
+        if content is not None and creates:
+            # The file to create exists: only identical content counts as already applied
+            added = [text for hunk in hunks for tag, text, _ in hunk['lines'] if tag == '+']
+            if [line.rstrip('\r\n') for line in lines] == added:
+                return UnifiedDiff.ALREADY_APPLIED, content
+            return UnifiedDiff.FAILED, content
+        if content is None and any(h['old_len'] for h in hunks):
+            return UnifiedDiff.FAILED, content
+
+        if content is not None and UnifiedDiff._is_reversed([line.rstrip('\r\n') for line in lines], hunks):
+            # Reversed hunks matching exactly mean the section is already in place
+            if UnifiedDiff._apply_hunks(lines, hunks, True, eol, 0, label) is not None:
+                return UnifiedDiff.ALREADY_APPLIED, content
+            return UnifiedDiff.FAILED, content
+
+        patched = UnifiedDiff._apply_hunks(lines, hunks, False, eol, UnifiedDiff.MAX_FUZZ, label)
+        if patched is None:
+            return UnifiedDiff.FAILED, content
+
+        if removes and not patched:
+            return UnifiedDiff.APPLIED, None
+        return UnifiedDiff.APPLIED, ''.join(patched).encode(UnifiedDiff.ENCODING)
+
+    @staticmethod
+    def apply_patch(patch_file: Path, read: Callable[[str], Optional[bytes]],
+                    exists: Callable[[str], bool], strip: int = 1) -> Tuple[Dict[str, Optional[bytes]], List[str], int]:
+        """
+        Apply every section of a patch file in memory.
+
+        Args:
+            patch_file: Unified diff to apply
+            read: Function returning the current content of a relative path, or None
+            exists: Function telling whether a relative path currently exists
+            strip: Number of leading path components to remove
+
+        Returns:
+            tuple: (changes, fallback, skipped) where changes maps relative paths to their
+                   new content (None to remove the file), fallback holds the text of the
+                   sections that must be applied by GNU patch, and skipped counts the
+                   sections that were already applied
+        """
+        text = patch_file.read_bytes().decode(UnifiedDiff.ENCODING)
+        sections = UnifiedDiff.parse(text)
+        changes: Dict[str, Optional[bytes]] = {}
+        fallback = []
+        skipped = 0
+
+        if not sections:
+            # Nothing recognizable (for example a context diff): leave it all to GNU patch
+            return changes, [text] if text.strip() else [], 0
+
+        def current(path):
+            return changes[path] if path in changes else read(path)
+
+        def present(path):
+            return changes[path] is not None if path in changes else exists(path)
+
+        for section in sections:
+            target = UnifiedDiff.get_target(section, present, strip) if not section['unsupported'] else None
+            if target is None:
+                reason = section['unsupported'] or f"invalid file name: {section['old']} / {section['new']}"
+                RichLogger.debug(f"Leaving section to GNU patch ({reason})")
+                fallback.append(section['text'])
+                continue
+            status, content = UnifiedDiff.apply_section(section, current(target), target)
+            if status == UnifiedDiff.APPLIED:
+                changes[target] = content
+            elif status == UnifiedDiff.ALREADY_APPLIED:
+                RichLogger.info(f"Already applied, skipping: [bold cyan]{target}[/bold cyan]")
+                skipped += 1
+            else:
+                fallback.append(section['text'])
+        return changes, fallback, skipped
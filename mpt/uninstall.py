@@ -4,13 +4,13 @@
 #
 
 from pathlib import Path
-from typing import Set
+from typing import List, Set
 
-from mpt import ROOT_DIR
 from mpt.config import UserConfig
 from mpt.file import FileUtils
 from mpt.history import HistoryManager
 from mpt.log import RichLogger
+from mpt.owner import OwnershipIndex
 
 
 class UninstallManager:
@@ -30,29 +30,20 @@ class UninstallManager:
             lib: Name of the library to uninstall
 
         Returns:
-            int: Number of files successfully removed, 0 if no files found, -1 if uninstallation failed
+            int: Number of files successfully removed, 0 if no files found
         """
         # Remove the library record from installation history
         HistoryManager.remove_record(triplet, lib)
 
-        # Construct path to the installed file list for this library
-        list_file = ROOT_DIR / 'installed' / 'info' / triplet / f"{lib}.list"
-
-        # Check if the installed file list exists
-        if not list_file.exists():
-            RichLogger.debug(f"Installed file list not found: {list_file}")
+        # Retrieve the installed file list for this library
+        installed_list = HistoryManager.load_file_list(triplet, lib)
+        if installed_list is None:
+            RichLogger.debug(f"Installed file list not found for {lib}")
             return 0  # No files to remove, but not considered a failure
 
-        # Read the installed file list content
-        try:
-            list_content = list_file.read_text(encoding='utf-8', errors='ignore')
-        except Exception as e:
-            RichLogger.debug(f"Error reading installed file list {list_file}: {e}")
-            return -1  # Considered a failure due to read error
-
         # Parse the file list to get installed files with absolute paths
         prefix = UserConfig.get_prefix(triplet, lib)
-        installed_files = UninstallManager._get_installed(list_content, prefix)
+        installed_files = UninstallManager._get_installed(installed_list, prefix)
 
         # Check if any installed files were found
         if not installed_files:
@@ -66,16 +57,35 @@ class UninstallManager:
         # Remove empty directories under the prefix that were part of the installation
         empty_dirs_removed = UninstallManager._remove_empty_directories(prefix, installed_files)
 
+        # Forget the file list so that ownership queries no longer report this library
+        HistoryManager.remove_file_list(triplet, lib)
+        OwnershipIndex.remove(triplet, lib)
+
         RichLogger.debug(f"Successfully removed {removed_count} files and {empty_dirs_removed} empty directories")
         return removed_count
 
     @staticmethod
-    def _get_installed(list_content: str, prefix: Path) -> Set[Path]:
+    def remove_paths(prefix: Path, paths: Set[Path]) -> int:
+        """
+        Remove installed paths under a prefix and the directories they leave empty.
+
+        Args:
+            prefix: Installation prefix containing the paths
+            paths: Absolute paths of files, directories and links to remove
+
+        Returns:
+            int: Number of paths and empty directories removed
+        """
+        removed_count = UninstallManager._remove_files(paths)
+        return removed_count + UninstallManager._remove_empty_directories(prefix, paths)
+
+    @staticmethod
+    def _get_installed(lines: List[str], prefix: Path) -> Set[Path]:
         """
-        Parse the installed file list content and convert relative paths to absolute paths.
+        Convert the relative paths of an installed file list to absolute paths.
 
         Args:
-            list_content: Content of the installed file list with relative paths
+            lines: Entries of the installed file list with relative paths
             prefix: Installation prefix directory to resolve absolute paths
 
         Returns:
@@ -83,8 +93,6 @@ class UninstallManager:
         """
         files = set()
 
-        # Split content by lines and process each line
-        lines = list_content.strip().split('\n')
         RichLogger.debug(f"Found {len(lines)} entries in installed file list")
 
         for line in lines:
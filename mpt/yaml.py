@@ -12,6 +12,31 @@ from mpt import ROOT_DIR
 from mpt.log import RichLogger
 
 
+# Prefer the libyaml based loader when PyYAML was built with it
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+class YamlDumper(yaml.SafeDumper):
+    """
+    Safe YAML dumper that indents block sequences nested in mappings.
+
+    Stays on the pure-Python emitter on purpose: libyaml's emitter always writes
+    sequences inside mappings indentless, which would reformat every existing
+    config.yaml, status.yaml and settings.yaml on the next write.
+    """
+
+    def increase_indent(self, flow=False, indentless=False):
+        # Override to ensure proper indentation for nested structures
+        return super().increase_indent(flow, False)
+
+
+# Represent None as an empty scalar, matching main._configure_yaml_output
+YamlDumper.add_representer(
+    type(None),
+    lambda dumper, value: dumper.represent_scalar('tag:yaml.org,2002:null', '')
+)
+
+
 class YamlUtils:
     """
     YAML file utility class providing core YAML file handling capabilities.
@@ -28,7 +53,8 @@ class YamlUtils:
         Load and parse YAML file with robust error handling and validation.
 
         Provides a secure and reliable method for reading YAML files with
-        comprehensive error detection and reporting. Handles file existence checks,
+        comprehensive error detection and reporting. Parsing uses the libyaml
+        CSafeLoader when available and falls back to the pure-Python SafeLoader. Handles file existence checks,
         format validation, encoding issues, and parsing errors with detailed logging.
 
         Args:
@@ -53,7 +79,7 @@ class YamlUtils:
             return None
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                yaml_data = yaml.safe_load(f) or {}
+                yaml_data = yaml.load(f, Loader=SafeLoader) or {}
                 return yaml_data
         except yaml.YAMLError as e:
             RichLogger.exception(
@@ -95,12 +121,6 @@ class YamlUtils:
             # Ensure parent directory exists
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Custom YAML dumper class to ensure proper formatting
-            class YamlDumper(yaml.SafeDumper):
-                def increase_indent(self, flow=False, indentless=False):
-                    # Override to ensure proper indentation for nested structures
-                    return super().increase_indent(flow, False)
-
             with open(file_path, 'w', encoding='utf-8') as f:
                 # Use custom dumper with appropriate settings
                 yaml.dump(
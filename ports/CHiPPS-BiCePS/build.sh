@@ -123,6 +123,7 @@ build_stage()
 install_stage()
 {
   echo "Installing $PKG_NAME $PKG_VER"
+  [[ -n "$MPT_INSTALL_GATE" ]] && echo "$MPT_INSTALL_GATE" && read -r MPT_INSTALL_ACK
   cd "$BUILD_DIR" && make install || exit 1
 }
 
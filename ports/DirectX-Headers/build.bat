@@ -62,6 +62,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 pushd "%PREFIX%\lib\pkgconfig"
 sed -e "s#\([A-Za-z]\):/\([^/]\)#/\L\1\E/\2#g" -i DirectX-Headers.pc
@@ -67,6 +67,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 if not exist "%PREFIX%\include\win32" mkdir "%PREFIX%\include\win32"
 cd "%SRC_DIR%" && xcopy /Y /F /I win32\adapt.h "%PREFIX%\include\win32"
@@ -48,6 +48,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 if not exist "%PREFIX%\bin" mkdir "%PREFIX%\bin"
 if not exist "%PREFIX%\include\luajit-%PKG_VER%" mkdir "%PREFIX%\include\luajit-%PKG_VER%"
 if not exist "%PREFIX%\lib" mkdir "%PREFIX%\lib"
@@ -64,6 +64,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 
 for /f "tokens=1-4 delims=." %%a in ("!PKG_VER!") do set openjph_major_minor=%%a.%%b
@@ -66,6 +66,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 if not exist "%PREFIX%\bin" mkdir "%PREFIX%\bin"
 cd "%BUILD_DIR%\dng_validate\Validate Release\%ARCH%" && (
   xcopy /Y /F /I *.exe "%PREFIX%\bin"
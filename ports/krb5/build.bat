@@ -58,6 +58,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%"
 nmake /K install NODEBUG=1 NO_LEASH=1 || exit 1
 exit /b 0
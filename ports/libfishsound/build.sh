@@ -111,6 +111,7 @@ build_stage()
 install_stage()
 {
   echo "Installing $PKG_NAME $PKG_VER"
+  [[ -n "$MPT_INSTALL_GATE" ]] && echo "$MPT_INSTALL_GATE" && read -r MPT_INSTALL_ACK
   cd "$BUILD_DIR" && make install || exit 1
   sed 's#$[A-Za-z]$:/#/\L\1/#gI' -i "${PREFIX}/lib/pkgconfig/fishsound.pc"
 }
@@ -65,6 +65,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 if not exist "%PREFIX%\lib\gav1.lib" (
   mklink "%PREFIX%\lib\gav1.lib" "%PREFIX%\lib\libgav1_shared.lib"
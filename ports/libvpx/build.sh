@@ -84,6 +84,7 @@ build_stage()
 install_stage()
 {
   echo "Installing $PKG_NAME $PKG_VER"
+  [[ -n "$MPT_INSTALL_GATE" ]] && echo "$MPT_INSTALL_GATE" && read -r MPT_INSTALL_ACK
   cd "$BUILD_DIR" && make install || exit 1
   if [[ ! -f "$PREFIX/lib/vpx.lib" ]]; then
     ln -sv "$PREFIX/lib/$ARCH/vpxmd.lib" "$PREFIX/lib/vpx.lib"
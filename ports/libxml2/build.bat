@@ -99,6 +99,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 if not exist "%PREFIX%\lib\xml2.lib" (
   mklink "%PREFIX%\lib\xml2.lib" "%PREFIX%\lib\libxml2.lib"
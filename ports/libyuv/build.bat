@@ -63,6 +63,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 echo "Generating libyuv.pc to %PREFIX%\lib\pkgconfig"
 set PC_FILE=%PREFIX%\lib\pkgconfig\libyuv.pc
@@ -48,6 +48,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%"
 echo F | xcopy /Y /F /I WinRel\gnumake.exe "%PREFIX%\bin\make.exe" || exit 1
 exit /b 0
@@ -96,6 +96,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%\fortran-var1" && xcopy /Y /F /I *.exe "%PREFIX%\bin"
 cd "%BUILD_DIR%\fortran-var2" && xcopy /Y /F /I *.exe "%PREFIX%\bin"
 exit /b 0
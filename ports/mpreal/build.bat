@@ -35,6 +35,7 @@ goto :end
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%SRC_DIR%" && xcopy /Y /F /I mpreal.h "%PREFIX%\include" || exit 1
 exit /b 0
 
@@ -50,6 +50,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 if not exist "%PREFIX%\bin" mkdir "%PREFIX%\bin"
 cd "%BUILD_DIR%" && xcopy /Y /F /I *.exe "%PREFIX%\bin" || exit 1
 exit /b 0
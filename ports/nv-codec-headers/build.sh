@@ -44,6 +44,7 @@ build_stage()
 install_stage()
 {
   echo "Installing $PKG_NAME $PKG_VER"
+  [[ -n "$MPT_INSTALL_GATE" ]] && echo "$MPT_INSTALL_GATE" && read -r MPT_INSTALL_ACK
   cd "$BUILD_DIR" && make install PREFIX=$PREFIX || exit 1
   sed -E "s|^(prefix=).*|\1${PREFIX}|" -i "${PREFIX}/lib/pkgconfig/ffnvcodec.pc"
 }
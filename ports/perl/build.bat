@@ -51,6 +51,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%"
 nmake /K install CCTYPE=MSVC143 INST_DRV= INST_TOP="%PREFIX%" INST_HTML="%PREFIX%\share\html"
 exit /b 0
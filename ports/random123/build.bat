@@ -35,6 +35,7 @@ goto :end
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 if not exist "%PREFIX%\include\Random123" mkdir "%PREFIX%\include\Random123"
 cd "%SRC_DIR%" && xcopy /S /Y /F /I include\Random123 "%PREFIX%\include\Random123" || exit 1
 exit /b 0
@@ -50,6 +50,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%"
 nmake /K -f makefile.vc install INSTALLDIR=%PREFIX% || exit 1
 echo "Generating tcl.pc to %PREFIX%\lib\pkgconfig"
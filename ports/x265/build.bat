@@ -76,6 +76,7 @@ exit /b 0
 
 :install_stage
 echo "Installing %PKG_NAME% %PKG_VER%"
+if defined MPT_INSTALL_GATE (echo %MPT_INSTALL_GATE%& set /p "MPT_INSTALL_ACK=")
 cd "%BUILD_DIR%" && ninja install || exit 1
 if not exist "%PREFIX%\lib\x265.lib" (
   mklink "%PREFIX%\lib\x265.lib" "%PREFIX%\lib\libx265.lib"
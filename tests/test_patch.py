@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import pytest
+
+# mpt.patch reaches the Windows registry through mpt.bash
+pytest.importorskip('winreg')
+
+from mpt.patch import PatchHandler  # noqa: E402
+
+
+def _diff(name, old, new):
+    """Build a single-hunk unified diff replacing the whole content of a file."""
+    removed = ''.join(f'-{line}\n' for line in old)
+    added = ''.join(f'+{line}\n' for line in new)
+    return (f'--- a/{name}\n+++ b/{name}\n@@ -1,{len(old)} +1,{len(new)} @@\n' + removed + added).encode()
+
+
+def test_dry_run_checks_series_in_memory(tmp_path):
+    """A dry run checks later patches against earlier ones without writing to the source tree."""
+    source = tmp_path / 'src'
+    source.mkdir()
+    (source / 'f.c').write_bytes(b'one\ntwo\n')
+    first = tmp_path / '0001-first.diff'
+    first.write_bytes(_diff('f.c', ['one', 'two'], ['one', 'three']))
+    second = tmp_path / '0002-second.diff'
+    second.write_bytes(_diff('f.c', ['one', 'three'], ['one', 'four']))
+
+    assert PatchHandler.apply_patches(source, patch_files=[first, second], dry_run=True)
+    assert (source / 'f.c').read_bytes() == b'one\ntwo\n'
+    assert not PatchHandler.apply_patches(source, patch_files=[second], dry_run=True)
+
+    assert PatchHandler.apply_patches(source, patch_files=[first, second])
+    assert (source / 'f.c').read_bytes() == b'one\nfour\n'
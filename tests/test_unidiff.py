@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+#  Copyright (c) 2024 Jianshan Jiang
+#
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from mpt.unidiff import UnifiedDiff
+
+pytestmark = pytest.mark.skipif(not shutil.which('patch') or not shutil.which('diff'),
+                                reason="GNU diff and patch are required for the differential tests")
+
+
+def _random_lines(rng, count):
+    return [f"{rng.choice('abcdefg')}{rng.randint(0, 5)}\n".encode() for _ in range(count)]
+
+
+def _edit(rng, lines, count, tag):
+    lines = list(lines)
+    for _ in range(count):
+        op, index = rng.random(), rng.randint(0, len(lines))
+        if op < 0.4:
+            lines.insert(index, tag)
+        elif lines and op < 0.8:
+            del lines[min(index, len(lines) - 1)]
+        elif lines:
+            lines[min(index, len(lines) - 1)] = b'mod\n'
+    return lines
+
+
+def _gnu_patch(work, diff, content):
+    """Apply a diff with 'patch -Np1' and tell whether it was skipped as already applied."""
+    target = work / 'gnu'
+    shutil.rmtree(target, ignore_errors=True)
+    target.mkdir()
+    (target / 'f').write_bytes(content)
+    (work / 'p.diff').write_bytes(diff)
+    result = subprocess.run(['patch', '-Np1', '-i', str(work / 'p.diff')], cwd=target, capture_output=True)
+    return b'Skipping patch' in result.stdout
+
+
+def test_already_applied_matches_gnu_patch(tmp_path):
+    """Patches applied to already patched files must be detected as reversed like GNU patch does."""
+    rng = random.Random(7)
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    mismatches = []
+    for case in range(500):
+        old = _random_lines(rng, rng.randint(1, 40))
+        new = _edit(rng, old, rng.randint(1, 4), b'new%d\n' % case)
+        (tmp_path / 'a' / 'f').write_bytes(b''.join(old))
+        (tmp_path / 'b' / 'f').write_bytes(b''.join(new))
+        diff = subprocess.run(['diff', '-u', 'a/f', 'b/f'], cwd=tmp_path, capture_output=True).stdout
+        if not diff:
+            continue
+        # Mostly already patched files, some with unrelated edits on top
+        content = b''.join(_edit(rng, new if rng.random() < 0.6 else old, rng.randint(0, 2), b'zz%d\n' % case))
+
+        section = UnifiedDiff.parse(diff.decode(UnifiedDiff.ENCODING))[0]
+        status, _ = UnifiedDiff.apply_section(section, content, 'f')
+        if status == UnifiedDiff.FAILED:
+            # Handed to GNU patch by PatchHandler
+            continue
+        if (status == UnifiedDiff.ALREADY_APPLIED) != _gnu_patch(tmp_path, diff, content):
+            mismatches.append((case, status, diff, content))
+    assert not mismatches
+
+
+def test_applied_patch_is_not_applied_twice(tmp_path):
+    """Applying the same section to its own output reports it as already applied."""
+    old = b''.join(f"line {i}\n".encode() for i in range(30))
+    new = old.replace(b'line 10\n', b'line 10\ninserted\n').replace(b'line 20\n', b'')
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    (tmp_path / 'a' / 'f').write_bytes(old)
+    (tmp_path / 'b' / 'f').write_bytes(new)
+    diff = subprocess.run(['diff', '-u', 'a/f', 'b/f'], cwd=tmp_path, capture_output=True).stdout
+    section = UnifiedDiff.parse(diff.decode(UnifiedDiff.ENCODING))[0]
+
+    status, patched = UnifiedDiff.apply_section(section, old, 'f')
+    assert (status, patched) == (UnifiedDiff.APPLIED, new)
+    status, patched = UnifiedDiff.apply_section(section, patched, 'f')
+    assert (status, patched) == (UnifiedDiff.ALREADY_APPLIED, new)
+    assert _gnu_patch(tmp_path, diff, new)